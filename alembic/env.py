@@ -9,10 +9,24 @@ from app import models  # noqa: F401
 config = context.config
 
 if config.config_file_name is not None:
-    fileConfig(config.config_file_name)
+    fileConfig(config.config_file_name, disable_existing_loggers=False)
 
 target_metadata = SQLModel.metadata
 
+# Search objects created by raw SQL in 0005 that the models don't describe: the FTS5 table
+# with its shadow tables on SQLite, and the trigram indexes on Postgres.
+UNMANAGED_PREFIXES = (
+    "pet_search",
+    "ix_pets_name_trgm",
+    "ix_pets_breed_trgm",
+    "ix_pets_registration_number_trgm",
+    "ix_pet_parents_name_trgm",
+)
+
+
+def include_name(name, type_, parent_names) -> bool:
+    return not (name or "").startswith(UNMANAGED_PREFIXES)
+
 
 def run_migrations_offline() -> None:
     url = config.get_main_option("sqlalchemy.url")
@@ -21,6 +35,7 @@ def run_migrations_offline() -> None:
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        include_name=include_name,
     )
 
     with context.begin_transaction():
@@ -35,7 +50,7 @@ def run_migrations_online() -> None:
     )
 
     with connectable.connect() as connection:
-        context.configure(connection=connection, target_metadata=target_metadata)
+        context.configure(connection=connection, target_metadata=target_metadata, include_name=include_name)
 
         with context.begin_transaction():
             context.run_migrations()
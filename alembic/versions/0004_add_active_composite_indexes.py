@@ -0,0 +1,41 @@
+"""add clinic-scoped partial indexes for active rows
+
+Revision ID: 0004_add_active_composite_indexes
+Revises: 0003_add_pet_fields
+Create Date: 2026-10-17 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004_add_active_composite_indexes"
+down_revision = "0003_add_pet_fields"
+branch_labels = None
+depends_on = None
+
+ACTIVE_INDEXES = [
+    ("ix_pet_parents_clinic_active_name", "pet_parents", ["clinic_id", "name"]),
+    ("ix_pets_clinic_active_name", "pets", ["clinic_id", "name"]),
+    ("ix_appointments_clinic_active_date", "appointments", ["clinic_id", "appointment_date", "start_time"]),
+    ("ix_appointments_vet_active_slot", "appointments", ["clinic_id", "vet_id", "appointment_date", "start_time"]),
+    ("ix_appointments_pet_active_date", "appointments", ["pet_id", "appointment_date", "start_time"]),
+    ("ix_medical_records_clinic_active_pet", "medical_records", ["clinic_id", "pet_id", "visit_date"]),
+    ("ix_invoices_clinic_active_status", "invoices", ["clinic_id", "status"]),
+    ("ix_inventory_items_clinic_active_stock", "inventory_items", ["clinic_id", "quantity", "low_stock_threshold"]),
+]
+
+
+def upgrade() -> None:
+    for name, table, columns in ACTIVE_INDEXES:
+        op.create_index(
+            name,
+            table,
+            columns,
+            sqlite_where=sa.text("deleted_at IS NULL"),
+            postgresql_where=sa.text("deleted_at IS NULL"),
+        )
+
+
+def downgrade() -> None:
+    for name, table, _columns in reversed(ACTIVE_INDEXES):
+        op.drop_index(name, table_name=table)
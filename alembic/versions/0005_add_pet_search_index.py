@@ -0,0 +1,125 @@
+"""add full-text pet search index
+
+Revision ID: 0005_add_pet_search_index
+Revises: 0004_add_active_composite_indexes
+Create Date: 2026-10-17 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0005_add_pet_search_index"
+down_revision = "0004_add_active_composite_indexes"
+branch_labels = None
+depends_on = None
+
+SEARCH_COLUMNS = "pet_id, clinic_id, name, breed, registration_number, parent_name"
+
+SQLITE_TRIGGERS = {
+    "pets_search_insert": f"""
+        CREATE TRIGGER pets_search_insert AFTER INSERT ON pets
+        WHEN new.deleted_at IS NULL
+        BEGIN
+            INSERT INTO pet_search ({SEARCH_COLUMNS})
+            SELECT new.id, new.clinic_id, new.name, new.breed, new.registration_number,
+                   (SELECT name FROM pet_parents WHERE id = new.pet_parent_id);
+        END
+    """,
+    "pets_search_update": f"""
+        CREATE TRIGGER pets_search_update
+        AFTER UPDATE OF clinic_id, pet_parent_id, name, breed, registration_number, deleted_at ON pets
+        WHEN old.clinic_id IS NOT new.clinic_id
+          OR old.pet_parent_id IS NOT new.pet_parent_id
+          OR old.name IS NOT new.name
+          OR old.breed IS NOT new.breed
+          OR old.registration_number IS NOT new.registration_number
+          OR old.deleted_at IS NOT new.deleted_at
+        BEGIN
+            DELETE FROM pet_search WHERE pet_id = old.id;
+            INSERT INTO pet_search ({SEARCH_COLUMNS})
+            SELECT new.id, new.clinic_id, new.name, new.breed, new.registration_number,
+                   (SELECT name FROM pet_parents WHERE id = new.pet_parent_id)
+            WHERE new.deleted_at IS NULL;
+        END
+    """,
+    "pets_search_delete": """
+        CREATE TRIGGER pets_search_delete AFTER DELETE ON pets
+        BEGIN
+            DELETE FROM pet_search WHERE pet_id = old.id;
+        END
+    """,
+    "pet_parents_search_update": """
+        CREATE TRIGGER pet_parents_search_update AFTER UPDATE OF name ON pet_parents
+        WHEN old.name IS NOT new.name
+        BEGIN
+            UPDATE pet_search SET parent_name = new.name
+            WHERE pet_id IN (SELECT id FROM pets WHERE pet_parent_id = new.id);
+        END
+    """,
+}
+
+POSTGRES_TRIGRAM_INDEXES = [
+    ("ix_pets_name_trgm", "pets", "name"),
+    ("ix_pets_breed_trgm", "pets", "breed"),
+    ("ix_pets_registration_number_trgm", "pets", "registration_number"),
+    ("ix_pet_parents_name_trgm", "pet_parents", "name"),
+]
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_pets_clinic_active_lower_name",
+        "pets",
+        ["clinic_id", sa.text("lower(name)")],
+        sqlite_where=sa.text("deleted_at IS NULL"),
+        postgresql_where=sa.text("deleted_at IS NULL"),
+    )
+    dialect = op.get_bind().dialect.name
+    if dialect == "sqlite":
+        op.execute(
+            """
+            CREATE VIRTUAL TABLE pet_search USING fts5(
+                pet_id UNINDEXED,
+                clinic_id UNINDEXED,
+                name,
+                breed,
+                registration_number,
+                parent_name,
+                tokenize='trigram'
+            )
+            """
+        )
+        # Weight name matches above owner, registration and breed matches.
+        op.execute("INSERT INTO pet_search (pet_search, rank) VALUES ('rank', 'bm25(0, 0, 10.0, 1.0, 5.0, 3.0)')")
+        op.execute(
+            f"""
+            INSERT INTO pet_search ({SEARCH_COLUMNS})
+            SELECT pets.id, pets.clinic_id, pets.name, pets.breed, pets.registration_number, pet_parents.name
+            FROM pets LEFT JOIN pet_parents ON pet_parents.id = pets.pet_parent_id
+            WHERE pets.deleted_at IS NULL
+            """
+        )
+        for ddl in SQLITE_TRIGGERS.values():
+            op.execute(ddl)
+    elif dialect == "postgresql":
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        for name, table, column in POSTGRES_TRIGRAM_INDEXES:
+            op.create_index(
+                name,
+                table,
+                [column],
+                postgresql_using="gin",
+                postgresql_ops={column: "gin_trgm_ops"},
+            )
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == "sqlite":
+        for name in SQLITE_TRIGGERS:
+            op.execute(f"DROP TRIGGER IF EXISTS {name}")
+        op.execute("DROP TABLE IF EXISTS pet_search")
+    elif dialect == "postgresql":
+        for name, table, _column in POSTGRES_TRIGRAM_INDEXES:
+            op.drop_index(name, table_name=table)
+    op.drop_index("ix_pets_clinic_active_lower_name", table_name="pets")
@@ -0,0 +1,63 @@
+"""add indexes backing keyset pagination of list views
+
+Revision ID: 0006_add_keyset_pagination_indexes
+Revises: 0005_add_pet_search_index
+Create Date: 2026-10-17 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0006_add_keyset_pagination_indexes"
+down_revision = "0005_add_pet_search_index"
+branch_labels = None
+depends_on = None
+
+ACTIVE_INDEXES = [
+    ("ix_pets_clinic_active_created", "pets", ["clinic_id", "created_at", "id"]),
+    ("ix_medical_records_clinic_active_visit", "medical_records", ["clinic_id", "visit_date", "id"]),
+    ("ix_invoices_clinic_active_created", "invoices", ["clinic_id", "created_at", "id"]),
+    ("ix_payments_clinic_active_created", "payments", ["clinic_id", "created_at", "id"]),
+    ("ix_inventory_items_clinic_active_name", "inventory_items", ["clinic_id", "name", "id"]),
+]
+
+# Name-sorted lists page on (name, id); widen the 0004 indexes to include the tie-breaker.
+WIDENED_INDEXES = [
+    ("ix_pets_clinic_active_name", "pets", ["clinic_id", "name"], ["clinic_id", "name", "id"]),
+    ("ix_pet_parents_clinic_active_name", "pet_parents", ["clinic_id", "name"], ["clinic_id", "name", "id"]),
+]
+
+LOG_INDEXES = [
+    ("ix_reminder_logs_clinic_created", "reminder_logs", ["clinic_id", "created_at", "id"]),
+    ("ix_message_logs_clinic_created", "message_logs", ["clinic_id", "created_at", "id"]),
+]
+
+
+def create_active_index(name: str, table: str, columns: list[str]) -> None:
+    op.create_index(
+        name,
+        table,
+        columns,
+        sqlite_where=sa.text("deleted_at IS NULL"),
+        postgresql_where=sa.text("deleted_at IS NULL"),
+    )
+
+
+def upgrade() -> None:
+    for name, table, _old_columns, new_columns in WIDENED_INDEXES:
+        op.drop_index(name, table_name=table)
+        create_active_index(name, table, new_columns)
+    for name, table, columns in ACTIVE_INDEXES:
+        create_active_index(name, table, columns)
+    for name, table, columns in LOG_INDEXES:
+        op.create_index(name, table, columns)
+
+
+def downgrade() -> None:
+    for name, table, _columns in reversed(LOG_INDEXES):
+        op.drop_index(name, table_name=table)
+    for name, table, _columns in reversed(ACTIVE_INDEXES):
+        op.drop_index(name, table_name=table)
+    for name, table, old_columns, _new_columns in reversed(WIDENED_INDEXES):
+        op.drop_index(name, table_name=table)
+        create_active_index(name, table, old_columns)
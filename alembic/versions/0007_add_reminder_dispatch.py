@@ -0,0 +1,56 @@
+"""add reminder dispatch bookkeeping
+
+Revision ID: 0007_add_reminder_dispatch
+Revises: 0006_add_keyset_pagination_indexes
+Create Date: 2026-10-17 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0007_add_reminder_dispatch"
+down_revision = "0006_add_keyset_pagination_indexes"
+branch_labels = None
+depends_on = None
+
+ACTIVE_INDEXES = [
+    ("ix_appointments_active_date", "appointments", ["appointment_date", "start_time"]),
+    ("ix_medical_records_active_follow_up", "medical_records", ["follow_up_date"]),
+]
+
+
+def upgrade() -> None:
+    op.add_column("message_logs", sa.Column("dedupe_key", sa.String(), nullable=True))
+    op.add_column(
+        "message_logs",
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"),
+    )
+    op.add_column("message_logs", sa.Column("next_attempt_at", sa.DateTime(), nullable=True))
+    op.add_column("message_logs", sa.Column("last_error", sa.String(), nullable=True))
+    op.add_column("reminder_logs", sa.Column("dedupe_key", sa.String(), nullable=True))
+    op.create_index("ux_message_logs_dedupe_key", "message_logs", ["dedupe_key"], unique=True)
+    op.create_index(
+        "ix_message_logs_status_next_attempt", "message_logs", ["status", "next_attempt_at"]
+    )
+    op.create_index("ux_reminder_logs_dedupe_key", "reminder_logs", ["dedupe_key"], unique=True)
+    for name, table, columns in ACTIVE_INDEXES:
+        op.create_index(
+            name,
+            table,
+            columns,
+            sqlite_where=sa.text("deleted_at IS NULL"),
+            postgresql_where=sa.text("deleted_at IS NULL"),
+        )
+
+
+def downgrade() -> None:
+    for name, table, _columns in reversed(ACTIVE_INDEXES):
+        op.drop_index(name, table_name=table)
+    op.drop_index("ux_reminder_logs_dedupe_key", table_name="reminder_logs")
+    op.drop_index("ix_message_logs_status_next_attempt", table_name="message_logs")
+    op.drop_index("ux_message_logs_dedupe_key", table_name="message_logs")
+    op.drop_column("reminder_logs", "dedupe_key")
+    op.drop_column("message_logs", "last_error")
+    op.drop_column("message_logs", "next_attempt_at")
+    op.drop_column("message_logs", "attempts")
+    op.drop_column("message_logs", "dedupe_key")
@@ -0,0 +1,35 @@
+"""add pet-scoped indexes backing the pet timeline
+
+Revision ID: 0008_add_pet_timeline_indexes
+Revises: 0007_add_reminder_dispatch
+Create Date: 2026-10-17 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0008_add_pet_timeline_indexes"
+down_revision = "0007_add_reminder_dispatch"
+branch_labels = None
+depends_on = None
+
+ACTIVE_INDEXES = [
+    ("ix_invoices_pet_active_created", "invoices", ["pet_id", "created_at"]),
+    ("ix_payments_invoice_active_created", "payments", ["invoice_id", "created_at"]),
+]
+
+
+def upgrade() -> None:
+    for name, table, columns in ACTIVE_INDEXES:
+        op.create_index(
+            name,
+            table,
+            columns,
+            sqlite_where=sa.text("deleted_at IS NULL"),
+            postgresql_where=sa.text("deleted_at IS NULL"),
+        )
+
+
+def downgrade() -> None:
+    for name, table, _columns in reversed(ACTIVE_INDEXES):
+        op.drop_index(name, table_name=table)
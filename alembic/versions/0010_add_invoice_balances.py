@@ -0,0 +1,79 @@
+"""add maintained paid and outstanding balances to invoices
+
+Revision ID: 0010_add_invoice_balances
+Revises: 0009_add_daily_rollups
+Create Date: 2026-10-17 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0010_add_invoice_balances"
+down_revision = "0009_add_daily_rollups"
+branch_labels = None
+depends_on = None
+
+ACTIVE_INDEXES = [
+    (
+        "ix_invoices_clinic_active_receivables",
+        "invoices",
+        ["clinic_id", "status", "outstanding_amount", "created_at"],
+    ),
+]
+
+
+def upgrade() -> None:
+    op.add_column(
+        "invoices",
+        sa.Column("paid_amount", sa.Numeric(10, 2), nullable=False, server_default="0"),
+    )
+    op.add_column(
+        "invoices",
+        sa.Column("outstanding_amount", sa.Numeric(10, 2), nullable=False, server_default="0"),
+    )
+    op.execute(
+        """
+        UPDATE invoices SET paid_amount = COALESCE(
+            (
+                SELECT SUM(payments.amount) FROM payments
+                WHERE payments.invoice_id = invoices.id
+                AND payments.status = 'paid'
+                AND payments.deleted_at IS NULL
+            ),
+            0
+        )
+        """
+    )
+    # Before balances existed, marking an invoice paid by hand was the only way to settle it.
+    op.execute(
+        """
+        UPDATE invoices SET outstanding_amount = CASE
+            WHEN status = 'paid' THEN 0
+            ELSE total_amount - paid_amount
+        END
+        """
+    )
+    for name, table, columns in ACTIVE_INDEXES:
+        op.create_index(
+            name,
+            table,
+            columns,
+            sqlite_where=sa.text("deleted_at IS NULL"),
+            postgresql_where=sa.text("deleted_at IS NULL"),
+        )
+    # The receivables index leads with (clinic_id, status), so it serves these lookups too.
+    op.drop_index("ix_invoices_clinic_active_status", table_name="invoices")
+
+
+def downgrade() -> None:
+    op.create_index(
+        "ix_invoices_clinic_active_status",
+        "invoices",
+        ["clinic_id", "status"],
+        sqlite_where=sa.text("deleted_at IS NULL"),
+        postgresql_where=sa.text("deleted_at IS NULL"),
+    )
+    for name, table, _columns in reversed(ACTIVE_INDEXES):
+        op.drop_index(name, table_name=table)
+    op.drop_column("invoices", "outstanding_amount")
+    op.drop_column("invoices", "paid_amount")
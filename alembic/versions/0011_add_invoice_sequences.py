@@ -0,0 +1,80 @@
+"""add per-clinic invoice number sequences
+
+Revision ID: 0011_add_invoice_sequences
+Revises: 0010_add_invoice_balances
+Create Date: 2026-10-17 00:00:00.000000
+"""
+
+import logging
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0011_add_invoice_sequences"
+down_revision = "0010_add_invoice_balances"
+branch_labels = None
+depends_on = None
+
+logger = logging.getLogger("alembic.runtime.migration")
+
+
+def renumber_duplicates(bind) -> None:
+    # Hand-typed numbers could repeat before this index existed. The oldest invoice keeps
+    # its number and later ones get a suffix, so upgrading never blocks the app from starting.
+    duplicates = bind.execute(
+        sa.text(
+            "SELECT clinic_id, invoice_number FROM invoices WHERE deleted_at IS NULL "
+            "GROUP BY clinic_id, invoice_number HAVING COUNT(*) > 1"
+        )
+    ).all()
+    for clinic_id, invoice_number in duplicates:
+        invoice_ids = bind.execute(
+            sa.text(
+                "SELECT id FROM invoices WHERE clinic_id = :clinic_id AND invoice_number = :number "
+                "AND deleted_at IS NULL ORDER BY created_at, id"
+            ),
+            {"clinic_id": clinic_id, "number": invoice_number},
+        ).scalars().all()
+        suffix = 1
+        for invoice_id in invoice_ids[1:]:
+            while True:
+                suffix += 1
+                renumbered = f"{invoice_number}-{suffix}"
+                taken = bind.execute(
+                    sa.text(
+                        "SELECT 1 FROM invoices WHERE clinic_id = :clinic_id AND invoice_number = :number "
+                        "AND deleted_at IS NULL"
+                    ),
+                    {"clinic_id": clinic_id, "number": renumbered},
+                ).first()
+                if not taken:
+                    break
+            bind.execute(
+                sa.text("UPDATE invoices SET invoice_number = :number WHERE id = :id"),
+                {"number": renumbered, "id": invoice_id},
+            )
+            logger.warning("renumbered duplicate invoice %s in clinic %s to %s", invoice_number, clinic_id, renumbered)
+
+
+def upgrade() -> None:
+    op.create_table(
+        "invoice_sequences",
+        sa.Column("clinic_id", sa.String(), sa.ForeignKey("clinics.id"), primary_key=True),
+        sa.Column("period", sa.String(), primary_key=True),
+        sa.Column("last_number", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+    )
+    renumber_duplicates(op.get_bind())
+    op.create_index(
+        "ux_invoices_clinic_number",
+        "invoices",
+        ["clinic_id", "invoice_number"],
+        unique=True,
+        sqlite_where=sa.text("deleted_at IS NULL"),
+        postgresql_where=sa.text("deleted_at IS NULL"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ux_invoices_clinic_number", table_name="invoices")
+    op.drop_table("invoice_sequences")
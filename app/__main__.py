@@ -1,18 +1,89 @@
+import argparse
+import logging
 import os
 
 import uvicorn
-from alembic import command
 from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy import create_engine
+from sqlalchemy.pool import NullPool
+
+from app.db import DB_URL
+
+logger = logging.getLogger("app")
+
+
+def schema_at_head(alembic_cfg: Config) -> bool:
+    # Reads alembic_version and the script headers only; env.py and app.models stay unloaded.
+    heads = set(ScriptDirectory.from_config(alembic_cfg).get_heads())
+    engine = create_engine(DB_URL, poolclass=NullPool)
+    try:
+        with engine.connect() as connection:
+            current = set(MigrationContext.configure(connection).get_current_heads())
+    finally:
+        engine.dispose()
+    return current == heads
 
 
 def run_migrations() -> None:
     alembic_cfg = Config("alembic.ini")
+    alembic_cfg.set_main_option("sqlalchemy.url", DB_URL.replace("%", "%%"))
+    if schema_at_head(alembic_cfg):
+        logger.info("Database schema is at head; skipping migrations.")
+        return
+    from alembic import command
+
     command.upgrade(alembic_cfg, "head")
 
 
-def main() -> None:
-    run_migrations()
-    uvicorn.run("app.main:app", host="127.0.0.1", port=int(os.getenv("PORT", "8000")), reload=False)
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m app")
+    parser.add_argument("--host", default=os.getenv("HOST", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8000")))
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=int(os.getenv("WEB_CONCURRENCY", "1")),
+        help="worker processes sharing the listening socket; 0 means one per CPU",
+    )
+    parser.add_argument("--backlog", type=int, default=int(os.getenv("BACKLOG", "2048")))
+    parser.add_argument("--keep-alive", type=int, default=int(os.getenv("KEEP_ALIVE_SECONDS", "5")))
+    parser.add_argument(
+        "--graceful-timeout", type=int, default=int(os.getenv("GRACEFUL_TIMEOUT_SECONDS", "30"))
+    )
+    parser.add_argument(
+        "--max-requests",
+        type=int,
+        default=int(os.getenv("MAX_REQUESTS_PER_WORKER", "0")),
+        help="restart a worker after this many requests; 0 disables",
+    )
+    parser.add_argument("--proxy-headers", action="store_true", default=os.getenv("PROXY_HEADERS") == "1")
+    parser.add_argument("--skip-migrations", action="store_true")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> None:
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    # Migrate once in the parent so workers never race each other on the schema.
+    if not args.skip_migrations:
+        run_migrations()
+    workers = args.workers or os.cpu_count() or 1
+    # Workers inherit the environment; app.main sizes its auth cache TTL from this.
+    os.environ["WEB_CONCURRENCY"] = str(workers)
+    uvicorn.run(
+        "app.main:app",
+        host=args.host,
+        port=args.port,
+        workers=workers,
+        backlog=args.backlog,
+        timeout_keep_alive=args.keep_alive,
+        timeout_graceful_shutdown=args.graceful_timeout,
+        limit_max_requests=args.max_requests or None,
+        proxy_headers=args.proxy_headers,
+        reload=False,
+    )
 
 
 if __name__ == "__main__":
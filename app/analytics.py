@@ -0,0 +1,287 @@
+import argparse
+import datetime as dt
+from decimal import Decimal
+from typing import Iterable, Optional
+
+from sqlalchemy import delete, event, func, inspect
+from sqlalchemy.orm import Session as ORMSession
+from sqlmodel import Session, select
+
+from app.models import (
+    Appointment,
+    AppointmentStatus,
+    DailyRollup,
+    Invoice,
+    InvoiceStatus,
+    Payment,
+    PaymentMethod,
+    PaymentStatus,
+    Pet,
+)
+
+INVOICED_STATUSES = (InvoiceStatus.issued, InvoiceStatus.paid)
+COUNT_COLUMNS = (
+    *(f"visits_{status.value}" for status in AppointmentStatus),
+    "invoices_count",
+    "new_pets",
+)
+AMOUNT_COLUMNS = (
+    "invoiced_amount",
+    "gst_amount",
+    *(f"collected_{method.value}" for method in PaymentMethod),
+)
+# Columns that place a row on a day or change what it contributes to that day; edits to
+# anything else (notes, names) leave the rollups alone.
+ROLLUP_FIELDS = {
+    Appointment: ("clinic_id", "appointment_date", "status", "deleted_at"),
+    Invoice: ("clinic_id", "created_at", "status", "total_amount", "gst_amount", "deleted_at"),
+    Payment: ("clinic_id", "created_at", "status", "amount", "payment_method", "deleted_at"),
+    Pet: ("clinic_id", "created_at", "deleted_at"),
+}
+ROLLUP_DAY_FIELDS = {
+    Appointment: "appointment_date",
+    Invoice: "created_at",
+    Payment: "created_at",
+    Pet: "created_at",
+}
+
+
+def empty_rollup() -> dict:
+    return {
+        **{name: 0 for name in COUNT_COLUMNS},
+        **{name: Decimal("0.00") for name in AMOUNT_COLUMNS},
+    }
+
+
+def as_day(value) -> dt.date:
+    if isinstance(value, dt.datetime):
+        return value.date()
+    if isinstance(value, dt.date):
+        return value
+    return dt.date.fromisoformat(str(value)[:10])
+
+
+def as_amount(value) -> Decimal:
+    return Decimal(str(value)).quantize(Decimal("0.01"))
+
+
+def day_bounds(start: dt.date, end: dt.date) -> tuple[dt.datetime, dt.datetime]:
+    return dt.datetime.combine(start, dt.time.min), dt.datetime.combine(end + dt.timedelta(days=1), dt.time.min)
+
+
+def for_clinic(stmt, column, clinic_id: Optional[str]):
+    return stmt if clinic_id is None else stmt.where(column == clinic_id)
+
+
+def rollup_statements(start: dt.date, end: dt.date, clinic_id: Optional[str] = None):
+    # Each source is grouped on the same (clinic, day) range scan its clinic index already serves.
+    lower, upper = day_bounds(start, end)
+    visits = select(
+        Appointment.clinic_id, Appointment.appointment_date, Appointment.status, func.count()
+    ).where(
+        Appointment.deleted_at.is_(None),
+        Appointment.appointment_date >= start,
+        Appointment.appointment_date <= end,
+    )
+    invoice_day = func.date(Invoice.created_at)
+    invoices = select(
+        Invoice.clinic_id,
+        invoice_day,
+        func.count(),
+        func.coalesce(func.sum(Invoice.total_amount), 0),
+        func.coalesce(func.sum(Invoice.gst_amount), 0),
+    ).where(
+        Invoice.deleted_at.is_(None),
+        Invoice.status.in_(INVOICED_STATUSES),
+        Invoice.created_at >= lower,
+        Invoice.created_at < upper,
+    )
+    payment_day = func.date(Payment.created_at)
+    payments = select(
+        Payment.clinic_id, payment_day, Payment.payment_method, func.coalesce(func.sum(Payment.amount), 0)
+    ).where(
+        Payment.deleted_at.is_(None),
+        Payment.status == PaymentStatus.paid,
+        Payment.created_at >= lower,
+        Payment.created_at < upper,
+    )
+    pet_day = func.date(Pet.created_at)
+    pets = select(Pet.clinic_id, pet_day, func.count()).where(
+        Pet.deleted_at.is_(None),
+        Pet.created_at >= lower,
+        Pet.created_at < upper,
+    )
+    return {
+        "visits": for_clinic(visits, Appointment.clinic_id, clinic_id).group_by(
+            Appointment.clinic_id, Appointment.appointment_date, Appointment.status
+        ),
+        "invoices": for_clinic(invoices, Invoice.clinic_id, clinic_id).group_by(Invoice.clinic_id, invoice_day),
+        "payments": for_clinic(payments, Payment.clinic_id, clinic_id).group_by(
+            Payment.clinic_id, payment_day, Payment.payment_method
+        ),
+        "pets": for_clinic(pets, Pet.clinic_id, clinic_id).group_by(Pet.clinic_id, pet_day),
+    }
+
+
+def compute_rollups(connection, start: dt.date, end: dt.date, clinic_id: Optional[str] = None) -> dict:
+    statements = rollup_statements(start, end, clinic_id)
+    rollups: dict[tuple[str, dt.date], dict] = {}
+
+    def rollup(row_clinic_id: str, day) -> dict:
+        key = (row_clinic_id, as_day(day))
+        if key not in rollups:
+            rollups[key] = empty_rollup()
+        return rollups[key]
+
+    for row_clinic_id, day, status, count in connection.execute(statements["visits"]):
+        rollup(row_clinic_id, day)[f"visits_{AppointmentStatus(status).value}"] = count
+    for row_clinic_id, day, count, total, gst in connection.execute(statements["invoices"]):
+        values = rollup(row_clinic_id, day)
+        values["invoices_count"] = count
+        values["invoiced_amount"] = as_amount(total)
+        values["gst_amount"] = as_amount(gst)
+    for row_clinic_id, day, method, amount in connection.execute(statements["payments"]):
+        rollup(row_clinic_id, day)[f"collected_{PaymentMethod(method).value}"] = as_amount(amount)
+    for row_clinic_id, day, count in connection.execute(statements["pets"]):
+        rollup(row_clinic_id, day)["new_pets"] = count
+    return rollups
+
+
+def upsert_statement(dialect_name: str):
+    if dialect_name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    stmt = insert(DailyRollup.__table__)
+    # Concurrent writers touching the same day both land on one row instead of a key conflict.
+    return stmt.on_conflict_do_update(
+        index_elements=["clinic_id", "day"],
+        set_={name: stmt.excluded[name] for name in (*COUNT_COLUMNS, *AMOUNT_COLUMNS, "updated_at")},
+    )
+
+
+def write_rollups(connection, rollups: dict) -> None:
+    if not rollups:
+        return
+    now = dt.datetime.utcnow()
+    connection.execute(
+        upsert_statement(connection.dialect.name),
+        [
+            {"clinic_id": clinic_id, "day": day, **values, "updated_at": now}
+            for (clinic_id, day), values in sorted(rollups.items())
+        ],
+    )
+
+
+def refresh_daily_rollups(connection, keys: Iterable[tuple[str, dt.date]]) -> None:
+    rollups = {}
+    for clinic_id, day in sorted(set(keys)):
+        computed = compute_rollups(connection, day, day, clinic_id)
+        # A day whose last row went away is written back as zeros rather than left stale.
+        rollups[(clinic_id, day)] = computed.get((clinic_id, day), empty_rollup())
+    write_rollups(connection, rollups)
+
+
+def rebuild_daily_rollups(connection, start: dt.date, end: dt.date, clinic_id: Optional[str] = None) -> int:
+    stale = delete(DailyRollup).where(DailyRollup.day >= start, DailyRollup.day <= end)
+    connection.execute(stale if clinic_id is None else stale.where(DailyRollup.clinic_id == clinic_id))
+    rollups = compute_rollups(connection, start, end, clinic_id)
+    write_rollups(connection, rollups)
+    return len(rollups)
+
+
+def source_day_range(connection) -> Optional[tuple[dt.date, dt.date]]:
+    spans = [
+        select(func.min(Appointment.appointment_date), func.max(Appointment.appointment_date)).where(
+            Appointment.deleted_at.is_(None)
+        ),
+        *(
+            select(func.min(model.created_at), func.max(model.created_at)).where(model.deleted_at.is_(None))
+            for model in (Invoice, Payment, Pet)
+        ),
+    ]
+    days = [as_day(value) for stmt in spans for value in connection.execute(stmt).one() if value is not None]
+    return (min(days), max(days)) if days else None
+
+
+def rebuild_all_daily_rollups(connection) -> int:
+    day_range = source_day_range(connection)
+    return rebuild_daily_rollups(connection, *day_range) if day_range else 0
+
+
+def touched_days(obj) -> set[tuple[str, dt.date]]:
+    state = inspect(obj)
+    fields = ROLLUP_FIELDS[type(obj)]
+    if state.persistent and not state.deleted and not any(state.attrs[name].history.has_changes() for name in fields):
+        return set()
+    clinic_history = state.attrs.clinic_id.history
+    day_history = state.attrs[ROLLUP_DAY_FIELDS[type(obj)]].history
+    # Moving a row to another day (or clinic) changes the old day's totals as well as the new one's.
+    clinic_ids = {*clinic_history.sum()} - {None}
+    days = {as_day(value) for value in day_history.sum() if value is not None}
+    return {(clinic_id, day) for clinic_id in clinic_ids for day in days}
+
+
+@event.listens_for(ORMSession, "after_flush")
+def refresh_rollups_after_flush(session: ORMSession, flush_context) -> None:
+    keys = set()
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if type(obj) in ROLLUP_FIELDS:
+            keys |= touched_days(obj)
+    if keys:
+        # Same connection and transaction as the write, so the rollup commits or rolls back with it.
+        refresh_daily_rollups(session.connection(), keys)
+
+
+def month_start(day: dt.date) -> dt.date:
+    return day.replace(day=1)
+
+
+def load_rollups(session: Session, clinic_id: str, start: dt.date, end: dt.date) -> list[DailyRollup]:
+    return session.exec(
+        select(DailyRollup)
+        .where(DailyRollup.clinic_id == clinic_id, DailyRollup.day >= start, DailyRollup.day <= end)
+        .order_by(DailyRollup.day)
+    ).all()
+
+
+def summarize_rollups(rollups: Iterable[DailyRollup], period: str = "day") -> list[dict]:
+    periods: dict[dt.date, dict] = {}
+    for rollup in rollups:
+        key = month_start(rollup.day) if period == "month" else rollup.day
+        values = periods.setdefault(key, empty_rollup())
+        for name in (*COUNT_COLUMNS, *AMOUNT_COLUMNS):
+            values[name] += getattr(rollup, name)
+    summary = []
+    for key, values in sorted(periods.items()):
+        collected = sum((values[f"collected_{method.value}"] for method in PaymentMethod), Decimal("0.00"))
+        visits = sum(values[f"visits_{status.value}"] for status in AppointmentStatus)
+        summary.append({"period": key.isoformat(), **values, "visits": visits, "collected_amount": collected})
+    return summary
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m app.analytics",
+        description="Rebuild the daily analytics rollups from invoices, payments, appointments and pets.",
+    )
+    parser.add_argument("--start", type=dt.date.fromisoformat, help="defaults to --days before --end")
+    parser.add_argument("--end", type=dt.date.fromisoformat, help="defaults to today")
+    parser.add_argument("--days", type=int, default=7, help="window to rebuild when --start is omitted")
+    parser.add_argument("--clinic-id", help="defaults to every clinic")
+    parser.add_argument("--all", action="store_true", help="rebuild every day that has source rows")
+    args = parser.parse_args(argv)
+
+    from app.db import engine
+
+    end = args.end or dt.date.today()
+    start = args.start or end - dt.timedelta(days=args.days)
+    with engine.begin() as connection:
+        if args.all:
+            start, end = source_day_range(connection) or (end, end)
+        rows = rebuild_daily_rollups(connection, start, end, args.clinic_id)
+    print(f"rebuilt {rows} daily rollups from {start} to {end}")
+
+
+if __name__ == "__main__":
+    main()
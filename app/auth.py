@@ -1,23 +1,101 @@
+import asyncio
 import os
+import threading
 import time
-from typing import Optional
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
+from typing import Callable, Optional
 
 import jwt
-from passlib.context import CryptContext
 
 JWT_SECRET = os.getenv("JWT_SECRET", "dev-secret-change-me")
 JWT_ALG = "HS256"
 JWT_TTL_SECONDS = 60 * 60 * 8
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+PASSWORD_HASH_QUEUE_LIMIT = int(os.getenv("PASSWORD_HASH_QUEUE_LIMIT", "32"))
+
+
+@lru_cache(maxsize=1)
+def password_context():
+    # passlib is only needed once someone signs in, so workers boot without it.
+    from passlib.context import CryptContext
+
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+
+# bcrypt gets its own threads so a burst of logins cannot occupy the request threadpool;
+# the semaphore caps running plus queued jobs and rejects the rest.
+password_executor = ThreadPoolExecutor(
+    max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash"
+)
+password_slots = threading.BoundedSemaphore(PASSWORD_HASH_WORKERS + PASSWORD_HASH_QUEUE_LIMIT)
+password_metrics_lock = threading.Lock()
+password_metrics = {
+    "submitted": 0,
+    "completed": 0,
+    "rejected": 0,
+    "in_flight": 0,
+    "queue_seconds_total": 0.0,
+    "run_seconds_total": 0.0,
+}
+
+
+class PasswordHashBusy(Exception):
+    pass
+
+
+def record_password_metric(**deltas) -> None:
+    with password_metrics_lock:
+        for name, delta in deltas.items():
+            password_metrics[name] += delta
+
+
+def password_hash_metrics() -> dict:
+    with password_metrics_lock:
+        return dict(password_metrics)
+
+
+def submit_password_job(fn: Callable, *args) -> Future:
+    if not password_slots.acquire(blocking=False):
+        record_password_metric(rejected=1)
+        raise PasswordHashBusy()
+    record_password_metric(submitted=1, in_flight=1)
+    queued_at = time.perf_counter()
+
+    def run():
+        started_at = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            record_password_metric(
+                completed=1,
+                in_flight=-1,
+                queue_seconds_total=started_at - queued_at,
+                run_seconds_total=time.perf_counter() - started_at,
+            )
+            password_slots.release()
+
+    try:
+        return password_executor.submit(run)
+    except RuntimeError:
+        record_password_metric(in_flight=-1)
+        password_slots.release()
+        raise
 
 
 def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
+    return submit_password_job(password_context().hash, password).result()
+
+
+async def hash_password_async(password: str) -> str:
+    return await asyncio.wrap_future(submit_password_job(password_context().hash, password))
 
 
-def verify_password(password: str, password_hash: str) -> bool:
-    return pwd_context.verify(password, password_hash)
+async def verify_password_async(password: str, password_hash: str) -> bool:
+    return await asyncio.wrap_future(
+        submit_password_job(password_context().verify, password, password_hash)
+    )
 
 
 def create_token(user_id: str, clinic_id: str, role: str) -> str:
@@ -0,0 +1,39 @@
+import datetime as dt
+import os
+from typing import Iterable
+
+CLINIC_OPEN_TIME = dt.time.fromisoformat(os.getenv("CLINIC_OPEN_TIME", "09:00"))
+CLINIC_CLOSE_TIME = dt.time.fromisoformat(os.getenv("CLINIC_CLOSE_TIME", "18:00"))
+DEFAULT_SLOT_MINUTES = 30
+MAX_AVAILABILITY_DAYS = 31
+
+
+def minutes(value: dt.time) -> int:
+    return value.hour * 60 + value.minute
+
+
+def as_time(value: int) -> dt.time:
+    return dt.time(value // 60, value % 60)
+
+
+def free_intervals(
+    busy: Iterable[tuple[dt.time, dt.time]],
+    slot_minutes: int,
+    open_time: dt.time = CLINIC_OPEN_TIME,
+    close_time: dt.time = CLINIC_CLOSE_TIME,
+) -> list[tuple[dt.time, dt.time]]:
+    # busy must be sorted by start time; one pass tracks the end of the latest booking.
+    close = minutes(close_time)
+    cursor = minutes(open_time)
+    free = []
+    for start, end in busy:
+        start_minutes = minutes(start)
+        if start_minutes >= close:
+            break
+        if start_minutes - cursor >= slot_minutes:
+            free.append((as_time(cursor), as_time(start_minutes)))
+        end_minutes = minutes(end) + (1 if end.second or end.microsecond else 0)
+        cursor = max(cursor, end_minutes)
+    if close - cursor >= slot_minutes:
+        free.append((as_time(cursor), as_time(close)))
+    return free
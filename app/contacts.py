@@ -0,0 +1,25 @@
+import json
+from typing import Optional
+
+
+def parse_contact_blob(value: Optional[str]) -> dict:
+    if not value:
+        return {}
+    try:
+        parsed = json.loads(value)
+        return parsed if isinstance(parsed, dict) else {}
+    except json.JSONDecodeError:
+        return {}
+
+
+def build_contact_blob(
+    whatsapp_number: str,
+    emergency_contact_name: str,
+    emergency_contact_phone: str,
+) -> str:
+    payload = {
+        "whatsapp_number": whatsapp_number or "",
+        "emergency_contact_name": emergency_contact_name or "",
+        "emergency_contact_phone": emergency_contact_phone or "",
+    }
+    return json.dumps(payload)
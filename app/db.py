@@ -1,12 +1,105 @@
 import os
+import time
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import create_async_engine
 from sqlmodel import Session, SQLModel, create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.metrics import record_query
 
 DB_URL = os.getenv("DATABASE_URL", "sqlite:///./vms.db")
 
-connect_args = {"check_same_thread": False} if DB_URL.startswith("sqlite") else {}
-engine = create_engine(DB_URL, echo=False, connect_args=connect_args)
+ASYNC_DRIVERS = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg"}
+
+SQLITE_PRAGMAS = {
+    "journal_mode": os.getenv("SQLITE_JOURNAL_MODE", "WAL"),
+    "synchronous": os.getenv("SQLITE_SYNCHRONOUS", "NORMAL"),
+    "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000")),
+    "mmap_size": int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024))),
+    # Negative cache_size is in KiB, so the default is a 64 MiB page cache per connection.
+    "cache_size": int(os.getenv("SQLITE_CACHE_SIZE", "-65536")),
+}
+
+
+def engine_options(url: str) -> dict:
+    options = {
+        "pool_size": int(os.getenv("DB_POOL_SIZE", "5")),
+        "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "10")),
+        "pool_timeout": float(os.getenv("DB_POOL_TIMEOUT", "30")),
+        "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", "1800")),
+    }
+    if url.startswith("sqlite"):
+        options["connect_args"] = {"check_same_thread": False}
+        options["pool_pre_ping"] = os.getenv("DB_POOL_PRE_PING", "0") == "1"
+        if ":memory:" in url or url in ("sqlite://", "sqlite:///"):
+            return {"connect_args": options["connect_args"]}
+    else:
+        options["pool_pre_ping"] = os.getenv("DB_POOL_PRE_PING", "1") == "1"
+    return options
+
+
+def async_url(url: str) -> str:
+    scheme, separator, rest = url.partition("://")
+    return f"{ASYNC_DRIVERS.get(scheme.split('+')[0], scheme)}{separator}{rest}"
+
+
+def install_sqlite_pragmas(engine, pragmas: dict) -> None:
+    @event.listens_for(engine, "connect")
+    def apply_sqlite_pragmas(dbapi_connection, _connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+
+def install_query_metrics(engine) -> None:
+    @event.listens_for(engine, "before_cursor_execute")
+    def start_query_timer(conn, _cursor, _statement, _parameters, _context, _executemany):
+        conn.info["query_started_at"] = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def record_query_time(conn, _cursor, statement, parameters, _context, _executemany):
+        record_query(statement, parameters, time.perf_counter() - conn.info["query_started_at"])
+
+
+def insert_ignoring_duplicates(dialect_name: str, model, index_elements: list[str]):
+    if dialect_name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(model.__table__).on_conflict_do_nothing(index_elements=index_elements)
+
+
+def make_engine(url: str = DB_URL, sqlite_pragmas: Optional[dict] = None):
+    engine = create_engine(url, echo=False, **engine_options(url))
+    if engine.dialect.name == "sqlite":
+        install_sqlite_pragmas(engine, SQLITE_PRAGMAS if sqlite_pragmas is None else sqlite_pragmas)
+    return engine
+
+
+def make_async_engine(url: Optional[str] = None, sqlite_pragmas: Optional[dict] = None):
+    url = url or os.getenv("ASYNC_DATABASE_URL", async_url(DB_URL))
+    engine = create_async_engine(url, echo=False, **engine_options(url))
+    if engine.dialect.name == "sqlite":
+        install_sqlite_pragmas(
+            engine.sync_engine, SQLITE_PRAGMAS if sqlite_pragmas is None else sqlite_pragmas
+        )
+    return engine
+
+
+engine = make_engine()
+async_engine = make_async_engine()
+install_query_metrics(engine)
+install_query_metrics(async_engine.sync_engine)
 
 
 def get_session():
     with Session(engine) as session:
         yield session
+
+
+async def get_async_session():
+    async with AsyncSession(async_engine, expire_on_commit=False) as session:
+        yield session
@@ -0,0 +1,129 @@
+import datetime as dt
+import sys
+
+from sqlalchemy.engine import Connection, Engine
+from sqlmodel import select
+
+from app.analytics import rollup_statements
+from app.db import engine
+from app.invoice_numbers import next_number_statement, number_taken_statement
+from app.main import (
+    dashboard_counts_statement,
+    overlaps_statement,
+    pets_list_sort_columns,
+    pets_list_statement,
+    receivables_aging_statement,
+)
+from app.pagination import encode_cursor, keyset_paginate
+from app.timeline import pet_timeline_statement
+
+PROBE_CLINIC_ID = "explain-check"
+ACTIVE_PET_INDEXES = (
+    "ix_pets_clinic_active_name",
+    "ix_pets_clinic_active_lower_name",
+    "ix_pets_clinic_active_created",
+)
+
+
+def pets_list_page(sort=None, cursor=None):
+    return keyset_paginate(
+        pets_list_statement(PROBE_CLINIC_ID),
+        pets_list_sort_columns(sort),
+        cursor,
+    )
+
+
+def pet_timeline_page(dialect_name: str):
+    timeline = pet_timeline_statement(dialect_name, PROBE_CLINIC_ID, "explain-pet")
+    return keyset_paginate(
+        select(*timeline.c), [timeline.c.occurred_at, timeline.c.id], descending=True
+    )
+
+
+def planned_queries(dialect_name: str = engine.dialect.name) -> list[tuple[str, object, tuple[str, ...]]]:
+    today = dt.date.today()
+    dashboard = dashboard_counts_statement(PROBE_CLINIC_ID, today)
+    timeline = pet_timeline_page(dialect_name)
+    rollups = rollup_statements(today, today, PROBE_CLINIC_ID)
+    return [
+        ("dashboard.pets_count", dashboard, ACTIVE_PET_INDEXES),
+        ("dashboard.appointments_today", dashboard, ("ix_appointments_clinic_active_date",)),
+        ("dashboard.pending_invoices", dashboard, ("ix_invoices_clinic_active_receivables",)),
+        ("dashboard.low_stock_items", dashboard, ("ix_inventory_items_clinic_active_stock",)),
+        ("pets_list", pets_list_page(), ("ix_pets_clinic_active_created",)),
+        (
+            "pets_list.next_page",
+            pets_list_page(cursor=encode_cursor([dt.datetime(2000, 1, 1), ""])),
+            ("ix_pets_clinic_active_created",),
+        ),
+        ("pets_list.sort_name", pets_list_page(sort="name"), ("ix_pets_clinic_active_name",)),
+        (
+            "get_overlaps",
+            overlaps_statement(
+                PROBE_CLINIC_ID,
+                "explain-vet",
+                today,
+                dt.time(10, 0),
+                dt.time(10, 30),
+                exclude_id="explain-appt",
+            ),
+            ("ix_appointments_vet_active_slot",),
+        ),
+        ("pet_timeline.appointments", timeline, ("ix_appointments_pet_active_date",)),
+        ("pet_timeline.medical_records", timeline, ("ix_medical_records_clinic_active_pet",)),
+        ("pet_timeline.invoices", timeline, ("ix_invoices_pet_active_created",)),
+        ("pet_timeline.payments", timeline, ("ix_payments_invoice_active_created",)),
+        (
+            "receivables_aging",
+            receivables_aging_statement(PROBE_CLINIC_ID, today),
+            ("ix_invoices_clinic_active_receivables",),
+        ),
+        (
+            "allocate_invoice_number",
+            next_number_statement(PROBE_CLINIC_ID, "2026-27"),
+            ("sqlite_autoindex_invoice_sequences_1", "invoice_sequences_pkey"),
+        ),
+        (
+            "invoice_number_taken",
+            number_taken_statement(PROBE_CLINIC_ID, "INV/2026-27/00001"),
+            ("ux_invoices_clinic_number",),
+        ),
+        ("daily_rollups.visits", rollups["visits"], ("ix_appointments_clinic_active_date",)),
+        ("daily_rollups.invoices", rollups["invoices"], ("ix_invoices_clinic_active_created",)),
+        ("daily_rollups.payments", rollups["payments"], ("ix_payments_clinic_active_created",)),
+        ("daily_rollups.new_pets", rollups["pets"], ("ix_pets_clinic_active_created",)),
+    ]
+
+
+def explain(connection: Connection, stmt) -> str:
+    compiled = stmt.compile(dialect=connection.dialect, compile_kwargs={"literal_binds": True})
+    prefix = "EXPLAIN QUERY PLAN " if connection.dialect.name == "sqlite" else "EXPLAIN "
+    rows = connection.exec_driver_sql(prefix + str(compiled)).all()
+    return "\n".join(" ".join(str(value) for value in row) for row in rows)
+
+
+def run_checks(bind: Engine = engine) -> list[str]:
+    failures = []
+    with bind.connect() as connection:
+        if connection.dialect.name == "postgresql":
+            # Empty or tiny tables make a sequential scan look cheapest; we only care
+            # that the planner can use the index for this shape of query.
+            connection.exec_driver_sql("SET enable_seqscan = off")
+        for name, stmt, index_names in planned_queries(connection.dialect.name):
+            plan = explain(connection, stmt)
+            if not any(index_name in plan for index_name in index_names):
+                failures.append(f"{name}: expected {' or '.join(index_names)}\n{plan}")
+    return failures
+
+
+def main() -> None:
+    failures = run_checks()
+    for failure in failures:
+        print(f"FAIL {failure}")
+    if failures:
+        sys.exit(1)
+    print(f"OK: {len(planned_queries())} queries use their indexes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+import csv
+import datetime as dt
+import io
+from enum import Enum
+from typing import Iterator, Optional
+
+from sqlalchemy.orm import aliased
+from sqlmodel import Session, select
+
+from app.db import engine
+from app.models import Invoice, MedicalRecord, Payment, Pet, PetParent, User, UserRole
+
+EXPORT_BATCH_SIZE = 500
+
+INVOICE_COLUMNS = [
+    "invoice_number",
+    "created_at",
+    "status",
+    "pet",
+    "pet_parent",
+    "total_amount",
+    "gst_amount",
+    "paid_amount",
+    "outstanding_amount",
+    "invoice_id",
+]
+PAYMENT_COLUMNS = [
+    "created_at",
+    "invoice_number",
+    "payment_method",
+    "amount",
+    "status",
+    "reference_id",
+    "payment_id",
+]
+MEDICAL_RECORD_COLUMNS = [
+    "visit_date",
+    "pet",
+    "vet",
+    "symptoms",
+    "diagnosis",
+    "prescription",
+    "follow_up_date",
+    "record_id",
+]
+
+
+def day_bounds(start: Optional[dt.date], end: Optional[dt.date]):
+    start_at = dt.datetime.combine(start, dt.time.min) if start else None
+    end_at = dt.datetime.combine(end + dt.timedelta(days=1), dt.time.min) if end else None
+    return start_at, end_at
+
+
+def invoices_export_statement(
+    clinic_id: str,
+    start: Optional[dt.date] = None,
+    end: Optional[dt.date] = None,
+    status: Optional[str] = None,
+):
+    stmt = (
+        select(
+            Invoice.invoice_number,
+            Invoice.created_at,
+            Invoice.status,
+            Pet.name,
+            PetParent.name,
+            Invoice.total_amount,
+            Invoice.gst_amount,
+            Invoice.paid_amount,
+            Invoice.outstanding_amount,
+            Invoice.id,
+        )
+        .outerjoin(Pet, Pet.id == Invoice.pet_id)
+        .outerjoin(PetParent, PetParent.id == Pet.pet_parent_id)
+        .where(Invoice.clinic_id == clinic_id, Invoice.deleted_at.is_(None))
+        .order_by(Invoice.created_at, Invoice.id)
+    )
+    start_at, end_at = day_bounds(start, end)
+    if start_at:
+        stmt = stmt.where(Invoice.created_at >= start_at)
+    if end_at:
+        stmt = stmt.where(Invoice.created_at < end_at)
+    if status:
+        stmt = stmt.where(Invoice.status == status)
+    return stmt
+
+
+def payments_export_statement(
+    clinic_id: str,
+    start: Optional[dt.date] = None,
+    end: Optional[dt.date] = None,
+    status: Optional[str] = None,
+):
+    stmt = (
+        select(
+            Payment.created_at,
+            Invoice.invoice_number,
+            Payment.payment_method,
+            Payment.amount,
+            Payment.status,
+            Payment.reference_id,
+            Payment.id,
+        )
+        .outerjoin(Invoice, Invoice.id == Payment.invoice_id)
+        .where(Payment.clinic_id == clinic_id, Payment.deleted_at.is_(None))
+        .order_by(Payment.created_at, Payment.id)
+    )
+    start_at, end_at = day_bounds(start, end)
+    if start_at:
+        stmt = stmt.where(Payment.created_at >= start_at)
+    if end_at:
+        stmt = stmt.where(Payment.created_at < end_at)
+    if status:
+        stmt = stmt.where(Payment.status == status)
+    return stmt
+
+
+def medical_records_export_statement(
+    clinic_id: str,
+    start: Optional[dt.date] = None,
+    end: Optional[dt.date] = None,
+    pet_id: Optional[str] = None,
+):
+    vet = aliased(User)
+    stmt = (
+        select(
+            MedicalRecord.visit_date,
+            Pet.name,
+            vet.name,
+            MedicalRecord.symptoms,
+            MedicalRecord.diagnosis,
+            MedicalRecord.prescription,
+            MedicalRecord.follow_up_date,
+            MedicalRecord.id,
+        )
+        .outerjoin(Pet, Pet.id == MedicalRecord.pet_id)
+        .outerjoin(vet, (vet.id == MedicalRecord.vet_id) & (vet.role == UserRole.vet))
+        .where(MedicalRecord.clinic_id == clinic_id, MedicalRecord.deleted_at.is_(None))
+        .order_by(MedicalRecord.visit_date, MedicalRecord.id)
+    )
+    if start:
+        stmt = stmt.where(MedicalRecord.visit_date >= start)
+    if end:
+        stmt = stmt.where(MedicalRecord.visit_date <= end)
+    if pet_id:
+        stmt = stmt.where(MedicalRecord.pet_id == pet_id)
+    return stmt
+
+
+def csv_value(value) -> object:
+    if value is None:
+        return ""
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (dt.date, dt.datetime)):
+        return value.isoformat()
+    return value
+
+
+def stream_csv(stmt, header: list[str], batch_size: int = EXPORT_BATCH_SIZE) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(header)
+    yield buffer.getvalue()
+    # The request's session is closed before the body is sent, so the stream owns one.
+    with Session(engine) as session:
+        result = session.execute(stmt.execution_options(yield_per=batch_size))
+        for rows in result.partitions():
+            buffer.seek(0)
+            buffer.truncate()
+            writer.writerows([csv_value(value) for value in row] for row in rows)
+            yield buffer.getvalue()
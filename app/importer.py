@@ -0,0 +1,347 @@
+import argparse
+import csv
+import datetime as dt
+import json
+import sys
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import IO, Iterable, Iterator, Optional
+
+from sqlalchemy import insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlmodel import Session, select
+
+from app.analytics import refresh_daily_rollups
+from app.contacts import build_contact_blob
+from app.models import Clinic, Pet, PetGender, PetParent
+
+IMPORT_BATCH_SIZE = 1000
+IMPORT_FORMATS = ("csv", "jsonl", "json")
+MAX_REPORTED_ERRORS = 1000
+
+PARENT_FIELDS = (
+    "parent_name",
+    "parent_phone",
+    "parent_email",
+    "parent_address",
+    "whatsapp_number",
+    "emergency_contact_name",
+    "emergency_contact_phone",
+)
+PET_FIELDS = (
+    "pet_name",
+    "species",
+    "breed",
+    "gender",
+    "date_of_birth",
+    "registration_number",
+    "sterilization_status",
+    "alerts",
+)
+
+
+@dataclass
+class RowError:
+    line: int
+    message: str
+
+
+@dataclass
+class ImportReport:
+    rows: int = 0
+    parents_created: int = 0
+    parents_matched: int = 0
+    pets_created: int = 0
+    failed_rows: int = 0
+    errors: list[RowError] = field(default_factory=list)
+    seconds: float = 0.0
+
+    def fail(self, line: int, message: str) -> None:
+        self.failed_rows += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(RowError(line=line, message=message))
+
+    def as_dict(self) -> dict:
+        return {
+            "rows": self.rows,
+            "parents_created": self.parents_created,
+            "parents_matched": self.parents_matched,
+            "pets_created": self.pets_created,
+            "failed_rows": self.failed_rows,
+            "errors": [{"line": error.line, "message": error.message} for error in self.errors],
+            "seconds": round(self.seconds, 3),
+        }
+
+
+@dataclass
+class ParsedRow:
+    line: int
+    parent_id: Optional[str]
+    parent_phone: str
+    parent: Optional[dict]
+    pet: Optional[dict]
+
+
+def iter_rows(stream: IO[str], fmt: str) -> Iterator[tuple[int, dict]]:
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, {key.strip(): value for key, value in row.items() if key}
+    elif fmt == "jsonl":
+        for line_number, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError as exc:
+                yield line_number, {"__error__": f"invalid JSON: {exc.msg}"}
+                continue
+            yield line_number, row if isinstance(row, dict) else {"__error__": "expected a JSON object"}
+    elif fmt == "json":
+        # A JSON array is parsed whole; rows are numbered by their position in it.
+        try:
+            rows = json.load(stream)
+        except json.JSONDecodeError as exc:
+            yield exc.lineno, {"__error__": f"invalid JSON: {exc.msg}"}
+            return
+        if not isinstance(rows, list):
+            yield 1, {"__error__": "expected a JSON array of objects"}
+            return
+        for index, row in enumerate(rows, start=1):
+            yield index, row if isinstance(row, dict) else {"__error__": "expected a JSON object"}
+    else:
+        raise ValueError(f"unsupported import format: {fmt}")
+
+
+def detect_format(filename: str) -> str:
+    name = filename.lower()
+    if name.endswith(".json"):
+        return "json"
+    return "jsonl" if name.endswith((".jsonl", ".ndjson")) else "csv"
+
+
+def clean(row: dict, key: str) -> str:
+    value = row.get(key)
+    return "" if value is None else str(value).strip()
+
+
+def parse_row(line: int, row: dict) -> ParsedRow:
+    if "__error__" in row:
+        raise ValueError(row["__error__"])
+    parent_id = clean(row, "pet_parent_id") or None
+    phone = clean(row, "parent_phone")
+    if not parent_id and not phone:
+        raise ValueError("parent_phone or pet_parent_id is required")
+    parent = None
+    if not parent_id:
+        parent = {key: clean(row, key) for key in PARENT_FIELDS}
+    pet = None
+    if any(clean(row, key) for key in PET_FIELDS):
+        name = clean(row, "pet_name")
+        species = clean(row, "species")
+        if not name or not species:
+            raise ValueError("pet_name and species are required for a pet")
+        try:
+            gender = PetGender((clean(row, "gender") or "unknown").lower())
+        except ValueError:
+            raise ValueError(f"gender must be one of {', '.join(g.value for g in PetGender)}")
+        date_of_birth = clean(row, "date_of_birth")
+        try:
+            dob = dt.date.fromisoformat(date_of_birth) if date_of_birth else None
+        except ValueError:
+            raise ValueError("date_of_birth must be YYYY-MM-DD")
+        pet = {
+            "name": name,
+            "species": species,
+            "breed": clean(row, "breed"),
+            "gender": gender,
+            "date_of_birth": dob,
+            "registration_number": clean(row, "registration_number"),
+            "sterilization_status": clean(row, "sterilization_status") or None,
+            "alerts": clean(row, "alerts") or None,
+        }
+    elif parent_id:
+        raise ValueError("row references pet_parent_id but has no pet")
+    return ParsedRow(line=line, parent_id=parent_id, parent_phone=phone, parent=parent, pet=pet)
+
+
+class PetImporter:
+    def __init__(self, session: Session, clinic_id: str, batch_size: int = IMPORT_BATCH_SIZE):
+        self.session = session
+        self.clinic_id = clinic_id
+        self.batch_size = batch_size
+        self.report = ImportReport()
+        # phone -> parent id for every parent seen so far, so later batches reuse them.
+        self.parent_ids: dict[str, str] = {}
+        self.known_parent_ids: set[str] = set()
+
+    def run(self, rows: Iterable[tuple[int, dict]]) -> ImportReport:
+        started = time.perf_counter()
+        batch: list[ParsedRow] = []
+        for line, row in rows:
+            self.report.rows += 1
+            try:
+                batch.append(parse_row(line, row))
+            except ValueError as exc:
+                self.report.fail(line, str(exc))
+            if len(batch) >= self.batch_size:
+                self.flush(batch)
+                batch = []
+        if batch:
+            self.flush(batch)
+        self.report.seconds = time.perf_counter() - started
+        return self.report
+
+    def resolve_parents(self, batch: list[ParsedRow]) -> None:
+        phones = {row.parent_phone for row in batch if row.parent and row.parent_phone not in self.parent_ids}
+        if phones:
+            existing = self.session.exec(
+                select(PetParent.phone, PetParent.id)
+                .where(
+                    PetParent.clinic_id == self.clinic_id,
+                    PetParent.deleted_at.is_(None),
+                    PetParent.phone.in_(phones),
+                )
+                .order_by(PetParent.created_at)
+            ).all()
+            for phone, parent_id in existing:
+                if phone not in self.parent_ids:
+                    self.parent_ids[phone] = parent_id
+                    self.report.parents_matched += 1
+        referenced = {row.parent_id for row in batch if row.parent_id} - self.known_parent_ids
+        if referenced:
+            self.known_parent_ids.update(
+                self.session.exec(
+                    select(PetParent.id).where(
+                        PetParent.clinic_id == self.clinic_id,
+                        PetParent.deleted_at.is_(None),
+                        PetParent.id.in_(referenced),
+                    )
+                ).all()
+            )
+
+    def flush(self, batch: list[ParsedRow]) -> None:
+        self.resolve_parents(batch)
+        now = dt.datetime.utcnow()
+        new_parents: dict[str, dict] = {}
+        pets: list[dict] = []
+        # Rows that depend on this batch's inserts; only these fail if the database rejects it.
+        sent: list[ParsedRow] = []
+        for row in batch:
+            if row.parent_id:
+                if row.parent_id not in self.known_parent_ids:
+                    self.report.fail(row.line, f"unknown pet_parent_id {row.parent_id}")
+                    continue
+                parent_id = row.parent_id
+                new_parent = False
+            else:
+                parent_id = self.parent_ids.get(row.parent_phone)
+                new_parent = parent_id is None
+                if new_parent:
+                    pending = new_parents.get(row.parent_phone)
+                    if pending is None:
+                        if not row.parent["parent_name"]:
+                            self.report.fail(row.line, "parent_name is required for a new parent")
+                            continue
+                        pending = self.parent_values(row.parent, now)
+                        new_parents[row.parent_phone] = pending
+                    parent_id = pending["id"]
+            if row.pet:
+                pets.append(
+                    {
+                        "id": str(uuid.uuid4()),
+                        "clinic_id": self.clinic_id,
+                        "pet_parent_id": parent_id,
+                        "created_at": now,
+                        "updated_at": now,
+                        **row.pet,
+                    }
+                )
+            if new_parent or row.pet:
+                sent.append(row)
+        try:
+            # Core executemany skips the ORM bulk path; rows are already plain dicts.
+            connection = self.session.connection()
+            if new_parents:
+                connection.execute(insert(PetParent.__table__), list(new_parents.values()))
+            if pets:
+                connection.execute(insert(Pet.__table__), pets)
+                # Core inserts bypass the ORM flush hook that keeps the daily rollups current.
+                refresh_daily_rollups(connection, [(self.clinic_id, now.date())])
+            self.session.commit()
+        except SQLAlchemyError as exc:
+            self.session.rollback()
+            for row in sent:
+                self.report.fail(row.line, f"batch rejected by the database: {exc.__class__.__name__}")
+            return
+        for phone, values in new_parents.items():
+            self.parent_ids[phone] = values["id"]
+        self.report.parents_created += len(new_parents)
+        self.report.pets_created += len(pets)
+
+    def parent_values(self, parent: dict, now: dt.datetime) -> dict:
+        return {
+            "id": str(uuid.uuid4()),
+            "clinic_id": self.clinic_id,
+            "name": parent["parent_name"],
+            "phone": parent["parent_phone"],
+            "email": parent["parent_email"],
+            "address": parent["parent_address"],
+            "govt_id_reference": build_contact_blob(
+                parent["whatsapp_number"],
+                parent["emergency_contact_name"],
+                parent["emergency_contact_phone"],
+            ),
+            "created_at": now,
+            "updated_at": now,
+        }
+
+
+def import_stream(
+    session: Session,
+    clinic_id: str,
+    stream: IO[str],
+    fmt: str,
+    batch_size: int = IMPORT_BATCH_SIZE,
+) -> ImportReport:
+    return PetImporter(session, clinic_id, batch_size).run(iter_rows(stream, fmt))
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m app.importer",
+        description="Import pet parents and pets from CSV, JSON lines or a JSON array.",
+    )
+    parser.add_argument("path")
+    parser.add_argument("--clinic-id", help="defaults to the only clinic in the database")
+    parser.add_argument("--format", choices=IMPORT_FORMATS)
+    parser.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE)
+    args = parser.parse_args(argv)
+
+    from app.db import engine
+
+    with Session(engine) as session:
+        clinic_id = args.clinic_id
+        if not clinic_id:
+            clinics = session.exec(select(Clinic.id).where(Clinic.deleted_at.is_(None))).all()
+            if len(clinics) != 1:
+                parser.error("--clinic-id is required when there is not exactly one clinic")
+            clinic_id = clinics[0]
+        with open(args.path, newline="", encoding="utf-8-sig") as stream:
+            report = import_stream(
+                session, clinic_id, stream, args.format or detect_format(args.path), args.batch_size
+            )
+    print(
+        f"{report.rows} rows in {report.seconds:.2f}s: {report.parents_created} parents created, "
+        f"{report.parents_matched} matched, {report.pets_created} pets created, "
+        f"{report.failed_rows} failed"
+    )
+    for error in report.errors[:20]:
+        print(f"line {error.line}: {error.message}", file=sys.stderr)
+    if report.failed_rows:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+import datetime as dt
+import os
+from typing import Optional
+
+from sqlalchemy import select, update
+
+from app.db import insert_ignoring_duplicates
+from app.models import Invoice, InvoiceSequence
+
+INVOICE_NUMBER_PREFIX = os.getenv("INVOICE_NUMBER_PREFIX", "INV")
+INVOICE_NUMBER_DIGITS = int(os.getenv("INVOICE_NUMBER_DIGITS", "5"))
+# "1" restarts numbering every financial year and puts the year in the number (INV/2026-27/00001).
+INVOICE_NUMBER_FINANCIAL_YEAR = os.getenv("INVOICE_NUMBER_FINANCIAL_YEAR", "1") == "1"
+FINANCIAL_YEAR_START_MONTH = 4
+
+
+def financial_year(day: dt.date) -> str:
+    start = day.year if day.month >= FINANCIAL_YEAR_START_MONTH else day.year - 1
+    return f"{start}-{(start + 1) % 100:02d}"
+
+
+def sequence_period(day: dt.date) -> str:
+    return financial_year(day) if INVOICE_NUMBER_FINANCIAL_YEAR else ""
+
+
+def format_invoice_number(period: str, number: int) -> str:
+    return "/".join(part for part in (INVOICE_NUMBER_PREFIX, period, f"{number:0{INVOICE_NUMBER_DIGITS}d}") if part)
+
+
+def next_number_statement(clinic_id: str, period: str):
+    return (
+        update(InvoiceSequence)
+        .where(InvoiceSequence.clinic_id == clinic_id, InvoiceSequence.period == period)
+        .values(last_number=InvoiceSequence.last_number + 1, updated_at=dt.datetime.utcnow())
+        .returning(InvoiceSequence.last_number)
+    )
+
+
+def number_taken_statement(clinic_id: str, invoice_number: str):
+    return select(Invoice.id).where(
+        Invoice.clinic_id == clinic_id,
+        Invoice.invoice_number == invoice_number,
+        Invoice.deleted_at.is_(None),
+    )
+
+
+def allocate_invoice_number(connection, clinic_id: str, day: Optional[dt.date] = None) -> str:
+    # One primary-key UPDATE; its row lock is held until the invoice commits, so a rolled
+    # back checkout hands its number to the next one and the sequence stays gap-free.
+    period = sequence_period(day or dt.date.today())
+    number = connection.execute(next_number_statement(clinic_id, period)).scalar()
+    if number is None:
+        connection.execute(
+            insert_ignoring_duplicates(connection.dialect.name, InvoiceSequence, ["clinic_id", "period"]),
+            {"clinic_id": clinic_id, "period": period, "last_number": 0, "updated_at": dt.datetime.utcnow()},
+        )
+        number = connection.execute(next_number_statement(clinic_id, period)).scalar_one()
+    invoice_number = format_invoice_number(period, number)
+    # A number typed in by hand may already hold this slot; it is not a gap, so move past it.
+    while connection.execute(number_taken_statement(clinic_id, invoice_number)).first():
+        number = connection.execute(next_number_statement(clinic_id, period)).scalar_one()
+        invoice_number = format_invoice_number(period, number)
+    return invoice_number
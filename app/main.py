@@ -1,20 +1,63 @@
 from __future__ import annotations
 
 import datetime as dt
+import io
 import json
+import os
+import time
+from dataclasses import dataclass
 from decimal import Decimal
 from typing import Optional
 
 from sqlalchemy.exc import IntegrityError
-from fastapi import Depends, FastAPI, Form, Request
-from fastapi.responses import HTMLResponse, RedirectResponse, JSONResponse
+from fastapi import Depends, FastAPI, File, Form, Request, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import (
+    HTMLResponse,
+    JSONResponse,
+    PlainTextResponse,
+    RedirectResponse,
+    StreamingResponse,
+)
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
-from sqlalchemy import func
+from pydantic import BaseModel
+from sqlalchemy import and_, case, event, func, or_, text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session as ORMSession
 from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.auth import create_token, decode_token, hash_password, verify_password
-from app.db import get_session
+from app.analytics import load_rollups, summarize_rollups
+from app.availability import (
+    DEFAULT_SLOT_MINUTES,
+    MAX_AVAILABILITY_DAYS,
+    free_intervals,
+)
+from app.auth import (
+    JWT_TTL_SECONDS,
+    PasswordHashBusy,
+    create_token,
+    decode_token,
+    hash_password_async,
+    password_hash_metrics,
+    verify_password_async,
+)
+from app.cache import TTLCache
+from app.contacts import build_contact_blob, parse_contact_blob
+from app.db import async_engine, get_async_session, get_session
+from app.exports import (
+    INVOICE_COLUMNS,
+    MEDICAL_RECORD_COLUMNS,
+    PAYMENT_COLUMNS,
+    invoices_export_statement,
+    medical_records_export_statement,
+    payments_export_statement,
+    stream_csv,
+)
+from app.importer import IMPORT_FORMATS, detect_format, import_stream
+from app.invoice_numbers import allocate_invoice_number
+from app.metrics import MetricsMiddleware, render_metrics
 from app.models import (
     Appointment,
     AppointmentStatus,
@@ -38,9 +81,24 @@ from app.models import (
     User,
     UserRole,
 )
+from app.pagination import build_page, keyset_paginate, page_links
+from app.search import pet_search_condition, pet_search_statement
+from app.timeline import load_pet_timeline, timeline_page_size
 
 app = FastAPI()
+app.add_middleware(MetricsMiddleware)
 app.mount("/static", StaticFiles(directory="app/static"), name="static")
+
+
+@app.exception_handler(PasswordHashBusy)
+def password_hash_busy(request: Request, exc: PasswordHashBusy):
+    return PlainTextResponse(
+        "Too many sign-ins in progress. Please try again in a moment.",
+        status_code=503,
+        headers={"Retry-After": "1"},
+    )
+
+
 templates = Jinja2Templates(directory="app/templates")
 
 
@@ -52,53 +110,104 @@ def password_too_long(password: str) -> bool:
     return len(password.encode("utf-8")) > 72
 
 
-def count_scalar(value):
-    return value[0] if isinstance(value, tuple) else value
+# User writes only clear this process's cache; other workers keep the old snapshot until
+# it expires, so the window is kept short when more than one worker is serving.
+AUTH_CACHE_DEFAULT_TTL_SECONDS = "60" if os.getenv("WEB_CONCURRENCY", "1") == "1" else "5"
+AUTH_CACHE_TTL_SECONDS = min(
+    float(os.getenv("AUTH_CACHE_TTL_SECONDS", AUTH_CACHE_DEFAULT_TTL_SECONDS)), JWT_TTL_SECONDS / 2
+)
 
+auth_cache = TTLCache(AUTH_CACHE_TTL_SECONDS, max_entries=4096)
 
-def parse_contact_blob(value: Optional[str]) -> dict:
-    if not value:
-        return {}
-    try:
-        parsed = json.loads(value)
-        return parsed if isinstance(parsed, dict) else {}
-    except json.JSONDecodeError:
-        return {}
 
+@dataclass(frozen=True)
+class CurrentUser:
+    id: str
+    clinic_id: str
+    name: str
+    role: UserRole
 
-def build_contact_blob(
-    whatsapp_number: str,
-    emergency_contact_name: str,
-    emergency_contact_phone: str,
-) -> str:
-    payload = {
-        "whatsapp_number": whatsapp_number or "",
-        "emergency_contact_name": emergency_contact_name or "",
-        "emergency_contact_phone": emergency_contact_phone or "",
-    }
-    return json.dumps(payload)
+
+@dataclass(frozen=True)
+class AuthEntry:
+    claims: dict
+    user: CurrentUser
 
 
-def get_current_user(request: Request, session: Session) -> Optional[User]:
+@event.listens_for(ORMSession, "after_flush")
+def track_user_writes(session: ORMSession, flush_context) -> None:
+    user_ids = session.info.setdefault("auth_user_ids", set())
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, User):
+            user_ids.add(obj.id)
+
+
+@event.listens_for(ORMSession, "after_commit")
+def invalidate_auth_cache(session: ORMSession) -> None:
+    user_ids = session.info.pop("auth_user_ids", set())
+    if user_ids:
+        auth_cache.discard_where(lambda _key, entry: entry.user.id in user_ids)
+
+
+@event.listens_for(ORMSession, "after_rollback")
+def forget_user_writes(session: ORMSession) -> None:
+    session.info.pop("auth_user_ids", None)
+
+
+def remember_user(token: str, payload: dict, user: Optional[User]) -> Optional[CurrentUser]:
+    if not user or user.deleted_at is not None or not user.is_active:
+        return None
+    snapshot = CurrentUser(id=user.id, clinic_id=user.clinic_id, name=user.name, role=user.role)
+    auth_cache.set(
+        token,
+        AuthEntry(claims=payload, user=snapshot),
+        ttl_seconds=payload.get("exp", 0) - time.time(),
+    )
+    return snapshot
+
+
+def get_current_user(request: Request, session: Session) -> Optional[CurrentUser]:
     token = request.cookies.get("session")
     if not token:
         return None
+    entry = auth_cache.get(token)
+    if entry is not None:
+        return entry.user
     payload = decode_token(token)
     if not payload:
         return None
-    user = session.get(User, payload.get("sub"))
-    if not user or user.deleted_at is not None or not user.is_active:
+    return remember_user(token, payload, session.get(User, payload.get("sub")))
+
+
+async def get_current_user_async(request: Request, session: AsyncSession) -> Optional[CurrentUser]:
+    token = request.cookies.get("session")
+    if not token:
         return None
-    return user
+    entry = auth_cache.get(token)
+    if entry is not None:
+        return entry.user
+    payload = decode_token(token)
+    if not payload:
+        return None
+    return remember_user(token, payload, await session.get(User, payload.get("sub")))
 
 
-def require_user(request: Request, session: Session) -> Optional[User | RedirectResponse]:
+def require_user(request: Request, session: Session) -> Optional[CurrentUser | RedirectResponse]:
     user = get_current_user(request, session)
     if not user:
         return RedirectResponse(url="/login", status_code=303)
     return user
 
 
+async def require_user_async(
+    request: Request, session: AsyncSession
+) -> Optional[CurrentUser | RedirectResponse]:
+    user = await get_current_user_async(request, session)
+    if not user:
+        return RedirectResponse(url="/login", status_code=303)
+    return user
+
+
 def any_clinic_exists(session: Session) -> bool:
     return session.exec(select(Clinic).where(Clinic.deleted_at.is_(None))).first() is not None
 
@@ -107,15 +216,81 @@ def any_user_exists(session: Session) -> bool:
     return session.exec(select(User).where(User.deleted_at.is_(None))).first() is not None
 
 
-def build_appointments_context(session: Session, clinic_id: str) -> dict:
-    appointments = session.exec(
-        select(Appointment).where(
-            Appointment.clinic_id == clinic_id, Appointment.deleted_at.is_(None)
-        )
-    ).all()
-    pets = session.exec(
-        select(Pet).where(Pet.clinic_id == clinic_id, Pet.deleted_at.is_(None))
-    ).all()
+def load_map(session: Session, model, ids, *conditions) -> dict:
+    ids = {value for value in ids if value}
+    if not ids:
+        return {}
+    rows = session.exec(select(model).where(model.id.in_(ids), *conditions)).all()
+    return {row.id: row for row in rows}
+
+
+async def load_map_async(session: AsyncSession, model, ids, *conditions) -> dict:
+    ids = {value for value in ids if value}
+    if not ids:
+        return {}
+    rows = (await session.exec(select(model).where(model.id.in_(ids), *conditions))).all()
+    return {row.id: row for row in rows}
+
+
+@dataclass(frozen=True)
+class AppointmentFilters:
+    pet_id: Optional[str] = None
+    vet_id: Optional[str] = None
+    status: Optional[AppointmentStatus] = None
+    from_date: Optional[dt.date] = None
+    to_date: Optional[dt.date] = None
+
+    def conditions(self) -> list:
+        conditions = []
+        if self.pet_id:
+            conditions.append(Appointment.pet_id == self.pet_id)
+        if self.vet_id:
+            conditions.append(Appointment.vet_id == self.vet_id)
+        if self.status:
+            conditions.append(Appointment.status == self.status)
+        if self.from_date:
+            conditions.append(Appointment.appointment_date >= self.from_date)
+        if self.to_date:
+            conditions.append(Appointment.appointment_date <= self.to_date)
+        return conditions
+
+    def query_params(self) -> dict:
+        params = {
+            "pet_id": self.pet_id,
+            "vet_id": self.vet_id,
+            "status": self.status.value if self.status else None,
+            "from_date": self.from_date.isoformat() if self.from_date else None,
+            "to_date": self.to_date.isoformat() if self.to_date else None,
+        }
+        return {key: value for key, value in params.items() if value}
+
+
+def parse_appointment_filters(
+    pet_id: Optional[str] = None,
+    vet_id: Optional[str] = None,
+    status: Optional[str] = None,
+    from_date: Optional[str] = None,
+    to_date: Optional[str] = None,
+) -> AppointmentFilters:
+    # Blank or malformed values from the filter form mean "no filter" rather than an error.
+    def parse_date(value: Optional[str]) -> Optional[dt.date]:
+        try:
+            return dt.date.fromisoformat(value) if value else None
+        except ValueError:
+            return None
+
+    return AppointmentFilters(
+        pet_id=pet_id or None,
+        vet_id=vet_id or None,
+        status=AppointmentStatus(status) if status in AppointmentStatus.__members__ else None,
+        from_date=parse_date(from_date),
+        to_date=parse_date(to_date),
+    )
+
+
+def build_appointments_context(
+    session: Session, clinic_id: str, filters: AppointmentFilters = AppointmentFilters()
+) -> dict:
     vets = session.exec(
         select(User).where(
             User.clinic_id == clinic_id,
@@ -123,17 +298,75 @@ def build_appointments_context(session: Session, clinic_id: str) -> dict:
             User.deleted_at.is_(None),
         )
     ).all()
-    pet_map = {p.id: p for p in pets}
-    vet_map = {v.id: v for v in vets}
+    pet = None
+    if filters.pet_id:
+        pet = session.exec(
+            select(Pet).where(
+                Pet.id == filters.pet_id, Pet.clinic_id == clinic_id, Pet.deleted_at.is_(None)
+            )
+        ).first()
     return {
-        "appointments": appointments,
-        "pets": pets,
         "vets": vets,
-        "pet_map": pet_map,
-        "vet_map": vet_map,
+        "statuses": list(AppointmentStatus),
+        "filters": filters,
+        "filter_pet": pet,
+        "feed_params": filters.query_params(),
+    }
+
+
+def parse_calendar_bound(value: str) -> dt.date:
+    parsed = dt.datetime.fromisoformat(value)
+    if parsed.time() != dt.time(0, 0):
+        return parsed.date() + dt.timedelta(days=1)
+    return parsed.date()
+
+
+def appointment_event(appt: Appointment, pet_name: Optional[str], vet_name: Optional[str]) -> dict:
+    pet_label = pet_name or "Pet"
+    vet_label = vet_name or "Vet"
+    title = f"{pet_label} - {vet_label}"
+    if appt.procedure_type:
+        title = f"{title} · {appt.procedure_type}"
+    return {
+        "id": appt.id,
+        "title": title,
+        "start": f"{appt.appointment_date.isoformat()}T{appt.start_time.isoformat()}",
+        "end": f"{appt.appointment_date.isoformat()}T{appt.end_time.isoformat()}",
+        "extendedProps": {
+            "pet_id": appt.pet_id,
+            "vet_id": appt.vet_id,
+            "pet_name": pet_label,
+            "vet_name": vet_label,
+            "procedure_type": appt.procedure_type,
+            "status": appt.status.value if appt.status else "scheduled",
+            "notes": appt.notes,
+        },
     }
 
 
+@app.get("/healthz")
+async def healthz():
+    return {"status": "ok"}
+
+
+@app.get("/readyz")
+async def readyz():
+    try:
+        async with async_engine.connect() as connection:
+            await connection.execute(text("SELECT 1"))
+    except (SQLAlchemyError, OSError):
+        return JSONResponse({"status": "unavailable"}, status_code=503)
+    return {"status": "ready"}
+
+
+@app.get("/metrics")
+async def metrics():
+    return PlainTextResponse(
+        render_metrics({"password_hash": password_hash_metrics()}),
+        media_type="text/plain; version=0.0.4",
+    )
+
+
 @app.get("/", response_class=HTMLResponse)
 def root(request: Request, session: Session = Depends(get_session)):
     if not any_clinic_exists(session) or not any_user_exists(session):
@@ -152,7 +385,7 @@ def setup_form(request: Request, session: Session = Depends(get_session)):
 
 
 @app.post("/setup")
-def setup_submit(
+async def setup_submit(
     request: Request,
     clinic_name: str = Form(...),
     clinic_phone: str = Form(...),
@@ -166,7 +399,7 @@ def setup_submit(
     admin_password: str = Form(...),
     session: Session = Depends(get_session),
 ):
-    if any_clinic_exists(session) and any_user_exists(session):
+    if await run_in_threadpool(lambda: any_clinic_exists(session) and any_user_exists(session)):
         return RedirectResponse(url="/login", status_code=303)
     if password_too_long(admin_password):
         return templates.TemplateResponse(
@@ -174,6 +407,15 @@ def setup_submit(
             {"request": request, "error": "Password must be 72 bytes or fewer."},
             status_code=400,
         )
+    # Hashed before anything is written, so a busy hash pool cannot leave a clinic without its admin.
+    try:
+        password_hash = await hash_password_async(admin_password)
+    except ValueError:
+        return templates.TemplateResponse(
+            "setup.html",
+            {"request": request, "error": "Password must be 72 bytes or fewer."},
+            status_code=400,
+        )
 
     clinic = Clinic(
         name=clinic_name,
@@ -185,19 +427,6 @@ def setup_submit(
         created_at=now_utc(),
         updated_at=now_utc(),
     )
-    session.add(clinic)
-    session.commit()
-    session.refresh(clinic)
-
-    try:
-        password_hash = hash_password(admin_password)
-    except ValueError:
-        return templates.TemplateResponse(
-            "setup.html",
-            {"request": request, "error": "Password must be 72 bytes or fewer."},
-            status_code=400,
-        )
-
     admin = User(
         clinic_id=clinic.id,
         name=admin_name,
@@ -209,10 +438,11 @@ def setup_submit(
         created_at=now_utc(),
         updated_at=now_utc(),
     )
+    session.add(clinic)
     session.add(admin)
-    session.commit()
-
     token = create_token(admin.id, admin.clinic_id, admin.role)
+    await run_in_threadpool(session.commit)
+
     response = RedirectResponse(url="/dashboard", status_code=303)
     response.set_cookie("session", token, httponly=True, samesite="lax")
     return response
@@ -224,16 +454,18 @@ def login_form(request: Request):
 
 
 @app.post("/login")
-def login_submit(
+async def login_submit(
     request: Request,
     phone: str = Form(...),
     password: str = Form(...),
     session: Session = Depends(get_session),
 ):
-    user = session.exec(
-        select(User).where(User.phone == phone, User.deleted_at.is_(None))
-    ).first()
-    if not user or not verify_password(password, user.password_hash):
+    user = await run_in_threadpool(
+        lambda: session.exec(
+            select(User).where(User.phone == phone, User.deleted_at.is_(None))
+        ).first()
+    )
+    if not user or not await verify_password_async(password, user.password_hash):
         return templates.TemplateResponse(
             "login.html", {"request": request, "error": "Invalid credentials"}, status_code=400
         )
@@ -244,7 +476,10 @@ def login_submit(
 
 
 @app.get("/logout")
-def logout():
+def logout(request: Request):
+    token = request.cookies.get("session")
+    if token:
+        auth_cache.discard(token)
     response = RedirectResponse(url="/login", status_code=303)
     response.delete_cookie("session")
     return response
@@ -256,15 +491,17 @@ def reset_form(request: Request):
 
 
 @app.post("/reset")
-def reset_submit(
+async def reset_submit(
     request: Request,
     phone: str = Form(...),
     new_password: str = Form(...),
     session: Session = Depends(get_session),
 ):
-    user = session.exec(
-        select(User).where(User.phone == phone, User.deleted_at.is_(None))
-    ).first()
+    user = await run_in_threadpool(
+        lambda: session.exec(
+            select(User).where(User.phone == phone, User.deleted_at.is_(None))
+        ).first()
+    )
     if not user:
         return templates.TemplateResponse(
             "reset.html", {"request": request, "error": "Phone not found"}, status_code=400
@@ -276,7 +513,7 @@ def reset_submit(
             status_code=400,
         )
     try:
-        user.password_hash = hash_password(new_password)
+        user.password_hash = await hash_password_async(new_password)
     except ValueError:
         return templates.TemplateResponse(
             "reset.html",
@@ -285,66 +522,180 @@ def reset_submit(
         )
     user.updated_at = now_utc()
     session.add(user)
-    session.commit()
+    await run_in_threadpool(session.commit)
     return RedirectResponse(url="/login", status_code=303)
 
 
+DASHBOARD_CACHE_TTL_SECONDS = float(os.getenv("DASHBOARD_CACHE_TTL_SECONDS", "15"))
+DASHBOARD_MODELS = (Pet, Appointment, Invoice, InventoryItem)
+
+dashboard_cache = TTLCache(DASHBOARD_CACHE_TTL_SECONDS)
+
+
+@event.listens_for(ORMSession, "after_flush")
+def track_dashboard_writes(session: ORMSession, flush_context) -> None:
+    clinic_ids = session.info.setdefault("dashboard_clinic_ids", set())
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, DASHBOARD_MODELS):
+            clinic_ids.add(obj.clinic_id)
+
+
+@event.listens_for(ORMSession, "after_commit")
+def invalidate_dashboard_cache(session: ORMSession) -> None:
+    for clinic_id in session.info.pop("dashboard_clinic_ids", set()):
+        dashboard_cache.discard_where(lambda key, _value: key[0] == clinic_id)
+
+
+@event.listens_for(ORMSession, "after_rollback")
+def forget_dashboard_writes(session: ORMSession) -> None:
+    session.info.pop("dashboard_clinic_ids", None)
+
+
+def dashboard_counts_statement(clinic_id: str, today: dt.date):
+    pets_count = select(func.count()).select_from(Pet).where(
+        Pet.clinic_id == clinic_id, Pet.deleted_at.is_(None)
+    )
+    appointments_today = select(func.count()).select_from(Appointment).where(
+        Appointment.clinic_id == clinic_id,
+        Appointment.appointment_date == today,
+        Appointment.deleted_at.is_(None),
+    )
+    pending_invoices = select(func.count()).select_from(Invoice).where(
+        Invoice.clinic_id == clinic_id,
+        Invoice.status == InvoiceStatus.issued,
+        Invoice.deleted_at.is_(None),
+    )
+    low_stock_items = select(func.count()).select_from(InventoryItem).where(
+        InventoryItem.clinic_id == clinic_id,
+        InventoryItem.deleted_at.is_(None),
+        InventoryItem.quantity <= InventoryItem.low_stock_threshold,
+    )
+    return select(
+        pets_count.scalar_subquery().label("pets_count"),
+        appointments_today.scalar_subquery().label("appointments_today"),
+        pending_invoices.scalar_subquery().label("pending_invoices"),
+        low_stock_items.scalar_subquery().label("low_stock_items"),
+    )
+
+
+async def get_dashboard_counts(session: AsyncSession, clinic_id: str) -> dict:
+    today = dt.date.today()
+    counts = dashboard_cache.get((clinic_id, today))
+    if counts is None:
+        row = (await session.exec(dashboard_counts_statement(clinic_id, today))).one()
+        counts = dict(row._mapping)
+        dashboard_cache.set((clinic_id, today), counts)
+    return counts
+
+
 @app.get("/dashboard", response_class=HTMLResponse)
-def dashboard(request: Request, session: Session = Depends(get_session)):
-    user_or_redirect = require_user(request, session)
+async def dashboard(request: Request, session: AsyncSession = Depends(get_async_session)):
+    user_or_redirect = await require_user_async(request, session)
     if isinstance(user_or_redirect, RedirectResponse):
         return user_or_redirect
     user = user_or_redirect
 
-    pets_count = count_scalar(
-        session.exec(
-        select(func.count()).select_from(Pet).where(
-            Pet.clinic_id == user.clinic_id, Pet.deleted_at.is_(None)
-        )
-    ).one()
-    )
-    today = dt.date.today()
-    appointments_today = count_scalar(
-        session.exec(
-        select(func.count()).select_from(Appointment).where(
-            Appointment.clinic_id == user.clinic_id,
-            Appointment.appointment_date == today,
-            Appointment.deleted_at.is_(None),
-        )
-    ).one()
-    )
-    pending_invoices = count_scalar(
-        session.exec(
-        select(func.count()).select_from(Invoice).where(
-            Invoice.clinic_id == user.clinic_id,
-            Invoice.status == InvoiceStatus.issued,
-            Invoice.deleted_at.is_(None),
-        )
-    ).one()
-    )
-    low_stock_items = count_scalar(
-        session.exec(
-        select(func.count()).select_from(InventoryItem).where(
-            InventoryItem.clinic_id == user.clinic_id,
-            InventoryItem.deleted_at.is_(None),
-            InventoryItem.quantity <= InventoryItem.low_stock_threshold,
-        )
-    ).one()
-    )
+    counts = await get_dashboard_counts(session, user.clinic_id)
 
     return templates.TemplateResponse(
         "dashboard.html",
         {
             "request": request,
             "user": user,
-            "pets_count": pets_count,
-            "appointments_today": appointments_today,
-            "pending_invoices": pending_invoices,
-            "low_stock_items": low_stock_items,
+            **counts,
+        },
+    )
+
+
+ANALYTICS_DEFAULT_DAYS = 365
+ANALYTICS_MAX_DAYS = 3 * 366
+ANALYTICS_PERIODS = ("day", "month")
+
+
+def parse_analytics_range(start: Optional[str], end: Optional[str]) -> tuple[dt.date, dt.date]:
+    end_date = dt.date.fromisoformat(end) if end else dt.date.today()
+    start_date = (
+        dt.date.fromisoformat(start)
+        if start
+        else end_date - dt.timedelta(days=ANALYTICS_DEFAULT_DAYS - 1)
+    )
+    if start_date > end_date or (end_date - start_date).days >= ANALYTICS_MAX_DAYS:
+        raise ValueError("invalid range")
+    return start_date, end_date
+
+
+@app.get("/analytics", response_class=HTMLResponse)
+def analytics(
+    request: Request,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    period: str = "month",
+    session: Session = Depends(get_session),
+):
+    user_or_redirect = require_user(request, session)
+    if isinstance(user_or_redirect, RedirectResponse):
+        return user_or_redirect
+    user = user_or_redirect
+    try:
+        start_date, end_date = parse_analytics_range(start, end)
+    except ValueError:
+        return PlainTextResponse(
+            f"start and end must be YYYY-MM-DD, in order, at most {ANALYTICS_MAX_DAYS} days apart",
+            status_code=400,
+        )
+    if period not in ANALYTICS_PERIODS:
+        period = "month"
+    rows = summarize_rollups(load_rollups(session, user.clinic_id, start_date, end_date), period)
+    return templates.TemplateResponse(
+        "analytics.html",
+        {
+            "request": request,
+            "rows": rows,
+            "start": start_date.isoformat(),
+            "end": end_date.isoformat(),
+            "period": period,
+            "periods": ANALYTICS_PERIODS,
+            "statuses": AppointmentStatus,
+            "methods": PaymentMethod,
         },
     )
 
 
+@app.get("/api/analytics")
+def analytics_api(
+    request: Request,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    period: str = "day",
+    session: Session = Depends(get_session),
+):
+    user_or_redirect = require_user(request, session)
+    if isinstance(user_or_redirect, RedirectResponse):
+        return JSONResponse({"error_code": "UNAUTHORIZED"}, status_code=401)
+    user = user_or_redirect
+    try:
+        start_date, end_date = parse_analytics_range(start, end)
+    except ValueError:
+        return JSONResponse(
+            {"error": f"start and end must be ISO dates, in order, at most {ANALYTICS_MAX_DAYS} days apart"},
+            status_code=400,
+        )
+    if period not in ANALYTICS_PERIODS:
+        return JSONResponse({"error": "period must be day or month"}, status_code=400)
+    rows = summarize_rollups(load_rollups(session, user.clinic_id, start_date, end_date), period)
+    return JSONResponse(
+        {
+            "start": start_date.isoformat(),
+            "end": end_date.isoformat(),
+            "period": period,
+            "rows": [
+                {key: str(value) if isinstance(value, Decimal) else value for key, value in row.items()}
+                for row in rows
+            ],
+        }
+    )
+
+
 # Clinics
 @app.get("/clinics", response_class=HTMLResponse)
 def clinics_list(request: Request, session: Session = Depends(get_session)):
@@ -477,7 +828,7 @@ def users_new(request: Request, session: Session = Depends(get_session)):
 
 
 @app.post("/users/new")
-def users_create(
+async def users_create(
     request: Request,
     name: str = Form(...),
     phone: str = Form(...),
@@ -487,13 +838,15 @@ def users_create(
     password: str = Form(...),
     session: Session = Depends(get_session),
 ):
-    user_or_redirect = require_user(request, session)
+    user_or_redirect = await run_in_threadpool(require_user, request, session)
     if isinstance(user_or_redirect, RedirectResponse):
         return user_or_redirect
     current_user = user_or_redirect
-    existing = session.exec(
-        select(User).where(User.phone == phone, User.deleted_at.is_(None))
-    ).first()
+    existing = await run_in_threadpool(
+        lambda: session.exec(
+            select(User).where(User.phone == phone, User.deleted_at.is_(None))
+        ).first()
+    )
     if existing:
         return templates.TemplateResponse(
             "users_form.html",
@@ -515,7 +868,7 @@ def users_create(
             status_code=400,
         )
     try:
-        password_hash = hash_password(password)
+        password_hash = await hash_password_async(password)
     except ValueError:
         return templates.TemplateResponse(
             "users_form.html",
@@ -539,9 +892,9 @@ def users_create(
     )
     session.add(user)
     try:
-        session.commit()
+        await run_in_threadpool(session.commit)
     except IntegrityError:
-        session.rollback()
+        await run_in_threadpool(session.rollback)
         return templates.TemplateResponse(
             "users_form.html",
             {
@@ -568,7 +921,7 @@ def users_edit(user_id: str, request: Request, session: Session = Depends(get_se
 
 
 @app.post("/users/{user_id}/edit")
-def users_update(
+async def users_update(
     user_id: str,
     request: Request,
     name: str = Form(...),
@@ -579,7 +932,7 @@ def users_update(
     password: Optional[str] = Form(None),
     session: Session = Depends(get_session),
 ):
-    user = session.get(User, user_id)
+    user = await run_in_threadpool(session.get, User, user_id)
     if not user or user.deleted_at is not None:
         return RedirectResponse(url="/users", status_code=303)
     user.name = name
@@ -600,7 +953,7 @@ def users_update(
                 status_code=400,
             )
         try:
-            user.password_hash = hash_password(password)
+            user.password_hash = await hash_password_async(password)
         except ValueError:
             return templates.TemplateResponse(
                 "users_form.html",
@@ -614,7 +967,7 @@ def users_update(
             )
     user.updated_at = now_utc()
     session.add(user)
-    session.commit()
+    await run_in_threadpool(session.commit)
     return RedirectResponse(url="/users", status_code=303)
 
 
@@ -634,18 +987,23 @@ def users_delete(user_id: str, request: Request, session: Session = Depends(get_
 
 # Pet Parents
 @app.get("/pet-parents", response_class=HTMLResponse)
-def pet_parents_list(request: Request, session: Session = Depends(get_session)):
+def pet_parents_list(
+    request: Request, cursor: Optional[str] = None, session: Session = Depends(get_session)
+):
     user_or_redirect = require_user(request, session)
     if isinstance(user_or_redirect, RedirectResponse):
         return user_or_redirect
     user = user_or_redirect
-    parents = session.exec(
-        select(PetParent).where(
-            PetParent.clinic_id == user.clinic_id, PetParent.deleted_at.is_(None)
-        )
-    ).all()
+    sort_columns = [PetParent.name, PetParent.id]
+    stmt = select(PetParent).where(
+        PetParent.clinic_id == user.clinic_id, PetParent.deleted_at.is_(None)
+    )
+    page = build_page(
+        session.exec(keyset_paginate(stmt, sort_columns, cursor)).all(), sort_columns
+    )
     return templates.TemplateResponse(
-        "pet_parents_list.html", {"request": request, "pet_parents": parents}
+        "pet_parents_list.html",
+        {"request": request, "pet_parents": page.items, **page_links(request, page)},
     )
 
 
@@ -774,46 +1132,60 @@ def pet_parents_delete(parent_id: str, request: Request, session: Session = Depe
 
 
 # Pets
-@app.get("/pets", response_class=HTMLResponse)
-def pets_list(
-    request: Request,
+def pets_list_statement(
+    clinic_id: str,
     q: Optional[str] = None,
     species: Optional[str] = None,
     gender: Optional[str] = None,
-    sort: Optional[str] = None,
-    page: int = 1,
-    session: Session = Depends(get_session),
+    dialect_name: str = "sqlite",
 ):
-    user_or_redirect = require_user(request, session)
-    if isinstance(user_or_redirect, RedirectResponse):
-        return user_or_redirect
-    user = user_or_redirect
     stmt = (
         select(Pet)
         .join(PetParent, Pet.pet_parent_id == PetParent.id)
-        .where(Pet.clinic_id == user.clinic_id, Pet.deleted_at.is_(None))
-    )
-    if q:
-        like = f"%{q}%"
-        stmt = stmt.where(
-            (Pet.name.ilike(like))
-            | (Pet.registration_number.ilike(like))
-            | (PetParent.name.ilike(like))
-        )
+        .where(Pet.clinic_id == clinic_id, Pet.deleted_at.is_(None))
+    )
+    if q and q.strip():
+        stmt = stmt.where(pet_search_condition(dialect_name, clinic_id, q))
     if species:
         stmt = stmt.where(Pet.species == species)
     if gender:
         stmt = stmt.where(Pet.gender == gender)
+    return stmt
+
+
+def pets_list_sort_columns(sort: Optional[str] = None) -> list:
     if sort == "name":
-        stmt = stmt.order_by(Pet.name.asc())
-    page = page if page and page > 0 else 1
-    stmt = stmt.limit(25).offset((page - 1) * 25)
-    pets = session.exec(stmt).all()
-    parent_ids = {p.pet_parent_id for p in pets}
-    parents = session.exec(
-        select(PetParent).where(PetParent.id.in_(parent_ids))
-    ).all()
-    parent_map = {p.id: p for p in parents}
+        return [Pet.name, Pet.id]
+    return [Pet.created_at, Pet.id]
+
+
+@app.get("/pets", response_class=HTMLResponse)
+async def pets_list(
+    request: Request,
+    q: Optional[str] = None,
+    species: Optional[str] = None,
+    gender: Optional[str] = None,
+    sort: Optional[str] = None,
+    cursor: Optional[str] = None,
+    session: AsyncSession = Depends(get_async_session),
+):
+    user_or_redirect = await require_user_async(request, session)
+    if isinstance(user_or_redirect, RedirectResponse):
+        return user_or_redirect
+    user = user_or_redirect
+    stmt = pets_list_statement(
+        user.clinic_id,
+        q,
+        species,
+        gender,
+        dialect_name=session.get_bind().dialect.name,
+    )
+    sort_columns = pets_list_sort_columns(sort)
+    page = build_page(
+        (await session.exec(keyset_paginate(stmt, sort_columns, cursor))).all(), sort_columns
+    )
+    pets = page.items
+    parent_map = await load_map_async(session, PetParent, [p.pet_parent_id for p in pets])
     return templates.TemplateResponse(
         "pets_list.html",
         {
@@ -824,33 +1196,24 @@ def pets_list(
             "species": species or "",
             "gender": gender or "",
             "sort": sort or "",
-            "page": page,
+            **page_links(request, page),
         },
     )
 
 
 @app.get("/api/pets/search")
-def pets_search(q: str, request: Request, session: Session = Depends(get_session)):
-    user_or_redirect = require_user(request, session)
+async def pets_search(
+    q: str, request: Request, session: AsyncSession = Depends(get_async_session)
+):
+    user_or_redirect = await require_user_async(request, session)
     if isinstance(user_or_redirect, RedirectResponse):
         return JSONResponse([], status_code=401)
     user = user_or_redirect
-    like = f"%{q}%"
-    stmt = (
-        select(Pet, PetParent)
-        .join(PetParent, Pet.pet_parent_id == PetParent.id)
-        .where(
-            Pet.clinic_id == user.clinic_id,
-            Pet.deleted_at.is_(None),
-            (Pet.name.ilike(like))
-            | (Pet.breed.ilike(like))
-            | (Pet.registration_number.ilike(like))
-            | (PetParent.name.ilike(like)),
-        )
-        .limit(10)
-    )
+    if not q.strip():
+        return JSONResponse([])
+    stmt = pet_search_statement(session.get_bind().dialect.name, user.clinic_id, q, limit=10)
     results = []
-    for pet, parent in session.exec(stmt).all():
+    for pet, parent in (await session.exec(stmt)).all():
         results.append(
             {
                 "id": pet.id,
@@ -862,6 +1225,32 @@ def pets_search(q: str, request: Request, session: Session = Depends(get_session
     return JSONResponse(results)
 
 
+@app.post("/api/import/pets")
+def pets_import(
+    request: Request,
+    file: UploadFile = File(...),
+    format: Optional[str] = Form(None),
+    session: Session = Depends(get_session),
+):
+    user_or_redirect = require_user(request, session)
+    if isinstance(user_or_redirect, RedirectResponse):
+        return JSONResponse({"error_code": "UNAUTHORIZED"}, status_code=401)
+    user = user_or_redirect
+    fmt = format or detect_format(file.filename or "")
+    if fmt not in IMPORT_FORMATS:
+        return JSONResponse({"error": "format must be csv, jsonl or json"}, status_code=400)
+    stream = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+    try:
+        report = import_stream(session, user.clinic_id, stream, fmt)
+    except UnicodeDecodeError:
+        return JSONResponse({"error": "file must be UTF-8 encoded"}, status_code=400)
+    finally:
+        stream.detach()
+    # Bulk inserts bypass the ORM unit of work, so the flush hooks never see these rows.
+    dashboard_cache.discard_where(lambda key, _value: key[0] == user.clinic_id)
+    return JSONResponse(report.as_dict())
+
+
 @app.get("/pets/new", response_class=HTMLResponse)
 def pets_new(request: Request, session: Session = Depends(get_session)):
     user_or_redirect = require_user(request, session)
@@ -1006,18 +1395,29 @@ def pets_delete(pet_id: str, request: Request, session: Session = Depends(get_se
     return RedirectResponse(url="/pets", status_code=303)
 
 @app.get("/pets/{pet_id}", response_class=HTMLResponse)
-def pets_view(pet_id: str, request: Request, session: Session = Depends(get_session)):
-    user_or_redirect = require_user(request, session)
+async def pets_view(
+    pet_id: str,
+    request: Request,
+    cursor: Optional[str] = None,
+    session: AsyncSession = Depends(get_async_session),
+):
+    user_or_redirect = await require_user_async(request, session)
     if isinstance(user_or_redirect, RedirectResponse):
         return user_or_redirect
     user = user_or_redirect
-    pet = session.get(Pet, pet_id)
-    if not pet or pet.deleted_at is not None or pet.clinic_id != user.clinic_id:
+    found = (
+        await session.exec(
+            select(Pet, PetParent)
+            .join(PetParent, PetParent.id == Pet.pet_parent_id, isouter=True)
+            .where(Pet.id == pet_id, Pet.clinic_id == user.clinic_id, Pet.deleted_at.is_(None))
+        )
+    ).first()
+    if not found:
         return RedirectResponse(url="/pets", status_code=303)
-    parent = session.get(PetParent, pet.pet_parent_id) if pet.pet_parent_id else None
+    pet, parent = found
     contact_blob = parse_contact_blob(parent.govt_id_reference) if parent else {}
 
-    last_visit = session.exec(
+    last_visit_stmt = (
         select(Appointment)
         .where(
             Appointment.clinic_id == user.clinic_id,
@@ -1026,10 +1426,11 @@ def pets_view(pet_id: str, request: Request, session: Session = Depends(get_sess
             Appointment.deleted_at.is_(None),
         )
         .order_by(Appointment.appointment_date.desc(), Appointment.start_time.desc())
-    ).first()
+    )
+    last_visit = (await session.exec(last_visit_stmt)).first()
 
     today = dt.date.today()
-    next_appt = session.exec(
+    next_appt_stmt = (
         select(Appointment)
         .where(
             Appointment.clinic_id == user.clinic_id,
@@ -1039,7 +1440,9 @@ def pets_view(pet_id: str, request: Request, session: Session = Depends(get_sess
             Appointment.deleted_at.is_(None),
         )
         .order_by(Appointment.appointment_date.asc(), Appointment.start_time.asc())
-    ).first()
+    )
+    next_appt = (await session.exec(next_appt_stmt)).first()
+    timeline = await load_pet_timeline(session, user.clinic_id, pet.id, cursor)
 
     return templates.TemplateResponse(
         "pets_view.html",
@@ -1050,32 +1453,189 @@ def pets_view(pet_id: str, request: Request, session: Session = Depends(get_sess
             "contact_blob": contact_blob,
             "last_visit": last_visit,
             "next_appt": next_appt,
+            "timeline": timeline.items,
+            **page_links(request, timeline),
         },
     )
 
 
+@app.get("/api/pets/{pet_id}/timeline")
+async def pet_timeline(
+    pet_id: str,
+    request: Request,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+    session: AsyncSession = Depends(get_async_session),
+):
+    user_or_redirect = await require_user_async(request, session)
+    if isinstance(user_or_redirect, RedirectResponse):
+        return JSONResponse({"error_code": "UNAUTHORIZED"}, status_code=401)
+    user = user_or_redirect
+    pet_exists = (
+        await session.exec(
+            select(Pet.id).where(
+                Pet.id == pet_id, Pet.clinic_id == user.clinic_id, Pet.deleted_at.is_(None)
+            )
+        )
+    ).first()
+    if not pet_exists:
+        return JSONResponse({"error_code": "NOT_FOUND"}, status_code=404)
+    page = await load_pet_timeline(
+        session, user.clinic_id, pet_id, cursor, timeline_page_size(limit)
+    )
+    return JSONResponse({"items": page.items, "next_cursor": page.next_cursor})
+
+
 
 # Appointments
 @app.get("/appointments", response_class=HTMLResponse)
 def appointments_list(
     request: Request,
     pet_id: Optional[str] = None,
+    vet_id: Optional[str] = None,
+    status: Optional[str] = None,
+    from_date: Optional[str] = None,
+    to_date: Optional[str] = None,
     session: Session = Depends(get_session),
 ):
     user_or_redirect = require_user(request, session)
     if isinstance(user_or_redirect, RedirectResponse):
         return user_or_redirect
     user = user_or_redirect
-    context = build_appointments_context(session, user.clinic_id)
-    if pet_id:
-        context["appointments"] = [
-            appt for appt in context["appointments"] if appt.pet_id == pet_id
-        ]
-    context.update({"request": request})
+    filters = parse_appointment_filters(pet_id, vet_id, status, from_date, to_date)
+    context = build_appointments_context(session, user.clinic_id, filters)
+    context["request"] = request
     return templates.TemplateResponse("appointments_list.html", context)
 
 
-@app.get("/appointments/new", response_class=HTMLResponse)
+@app.get("/api/appointments/feed")
+async def appointments_feed(
+    start: str,
+    end: str,
+    request: Request,
+    pet_id: Optional[str] = None,
+    vet_id: Optional[str] = None,
+    status: Optional[str] = None,
+    from_date: Optional[str] = None,
+    to_date: Optional[str] = None,
+    session: AsyncSession = Depends(get_async_session),
+):
+    user_or_redirect = await require_user_async(request, session)
+    if isinstance(user_or_redirect, RedirectResponse):
+        return JSONResponse([], status_code=401)
+    user = user_or_redirect
+    try:
+        start_date = dt.datetime.fromisoformat(start).date()
+        end_date = parse_calendar_bound(end)
+    except ValueError:
+        return JSONResponse({"error": "start and end must be ISO dates"}, status_code=400)
+    stmt = (
+        select(Appointment, Pet.name, User.name)
+        .join(
+            Pet,
+            (Appointment.pet_id == Pet.id) & Pet.deleted_at.is_(None),
+            isouter=True,
+        )
+        .join(
+            User,
+            (Appointment.vet_id == User.id)
+            & (User.role == UserRole.vet)
+            & User.deleted_at.is_(None),
+            isouter=True,
+        )
+        .where(
+            Appointment.clinic_id == user.clinic_id,
+            Appointment.deleted_at.is_(None),
+            Appointment.appointment_date >= start_date,
+            Appointment.appointment_date < end_date,
+            *parse_appointment_filters(pet_id, vet_id, status, from_date, to_date).conditions(),
+        )
+        .order_by(Appointment.appointment_date, Appointment.start_time)
+    )
+    events = [
+        appointment_event(appt, pet_name, vet_name)
+        for appt, pet_name, vet_name in (await session.exec(stmt)).all()
+    ]
+    return JSONResponse(events)
+
+
+@app.get("/api/appointments/availability")
+def appointments_availability(
+    start: str,
+    request: Request,
+    end: Optional[str] = None,
+    vet_id: Optional[str] = None,
+    slot_minutes: int = DEFAULT_SLOT_MINUTES,
+    session: Session = Depends(get_session),
+):
+    user_or_redirect = require_user(request, session)
+    if isinstance(user_or_redirect, RedirectResponse):
+        return JSONResponse([], status_code=401)
+    user = user_or_redirect
+    try:
+        start_date = dt.date.fromisoformat(start)
+        end_date = dt.date.fromisoformat(end) if end else start_date + dt.timedelta(days=7)
+    except ValueError:
+        return JSONResponse({"error": "start and end must be ISO dates"}, status_code=400)
+    if end_date <= start_date or (end_date - start_date).days > MAX_AVAILABILITY_DAYS:
+        return JSONResponse(
+            {"error": f"end must be after start and at most {MAX_AVAILABILITY_DAYS} days later"},
+            status_code=400,
+        )
+    if not 5 <= slot_minutes <= 24 * 60:
+        return JSONResponse({"error": "slot_minutes must be between 5 and 1440"}, status_code=400)
+    vets_stmt = select(User).where(
+        User.clinic_id == user.clinic_id,
+        User.role == UserRole.vet,
+        User.deleted_at.is_(None),
+    )
+    if vet_id:
+        vets_stmt = vets_stmt.where(User.id == vet_id)
+    vets = session.exec(vets_stmt.order_by(User.name)).all()
+    if not vets:
+        return JSONResponse({"slot_minutes": slot_minutes, "vets": []})
+    stmt = (
+        select(
+            Appointment.vet_id,
+            Appointment.appointment_date,
+            Appointment.start_time,
+            Appointment.end_time,
+        )
+        .where(
+            Appointment.clinic_id == user.clinic_id,
+            Appointment.deleted_at.is_(None),
+            Appointment.status != AppointmentStatus.cancelled,
+            Appointment.status != AppointmentStatus.no_show,
+            Appointment.appointment_date >= start_date,
+            Appointment.appointment_date < end_date,
+        )
+        .order_by(Appointment.appointment_date, Appointment.start_time)
+    )
+    if vet_id:
+        stmt = stmt.where(Appointment.vet_id == vet_id)
+    busy = {}
+    for row_vet_id, appt_date, appt_start, appt_end in session.exec(stmt).all():
+        busy.setdefault((row_vet_id, appt_date), []).append((appt_start, appt_end))
+    dates = [start_date + dt.timedelta(days=offset) for offset in range((end_date - start_date).days)]
+    results = []
+    for vet in vets:
+        days = []
+        for day in dates:
+            free = free_intervals(busy.get((vet.id, day), []), slot_minutes)
+            days.append(
+                {
+                    "date": day.isoformat(),
+                    "free": [
+                        {"start": free_start.strftime("%H:%M"), "end": free_end.strftime("%H:%M")}
+                        for free_start, free_end in free
+                    ],
+                }
+            )
+        results.append({"vet_id": vet.id, "vet_name": vet.name, "days": days})
+    return JSONResponse({"slot_minutes": slot_minutes, "vets": results})
+
+
+@app.get("/appointments/new", response_class=HTMLResponse)
 def appointments_new(request: Request, session: Session = Depends(get_session)):
     user_or_redirect = require_user(request, session)
     if isinstance(user_or_redirect, RedirectResponse):
@@ -1102,6 +1662,60 @@ def appointments_new(request: Request, session: Session = Depends(get_session)):
     )
 
 
+MAX_SLOT_CHECKS = 100
+
+
+class SlotProposal(BaseModel):
+    vet_id: str
+    appointment_date: dt.date
+    start_time: dt.time
+    end_time: dt.time
+    exclude_id: Optional[str] = None
+
+
+class SlotCheckRequest(BaseModel):
+    slots: list[SlotProposal]
+
+
+def slot_condition(
+    vet_id: str,
+    appt_date: dt.date,
+    start: dt.time,
+    end: dt.time,
+    exclude_id: Optional[str] = None,
+):
+    conditions = [
+        Appointment.vet_id == vet_id,
+        Appointment.appointment_date == appt_date,
+        Appointment.start_time < end,
+        Appointment.end_time > start,
+    ]
+    if exclude_id:
+        conditions.append(Appointment.id != exclude_id)
+    return and_(*conditions)
+
+
+def overlaps_statement(
+    clinic_id: str,
+    vet_id: str,
+    appt_date: dt.date,
+    start: dt.time = dt.time.min,
+    end: dt.time = dt.time.max,
+    exclude_id: Optional[str] = None,
+):
+    return (
+        select(Appointment)
+        .where(
+            Appointment.clinic_id == clinic_id,
+            Appointment.deleted_at.is_(None),
+            Appointment.status != AppointmentStatus.cancelled,
+            Appointment.status != AppointmentStatus.no_show,
+            slot_condition(vet_id, appt_date, start, end, exclude_id),
+        )
+        .order_by(Appointment.start_time)
+    )
+
+
 def get_overlaps(
     session: Session,
     clinic_id: str,
@@ -1111,21 +1725,38 @@ def get_overlaps(
     end: dt.time,
     exclude_id: Optional[str] = None,
 ) -> list[Appointment]:
-    stmt = select(Appointment).where(
-        Appointment.clinic_id == clinic_id,
-        Appointment.vet_id == vet_id,
-        Appointment.appointment_date == appt_date,
-        Appointment.deleted_at.is_(None),
-        Appointment.status != AppointmentStatus.cancelled,
-        Appointment.status != AppointmentStatus.no_show,
+    stmt = overlaps_statement(clinic_id, vet_id, appt_date, start, end, exclude_id)
+    return session.exec(stmt).all()
+
+
+def appointment_conflict(appt: Appointment, pet_name: Optional[str], vet_name: Optional[str]) -> dict:
+    return {
+        "appointment_id": appt.id,
+        "vet_name": vet_name or "Vet",
+        "pet_name": pet_name or "Pet",
+        "start_time": appt.start_time.strftime("%H:%M"),
+        "end_time": appt.end_time.strftime("%H:%M"),
+    }
+
+
+def overlap_detected_response(session: Session, vet_id: str, overlaps: list[Appointment]) -> JSONResponse:
+    vet = session.get(User, vet_id)
+    pet_map = load_map(session, Pet, [appt.pet_id for appt in overlaps])
+    conflicts = [
+        appointment_conflict(
+            appt,
+            pet_map[appt.pet_id].name if appt.pet_id in pet_map else None,
+            vet.name if vet else None,
+        )
+        for appt in overlaps
+    ]
+    return JSONResponse(
+        {
+            "error_code": "OVERLAP_DETECTED",
+            "conflicts": conflicts,
+        },
+        status_code=409,
     )
-    if exclude_id:
-        stmt = stmt.where(Appointment.id != exclude_id)
-    overlaps = []
-    for appt in session.exec(stmt).all():
-        if start < appt.end_time and end > appt.start_time:
-            overlaps.append(appt)
-    return overlaps
 
 
 @app.post("/appointments/new")
@@ -1174,25 +1805,7 @@ def appointments_create(
         )
     overlaps = get_overlaps(session, user.clinic_id, vet_id, appt_date, start, end)
     if overlaps and not allow_overlap:
-        vet = session.get(User, vet_id)
-        conflicts = []
-        for appt in overlaps:
-            pet = session.get(Pet, appt.pet_id)
-            conflicts.append(
-                {
-                    "vet_name": vet.name if vet else "Vet",
-                    "pet_name": pet.name if pet else "Pet",
-                    "start_time": appt.start_time.strftime("%H:%M"),
-                    "end_time": appt.end_time.strftime("%H:%M"),
-                }
-            )
-        return JSONResponse(
-            {
-                "error_code": "OVERLAP_DETECTED",
-                "conflicts": conflicts,
-            },
-            status_code=409,
-        )
+        return overlap_detected_response(session, vet_id, overlaps)
     if overlaps and allow_overlap and confirm_override != "yes":
         return JSONResponse(
             {"error_code": "OVERRIDE_CONFIRMATION_REQUIRED"},
@@ -1220,6 +1833,87 @@ def appointments_create(
     return RedirectResponse(url="/appointments", status_code=303)
 
 
+@app.post("/api/appointments/check-slots")
+def appointments_check_slots(
+    payload: SlotCheckRequest,
+    request: Request,
+    session: Session = Depends(get_session),
+):
+    user_or_redirect = require_user(request, session)
+    if isinstance(user_or_redirect, RedirectResponse):
+        return JSONResponse({"error_code": "UNAUTHORIZED"}, status_code=401)
+    user = user_or_redirect
+    slots = payload.slots
+    if len(slots) > MAX_SLOT_CHECKS:
+        return JSONResponse(
+            {"error_code": "TOO_MANY_SLOTS", "max_slots": MAX_SLOT_CHECKS},
+            status_code=400,
+        )
+    valid = [slot for slot in slots if slot.end_time > slot.start_time]
+    rows = []
+    if valid:
+        stmt = (
+            select(Appointment, Pet.name, User.name)
+            .outerjoin(Pet, Pet.id == Appointment.pet_id)
+            .outerjoin(User, User.id == Appointment.vet_id)
+            .where(
+                Appointment.clinic_id == user.clinic_id,
+                Appointment.deleted_at.is_(None),
+                Appointment.status != AppointmentStatus.cancelled,
+                Appointment.status != AppointmentStatus.no_show,
+                or_(
+                    *[
+                        slot_condition(
+                            slot.vet_id,
+                            slot.appointment_date,
+                            slot.start_time,
+                            slot.end_time,
+                            slot.exclude_id,
+                        )
+                        for slot in valid
+                    ]
+                ),
+            )
+            .order_by(Appointment.appointment_date, Appointment.start_time)
+        )
+        rows = session.exec(stmt).all()
+    results = []
+    for index, slot in enumerate(slots):
+        if slot.end_time <= slot.start_time:
+            results.append(
+                {"index": index, "available": False, "error": "End time must be after start time"}
+            )
+            continue
+        conflicts = [
+            appointment_conflict(appt, pet_name, vet_name)
+            for appt, pet_name, vet_name in rows
+            if appt.vet_id == slot.vet_id
+            and appt.appointment_date == slot.appointment_date
+            and appt.start_time < slot.end_time
+            and appt.end_time > slot.start_time
+            and appt.id != slot.exclude_id
+        ]
+        clashes = [
+            other_index
+            for other_index, other in enumerate(slots)
+            if other_index != index
+            and other.end_time > other.start_time
+            and other.vet_id == slot.vet_id
+            and other.appointment_date == slot.appointment_date
+            and other.start_time < slot.end_time
+            and other.end_time > slot.start_time
+        ]
+        results.append(
+            {
+                "index": index,
+                "available": not conflicts and not clashes,
+                "conflicts": conflicts,
+                "clashes_with": clashes,
+            }
+        )
+    return {"results": results}
+
+
 @app.get("/appointments/{appointment_id}/edit", response_class=HTMLResponse)
 def appointments_edit(appointment_id: str, request: Request, session: Session = Depends(get_session)):
     user_or_redirect = require_user(request, session)
@@ -1318,25 +2012,7 @@ def appointments_update(
         exclude_id=appointment.id,
     )
     if overlaps and not allow_overlap:
-        vet = session.get(User, vet_id)
-        conflicts = []
-        for appt in overlaps:
-            pet = session.get(Pet, appt.pet_id)
-            conflicts.append(
-                {
-                    "vet_name": vet.name if vet else "Vet",
-                    "pet_name": pet.name if pet else "Pet",
-                    "start_time": appt.start_time.strftime("%H:%M"),
-                    "end_time": appt.end_time.strftime("%H:%M"),
-                }
-            )
-        return JSONResponse(
-            {
-                "error_code": "OVERLAP_DETECTED",
-                "conflicts": conflicts,
-            },
-            status_code=409,
-        )
+        return overlap_detected_response(session, vet_id, overlaps)
     if overlaps and allow_overlap and confirm_override != "yes":
         return JSONResponse(
             {"error_code": "OVERRIDE_CONFIRMATION_REQUIRED"},
@@ -1374,10 +2050,88 @@ def appointments_delete(appointment_id: str, request: Request, session: Session
     return RedirectResponse(url="/appointments", status_code=303)
 
 
+def parse_export_dates(start: Optional[str], end: Optional[str]):
+    start_date = dt.date.fromisoformat(start) if start else None
+    end_date = dt.date.fromisoformat(end) if end else None
+    return start_date, end_date
+
+
+def csv_download(rows, filename: str) -> StreamingResponse:
+    return StreamingResponse(
+        rows,
+        media_type="text/csv; charset=utf-8",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+# Exports
+@app.get("/exports/invoices.csv")
+def invoices_export(
+    request: Request,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    status: Optional[InvoiceStatus] = None,
+    session: Session = Depends(get_session),
+):
+    user_or_redirect = require_user(request, session)
+    if isinstance(user_or_redirect, RedirectResponse):
+        return user_or_redirect
+    user = user_or_redirect
+    try:
+        start_date, end_date = parse_export_dates(start, end)
+    except ValueError:
+        return PlainTextResponse("start and end must be YYYY-MM-DD", status_code=400)
+    stmt = invoices_export_statement(user.clinic_id, start_date, end_date, status)
+    return csv_download(stream_csv(stmt, INVOICE_COLUMNS), "invoices.csv")
+
+
+@app.get("/exports/payments.csv")
+def payments_export(
+    request: Request,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    status: Optional[PaymentStatus] = None,
+    session: Session = Depends(get_session),
+):
+    user_or_redirect = require_user(request, session)
+    if isinstance(user_or_redirect, RedirectResponse):
+        return user_or_redirect
+    user = user_or_redirect
+    try:
+        start_date, end_date = parse_export_dates(start, end)
+    except ValueError:
+        return PlainTextResponse("start and end must be YYYY-MM-DD", status_code=400)
+    stmt = payments_export_statement(user.clinic_id, start_date, end_date, status)
+    return csv_download(stream_csv(stmt, PAYMENT_COLUMNS), "payments.csv")
+
+
+@app.get("/exports/medical-records.csv")
+def medical_records_export(
+    request: Request,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    pet_id: Optional[str] = None,
+    session: Session = Depends(get_session),
+):
+    user_or_redirect = require_user(request, session)
+    if isinstance(user_or_redirect, RedirectResponse):
+        return user_or_redirect
+    user = user_or_redirect
+    try:
+        start_date, end_date = parse_export_dates(start, end)
+    except ValueError:
+        return PlainTextResponse("start and end must be YYYY-MM-DD", status_code=400)
+    stmt = medical_records_export_statement(user.clinic_id, start_date, end_date, pet_id)
+    return csv_download(stream_csv(stmt, MEDICAL_RECORD_COLUMNS), "medical-records.csv")
+
+
 # Medical Records
 @app.get("/medical-records", response_class=HTMLResponse)
 def medical_records_list(
-    request: Request, pet_id: Optional[str] = None, session: Session = Depends(get_session)
+    request: Request,
+    pet_id: Optional[str] = None,
+    cursor: Optional[str] = None,
+    session: Session = Depends(get_session),
 ):
     user_or_redirect = require_user(request, session)
     if isinstance(user_or_redirect, RedirectResponse):
@@ -1388,19 +2142,22 @@ def medical_records_list(
     )
     if pet_id:
         stmt = stmt.where(MedicalRecord.pet_id == pet_id)
-    records = session.exec(stmt).all()
-    pets = session.exec(
-        select(Pet).where(Pet.clinic_id == user.clinic_id, Pet.deleted_at.is_(None))
-    ).all()
-    vets = session.exec(
-        select(User).where(
-            User.clinic_id == user.clinic_id,
-            User.role == UserRole.vet,
-            User.deleted_at.is_(None),
-        )
-    ).all()
-    pet_map = {p.id: p for p in pets}
-    vet_map = {v.id: v for v in vets}
+    sort_columns = [MedicalRecord.visit_date, MedicalRecord.id]
+    page = build_page(
+        session.exec(keyset_paginate(stmt, sort_columns, cursor, descending=True)).all(),
+        sort_columns,
+    )
+    records = page.items
+    pet_map = load_map(
+        session, Pet, [r.pet_id for r in records], Pet.deleted_at.is_(None)
+    )
+    vet_map = load_map(
+        session,
+        User,
+        [r.vet_id for r in records],
+        User.role == UserRole.vet,
+        User.deleted_at.is_(None),
+    )
     return templates.TemplateResponse(
         "medical_records_list.html",
         {
@@ -1408,6 +2165,8 @@ def medical_records_list(
             "records": records,
             "pet_map": pet_map,
             "vet_map": vet_map,
+            "pet_id": pet_id or "",
+            **page_links(request, page),
         },
     )
 
@@ -1541,18 +2300,23 @@ def medical_records_delete(record_id: str, request: Request, session: Session =
 
 # Inventory Items
 @app.get("/inventory-items", response_class=HTMLResponse)
-def inventory_items_list(request: Request, session: Session = Depends(get_session)):
+def inventory_items_list(
+    request: Request, cursor: Optional[str] = None, session: Session = Depends(get_session)
+):
     user_or_redirect = require_user(request, session)
     if isinstance(user_or_redirect, RedirectResponse):
         return user_or_redirect
     user = user_or_redirect
-    items = session.exec(
-        select(InventoryItem).where(
-            InventoryItem.clinic_id == user.clinic_id, InventoryItem.deleted_at.is_(None)
-        )
-    ).all()
+    sort_columns = [InventoryItem.name, InventoryItem.id]
+    stmt = select(InventoryItem).where(
+        InventoryItem.clinic_id == user.clinic_id, InventoryItem.deleted_at.is_(None)
+    )
+    page = build_page(
+        session.exec(keyset_paginate(stmt, sort_columns, cursor)).all(), sort_columns
+    )
     return templates.TemplateResponse(
-        "inventory_items_list.html", {"request": request, "items": items}
+        "inventory_items_list.html",
+        {"request": request, "items": page.items, **page_links(request, page)},
     )
 
 
@@ -1649,7 +2413,10 @@ def inventory_items_delete(item_id: str, request: Request, session: Session = De
 # Invoices
 @app.get("/invoices", response_class=HTMLResponse)
 def invoices_list(
-    request: Request, pet_id: Optional[str] = None, session: Session = Depends(get_session)
+    request: Request,
+    pet_id: Optional[str] = None,
+    cursor: Optional[str] = None,
+    session: Session = Depends(get_session),
 ):
     user_or_redirect = require_user(request, session)
     if isinstance(user_or_redirect, RedirectResponse):
@@ -1660,13 +2427,23 @@ def invoices_list(
     )
     if pet_id:
         stmt = stmt.where(Invoice.pet_id == pet_id)
-    invoices = session.exec(stmt).all()
-    pets = session.exec(
-        select(Pet).where(Pet.clinic_id == user.clinic_id, Pet.deleted_at.is_(None))
-    ).all()
-    pet_map = {p.id: p for p in pets}
+    sort_columns = [Invoice.created_at, Invoice.id]
+    page = build_page(
+        session.exec(keyset_paginate(stmt, sort_columns, cursor, descending=True)).all(),
+        sort_columns,
+    )
+    invoices = page.items
+    pet_map = load_map(
+        session, Pet, [i.pet_id for i in invoices], Pet.deleted_at.is_(None)
+    )
     return templates.TemplateResponse(
-        "invoices_list.html", {"request": request, "invoices": invoices, "pet_map": pet_map}
+        "invoices_list.html",
+        {
+            "request": request,
+            "invoices": invoices,
+            "pet_map": pet_map,
+            **page_links(request, page),
+        },
     )
 
 
@@ -1695,11 +2472,32 @@ def is_valid_invoice_status_transition(current: InvoiceStatus, new: InvoiceStatu
     return False
 
 
+def invoice_number_taken(
+    request: Request, session: Session, clinic_id: str, invoice_id: Optional[str] = None
+):
+    session.rollback()
+    invoice = session.get(Invoice, invoice_id) if invoice_id else None
+    pets = session.exec(
+        select(Pet).where(Pet.clinic_id == clinic_id, Pet.deleted_at.is_(None))
+    ).all()
+    return templates.TemplateResponse(
+        "invoices_form.html",
+        {
+            "request": request,
+            "invoice": invoice,
+            "pets": pets,
+            "statuses": InvoiceStatus,
+            "error": "An invoice with this number already exists.",
+        },
+        status_code=400,
+    )
+
+
 @app.post("/invoices/new")
 def invoices_create(
     request: Request,
     pet_id: str = Form(...),
-    invoice_number: str = Form(...),
+    invoice_number: str = Form(""),
     total_amount: str = Form(...),
     gst_amount: str = Form(...),
     status: InvoiceStatus = Form(...),
@@ -1719,8 +2517,15 @@ def invoices_create(
         created_at=now_utc(),
         updated_at=now_utc(),
     )
+    refresh_invoice_balance(invoice)
+    if not invoice.invoice_number.strip():
+        # Allocated last so the sequence row stays locked only for the insert and commit.
+        invoice.invoice_number = allocate_invoice_number(session.connection(), user.clinic_id)
     session.add(invoice)
-    session.commit()
+    try:
+        session.commit()
+    except IntegrityError:
+        return invoice_number_taken(request, session, user.clinic_id)
     return RedirectResponse(url="/invoices", status_code=303)
 
 
@@ -1762,10 +2567,16 @@ def invoices_update(
     if isinstance(user_or_redirect, RedirectResponse):
         return user_or_redirect
     user = user_or_redirect
-    invoice = session.get(Invoice, invoice_id)
+    # Locked like the payment path, so paid_amount cannot move while the new total is checked.
+    invoice = session.get(Invoice, invoice_id, with_for_update=True, populate_existing=True)
     if not invoice or invoice.deleted_at is not None or invoice.clinic_id != user.clinic_id:
         return RedirectResponse(url="/invoices", status_code=303)
+    error = None
     if not is_valid_invoice_status_transition(invoice.status, status):
+        error = "Invalid invoice status transition"
+    elif Decimal(total_amount) < invoice.paid_amount:
+        error = f"Total cannot be less than the {invoice.paid_amount} already paid."
+    if error:
         pets = session.exec(
             select(Pet).where(Pet.clinic_id == user.clinic_id, Pet.deleted_at.is_(None))
         ).all()
@@ -1776,7 +2587,7 @@ def invoices_update(
                 "invoice": invoice,
                 "pets": pets,
                 "statuses": InvoiceStatus,
-                "error": "Invalid invoice status transition",
+                "error": error,
             },
             status_code=400,
         )
@@ -1785,9 +2596,13 @@ def invoices_update(
     invoice.total_amount = Decimal(total_amount)
     invoice.gst_amount = Decimal(gst_amount)
     invoice.status = status
+    refresh_invoice_balance(invoice)
     invoice.updated_at = now_utc()
     session.add(invoice)
-    session.commit()
+    try:
+        session.commit()
+    except IntegrityError:
+        return invoice_number_taken(request, session, user.clinic_id, invoice_id)
     return RedirectResponse(url="/invoices", status_code=303)
 
 
@@ -1805,23 +2620,113 @@ def invoices_delete(invoice_id: str, request: Request, session: Session = Depend
     return RedirectResponse(url="/invoices", status_code=303)
 
 
+def refresh_invoice_balance(invoice: Invoice) -> None:
+    if (
+        invoice.total_amount - invoice.paid_amount <= 0
+        and invoice.status != InvoiceStatus.paid
+        and is_valid_invoice_status_transition(invoice.status, InvoiceStatus.paid)
+    ):
+        invoice.status = InvoiceStatus.paid
+    # A paid invoice owes nothing, whether its payments cover it or it was settled by hand.
+    if invoice.status == InvoiceStatus.paid:
+        invoice.outstanding_amount = Decimal("0")
+    else:
+        invoice.outstanding_amount = invoice.total_amount - invoice.paid_amount
+
+
+def payment_contribution(payment: Payment) -> Decimal:
+    if payment.status == PaymentStatus.paid and payment.deleted_at is None:
+        return payment.amount
+    return Decimal("0")
+
+
+def clinic_invoice_exists(session: Session, clinic_id: str, invoice_id: str) -> bool:
+    return session.exec(
+        select(Invoice.id).where(
+            Invoice.id == invoice_id, Invoice.clinic_id == clinic_id, Invoice.deleted_at.is_(None)
+        )
+    ).first() is not None
+
+
+def apply_invoice_payments(
+    session: Session, clinic_id: str, deltas: dict[str, Decimal]
+) -> Optional[str]:
+    # Flushing the payment first takes SQLite's write lock; on Postgres the row lock below
+    # serializes payments against the same invoice, so no concurrent delta is lost.
+    session.flush()
+    for invoice_id in sorted(deltas):
+        if not deltas[invoice_id]:
+            continue
+        invoice = session.exec(
+            select(Invoice)
+            .where(Invoice.id == invoice_id, Invoice.clinic_id == clinic_id, Invoice.deleted_at.is_(None))
+            .with_for_update()
+            .execution_options(populate_existing=True)
+        ).first()
+        if invoice is None:
+            continue
+        invoice.paid_amount += deltas[invoice_id]
+        # A paid invoice cannot move back to issued, so taking money off it would write the rest off.
+        if invoice.status == InvoiceStatus.paid and invoice.paid_amount < invoice.total_amount:
+            return f"Invoice {invoice.invoice_number} is paid; its payments cannot be reduced or removed."
+        refresh_invoice_balance(invoice)
+        invoice.updated_at = now_utc()
+        session.add(invoice)
+    return None
+
+
+def payment_form_error(
+    request: Request, session: Session, clinic_id: str, error: str, payment: Optional[Payment] = None
+):
+    session.rollback()
+    if payment is not None:
+        payment = session.get(Payment, payment.id)
+    invoices = session.exec(
+        select(Invoice).where(Invoice.clinic_id == clinic_id, Invoice.deleted_at.is_(None))
+    ).all()
+    return templates.TemplateResponse(
+        "payments_form.html",
+        {
+            "request": request,
+            "payment": payment,
+            "invoices": invoices,
+            "methods": PaymentMethod,
+            "statuses": PaymentStatus,
+            "error": error,
+        },
+        status_code=400,
+    )
+
+
 # Payments
 @app.get("/payments", response_class=HTMLResponse)
-def payments_list(request: Request, session: Session = Depends(get_session)):
+def payments_list(
+    request: Request, cursor: Optional[str] = None, session: Session = Depends(get_session)
+):
     user_or_redirect = require_user(request, session)
     if isinstance(user_or_redirect, RedirectResponse):
         return user_or_redirect
     user = user_or_redirect
-    payments = session.exec(
-        select(Payment).where(Payment.clinic_id == user.clinic_id, Payment.deleted_at.is_(None))
-    ).all()
-    invoices = session.exec(
-        select(Invoice).where(Invoice.clinic_id == user.clinic_id, Invoice.deleted_at.is_(None))
-    ).all()
-    invoice_map = {i.id: i for i in invoices}
+    sort_columns = [Payment.created_at, Payment.id]
+    stmt = select(Payment).where(
+        Payment.clinic_id == user.clinic_id, Payment.deleted_at.is_(None)
+    )
+    page = build_page(
+        session.exec(keyset_paginate(stmt, sort_columns, cursor, descending=True)).all(),
+        sort_columns,
+    )
+    payments = page.items
+    invoice_map = load_map(
+        session, Invoice, [p.invoice_id for p in payments], Invoice.deleted_at.is_(None)
+    )
     return templates.TemplateResponse(
         "payments_list.html",
-        {"request": request, "payments": payments, "invoice_map": invoice_map},
+        {
+            "request": request,
+            "payments": payments,
+            "invoice_map": invoice_map,
+            **page_links(request, page),
+        },
     )
 
 
@@ -1859,6 +2764,8 @@ def payments_create(
     if isinstance(user_or_redirect, RedirectResponse):
         return user_or_redirect
     user = user_or_redirect
+    if not clinic_invoice_exists(session, user.clinic_id, invoice_id):
+        return payment_form_error(request, session, user.clinic_id, "Choose an invoice from this clinic.")
     payment = Payment(
         clinic_id=user.clinic_id,
         invoice_id=invoice_id,
@@ -1870,6 +2777,11 @@ def payments_create(
         updated_at=now_utc(),
     )
     session.add(payment)
+    error = apply_invoice_payments(
+        session, user.clinic_id, {payment.invoice_id: payment_contribution(payment)}
+    )
+    if error:
+        return payment_form_error(request, session, user.clinic_id, error)
     session.commit()
     return RedirectResponse(url="/payments", status_code=303)
 
@@ -1916,13 +2828,22 @@ def payments_update(
     payment = session.get(Payment, payment_id)
     if not payment or payment.deleted_at is not None or payment.clinic_id != user.clinic_id:
         return RedirectResponse(url="/payments", status_code=303)
+    if not clinic_invoice_exists(session, user.clinic_id, invoice_id):
+        return payment_form_error(
+            request, session, user.clinic_id, "Choose an invoice from this clinic.", payment
+        )
+    deltas = {payment.invoice_id: -payment_contribution(payment)}
     payment.invoice_id = invoice_id
     payment.payment_method = payment_method
     payment.amount = Decimal(amount)
     payment.status = status
     payment.reference_id = reference_id
     payment.updated_at = now_utc()
+    deltas[invoice_id] = deltas.get(invoice_id, Decimal("0")) + payment_contribution(payment)
     session.add(payment)
+    error = apply_invoice_payments(session, user.clinic_id, deltas)
+    if error:
+        return payment_form_error(request, session, user.clinic_id, error, payment)
     session.commit()
     return RedirectResponse(url="/payments", status_code=303)
 
@@ -1932,27 +2853,134 @@ def payments_delete(payment_id: str, request: Request, session: Session = Depend
     user_or_redirect = require_user(request, session)
     if isinstance(user_or_redirect, RedirectResponse):
         return user_or_redirect
+    user = user_or_redirect
     payment = session.get(Payment, payment_id)
-    if payment and payment.deleted_at is None:
+    if payment and payment.deleted_at is None and payment.clinic_id == user.clinic_id:
+        refund = -payment_contribution(payment)
         payment.deleted_at = now_utc()
         payment.updated_at = now_utc()
         session.add(payment)
+        error = apply_invoice_payments(session, user.clinic_id, {payment.invoice_id: refund})
+        if error:
+            return payment_form_error(request, session, user.clinic_id, error, payment)
         session.commit()
     return RedirectResponse(url="/payments", status_code=303)
 
 
+# Receivables
+RECEIVABLE_STATUSES = (InvoiceStatus.issued,)
+AGING_BUCKETS = (("0-30", 30), ("31-60", 60), ("61-90", 90))
+AGING_OVERDUE_BUCKET = "90+"
+
+
+def open_receivables_conditions(clinic_id: str) -> list:
+    return [
+        Invoice.clinic_id == clinic_id,
+        Invoice.status.in_(RECEIVABLE_STATUSES),
+        Invoice.outstanding_amount > 0,
+        Invoice.deleted_at.is_(None),
+    ]
+
+
+def receivables_aging_statement(clinic_id: str, today: dt.date):
+    # Ages by invoice date; the range on outstanding_amount reads only open invoices off the index.
+    bucket = case(
+        *[
+            (
+                Invoice.created_at >= dt.datetime.combine(today - dt.timedelta(days=days), dt.time.min),
+                label,
+            )
+            for label, days in AGING_BUCKETS
+        ],
+        else_=AGING_OVERDUE_BUCKET,
+    )
+    return (
+        select(
+            bucket.label("bucket"),
+            func.count().label("invoices"),
+            func.sum(Invoice.outstanding_amount).label("outstanding"),
+        )
+        .where(*open_receivables_conditions(clinic_id))
+        .group_by(bucket)
+    )
+
+
+def receivables_aging(session: Session, clinic_id: str, today: dt.date) -> list[dict]:
+    rows = {row.bucket: row for row in session.exec(receivables_aging_statement(clinic_id, today))}
+    aging = []
+    for label in [label for label, _days in AGING_BUCKETS] + [AGING_OVERDUE_BUCKET]:
+        row = rows.get(label)
+        aging.append(
+            {
+                "bucket": label,
+                "invoices": row.invoices if row else 0,
+                "outstanding": Decimal(str(row.outstanding)).quantize(Decimal("0.01")) if row else Decimal("0.00"),
+            }
+        )
+    return aging
+
+
+@app.get("/receivables", response_class=HTMLResponse)
+def receivables(
+    request: Request, cursor: Optional[str] = None, session: Session = Depends(get_session)
+):
+    user_or_redirect = require_user(request, session)
+    if isinstance(user_or_redirect, RedirectResponse):
+        return user_or_redirect
+    user = user_or_redirect
+    aging = receivables_aging(session, user.clinic_id, dt.date.today())
+    sort_columns = [Invoice.created_at, Invoice.id]
+    stmt = select(Invoice).where(*open_receivables_conditions(user.clinic_id))
+    page = build_page(
+        session.exec(keyset_paginate(stmt, sort_columns, cursor)).all(),
+        sort_columns,
+    )
+    invoices = page.items
+    pet_map = load_map(
+        session, Pet, [i.pet_id for i in invoices], Pet.deleted_at.is_(None)
+    )
+    return templates.TemplateResponse(
+        "receivables.html",
+        {
+            "request": request,
+            "aging": aging,
+            "invoices": invoices,
+            "pet_map": pet_map,
+            **page_links(request, page),
+        },
+    )
+
+
+@app.get("/api/receivables/aging")
+def receivables_aging_api(request: Request, session: Session = Depends(get_session)):
+    user_or_redirect = require_user(request, session)
+    if isinstance(user_or_redirect, RedirectResponse):
+        return JSONResponse({"error_code": "UNAUTHORIZED"}, status_code=401)
+    user = user_or_redirect
+    aging = receivables_aging(session, user.clinic_id, dt.date.today())
+    return JSONResponse(
+        {"buckets": [{**row, "outstanding": str(row["outstanding"])} for row in aging]}
+    )
+
+
 # Reminder Logs
 @app.get("/reminder-logs", response_class=HTMLResponse)
-def reminder_logs_list(request: Request, session: Session = Depends(get_session)):
+def reminder_logs_list(
+    request: Request, cursor: Optional[str] = None, session: Session = Depends(get_session)
+):
     user_or_redirect = require_user(request, session)
     if isinstance(user_or_redirect, RedirectResponse):
         return user_or_redirect
     user = user_or_redirect
-    logs = session.exec(
-        select(ReminderLog).where(ReminderLog.clinic_id == user.clinic_id)
-    ).all()
+    sort_columns = [ReminderLog.created_at, ReminderLog.id]
+    stmt = select(ReminderLog).where(ReminderLog.clinic_id == user.clinic_id)
+    page = build_page(
+        session.exec(keyset_paginate(stmt, sort_columns, cursor, descending=True)).all(),
+        sort_columns,
+    )
     return templates.TemplateResponse(
-        "reminder_logs_list.html", {"request": request, "logs": logs}
+        "reminder_logs_list.html",
+        {"request": request, "logs": page.items, **page_links(request, page)},
     )
 
 
@@ -2004,14 +3032,22 @@ def reminder_logs_create(
 
 # Message Logs
 @app.get("/message-logs", response_class=HTMLResponse)
-def message_logs_list(request: Request, session: Session = Depends(get_session)):
+def message_logs_list(
+    request: Request, cursor: Optional[str] = None, session: Session = Depends(get_session)
+):
     user_or_redirect = require_user(request, session)
     if isinstance(user_or_redirect, RedirectResponse):
         return user_or_redirect
     user = user_or_redirect
-    logs = session.exec(select(MessageLog).where(MessageLog.clinic_id == user.clinic_id)).all()
+    sort_columns = [MessageLog.created_at, MessageLog.id]
+    stmt = select(MessageLog).where(MessageLog.clinic_id == user.clinic_id)
+    page = build_page(
+        session.exec(keyset_paginate(stmt, sort_columns, cursor, descending=True)).all(),
+        sort_columns,
+    )
     return templates.TemplateResponse(
-        "message_logs_list.html", {"request": request, "logs": logs}
+        "message_logs_list.html",
+        {"request": request, "logs": page.items, **page_links(request, page)},
     )
 
 
@@ -0,0 +1,391 @@
+import asyncio
+import datetime as dt
+import os
+import random
+import threading
+import time
+import uuid
+from collections import deque
+from dataclasses import dataclass
+from typing import Optional, Protocol
+
+from sqlalchemy import bindparam, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.db import insert_ignoring_duplicates
+from app.models import (
+    MessageLog,
+    MessageStatus,
+    ReminderChannel,
+    ReminderEntityType,
+    ReminderLog,
+    ReminderStatus,
+)
+
+MESSAGE_DISPATCH_BATCH_SIZE = int(os.getenv("MESSAGE_DISPATCH_BATCH_SIZE", "200"))
+MESSAGE_DISPATCH_CONCURRENCY = int(os.getenv("MESSAGE_DISPATCH_CONCURRENCY", "50"))
+# Token bucket per (provider, clinic): sustained sends per second and the burst allowance.
+MESSAGE_RATE_PER_SECOND = float(os.getenv("MESSAGE_RATE_PER_SECOND", "50"))
+MESSAGE_RATE_BURST = int(os.getenv("MESSAGE_RATE_BURST", "100"))
+MESSAGE_MAX_ATTEMPTS = int(os.getenv("MESSAGE_MAX_ATTEMPTS", "5"))
+MESSAGE_RETRY_BASE_SECONDS = float(os.getenv("MESSAGE_RETRY_BASE_SECONDS", "30"))
+MESSAGE_RETRY_MAX_SECONDS = float(os.getenv("MESSAGE_RETRY_MAX_SECONDS", "3600"))
+# While a send is in flight the row is parked this far in the future, so a crashed
+# worker's messages are only retried (with the same idempotency key) once it lapses.
+MESSAGE_SEND_LEASE_SECONDS = float(os.getenv("MESSAGE_SEND_LEASE_SECONDS", "300"))
+
+
+@dataclass(frozen=True)
+class OutboundMessage:
+    id: str
+    clinic_id: str
+    recipient_phone: str
+    template_name: str
+    payload: dict
+    idempotency_key: str
+    attempts: int
+
+
+@dataclass(frozen=True)
+class SendResult:
+    ok: bool
+    provider_message_id: Optional[str] = None
+    error: Optional[str] = None
+    retryable: bool = True
+
+
+class Sender(Protocol):
+    name: str
+
+    async def send(self, message: OutboundMessage) -> SendResult: ...
+
+
+class FakeSender:
+    name = "fake"
+
+    def __init__(
+        self,
+        latency_seconds: float = 0.0,
+        failures: Optional[dict[str, int]] = None,
+        fail_rate: float = 0.0,
+        seed: Optional[int] = None,
+    ):
+        self.latency_seconds = latency_seconds
+        # idempotency key -> number of transient failures to return before succeeding
+        self.failures = dict(failures or {})
+        self.fail_rate = fail_rate
+        self.random = random.Random(seed)
+        self.delivered: dict[str, str] = {}
+        self.calls = 0
+
+    async def send(self, message: OutboundMessage) -> SendResult:
+        self.calls += 1
+        if self.latency_seconds:
+            await asyncio.sleep(self.latency_seconds)
+        key = message.idempotency_key
+        if key in self.delivered:
+            return SendResult(ok=True, provider_message_id=self.delivered[key])
+        if self.failures.get(key):
+            self.failures[key] -= 1
+            return SendResult(ok=False, error="fake transient failure")
+        if self.fail_rate and self.random.random() < self.fail_rate:
+            return SendResult(ok=False, error="fake transient failure")
+        provider_message_id = f"fake-{uuid.uuid4().hex[:16]}"
+        self.delivered[key] = provider_message_id
+        return SendResult(ok=True, provider_message_id=provider_message_id)
+
+
+SENDERS = {"fake": FakeSender}
+
+
+def build_sender(name: Optional[str] = None) -> Sender:
+    name = name or os.getenv("MESSAGE_SENDER", "fake")
+    if name not in SENDERS:
+        raise ValueError(f"unknown MESSAGE_SENDER {name!r}; expected one of {', '.join(SENDERS)}")
+    return SENDERS[name]()
+
+
+@dataclass
+class DispatchStats:
+    claimed: int = 0
+    sent: int = 0
+    retried: int = 0
+    failed: int = 0
+
+    def add(self, other: "DispatchStats") -> None:
+        self.claimed += other.claimed
+        self.sent += other.sent
+        self.retried += other.retried
+        self.failed += other.failed
+
+    def as_dict(self) -> dict:
+        return {"claimed": self.claimed, "sent": self.sent, "retried": self.retried, "failed": self.failed}
+
+
+dispatch_metrics_lock = threading.Lock()
+dispatch_metrics = {
+    "batches": 0,
+    "claimed": 0,
+    "sent": 0,
+    "retried": 0,
+    "failed": 0,
+    "rate_limited_seconds_total": 0.0,
+    "send_seconds_total": 0.0,
+}
+dispatch_started_at = time.monotonic()
+send_latencies: deque = deque(maxlen=10000)
+
+
+def record_dispatch_metric(latencies: tuple = (), **deltas) -> None:
+    with dispatch_metrics_lock:
+        for name, delta in deltas.items():
+            dispatch_metrics[name] += delta
+        send_latencies.extend(latencies)
+
+
+def percentile(ordered: list[float], fraction: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def message_dispatch_metrics() -> dict:
+    with dispatch_metrics_lock:
+        snapshot = dict(dispatch_metrics)
+        latencies = sorted(send_latencies)
+    elapsed = time.monotonic() - dispatch_started_at
+    snapshot["sent_per_minute"] = round(snapshot["sent"] * 60 / elapsed, 1) if elapsed else 0.0
+    for label, fraction in (("p50", 0.5), ("p95", 0.95), ("p99", 0.99)):
+        snapshot[f"send_latency_{label}_ms"] = round(percentile(latencies, fraction) * 1000, 2)
+    return snapshot
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.capacity = max(burst, 1)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self) -> float:
+        started = time.monotonic()
+        # Waiters queue on the lock, so tokens are handed out in arrival order.
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return now - started
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+# Shared by every Dispatcher in the process; each worker process enforces its own limit.
+rate_buckets: dict[tuple[str, str], TokenBucket] = {}
+
+
+def rate_bucket(provider: str, clinic_id: str, rate: float, burst: int) -> TokenBucket:
+    key = (provider, clinic_id)
+    if key not in rate_buckets:
+        rate_buckets[key] = TokenBucket(rate, burst)
+    return rate_buckets[key]
+
+
+def backoff_delay(attempts: int) -> dt.timedelta:
+    delay = MESSAGE_RETRY_BASE_SECONDS * 2 ** max(attempts - 1, 0)
+    delay = min(delay, MESSAGE_RETRY_MAX_SECONDS) * random.uniform(1.0, 1.25)
+    return dt.timedelta(seconds=delay)
+
+
+def claim_statement(now: dt.datetime, batch_size: int, lease_seconds: float):
+    due = (
+        MessageLog.status == MessageStatus.queued,
+        or_(MessageLog.next_attempt_at.is_(None), MessageLog.next_attempt_at <= now),
+    )
+    # SKIP LOCKED lets concurrent dispatchers on Postgres take disjoint batches; SQLite
+    # serialises writers, and re-checking `due` in the UPDATE keeps a claim exclusive.
+    batch = (
+        select(MessageLog.id)
+        .where(*due)
+        .order_by(MessageLog.created_at)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+    return (
+        update(MessageLog)
+        .where(MessageLog.id.in_(batch.scalar_subquery()), *due)
+        .values(
+            attempts=MessageLog.attempts + 1,
+            next_attempt_at=now + dt.timedelta(seconds=lease_seconds),
+        )
+        .returning(
+            MessageLog.id,
+            MessageLog.clinic_id,
+            MessageLog.recipient_phone,
+            MessageLog.template_name,
+            MessageLog.payload,
+            MessageLog.dedupe_key,
+            MessageLog.attempts,
+        )
+    )
+
+
+def reminder_outcome(message: OutboundMessage, result: SendResult, now: dt.datetime) -> Optional[dict]:
+    entity_type = message.payload.get("entity_type")
+    entity_id = message.payload.get("entity_id")
+    if entity_type not in ReminderEntityType.__members__ or not entity_id:
+        return None
+    return {
+        "id": str(uuid.uuid4()),
+        "clinic_id": message.clinic_id,
+        "entity_type": ReminderEntityType(entity_type),
+        "entity_id": entity_id,
+        "channel": ReminderChannel.whatsapp,
+        "status": ReminderStatus.sent if result.ok else ReminderStatus.failed,
+        "failure_reason": None if result.ok else result.error,
+        "sent_at": now if result.ok else None,
+        "dedupe_key": message.idempotency_key,
+        "created_at": now,
+    }
+
+
+MARK_SENT = (
+    update(MessageLog)
+    .where(MessageLog.id == bindparam("message_id"))
+    .values(
+        status=MessageStatus.sent,
+        provider_message_id=bindparam("provider_id"),
+        next_attempt_at=None,
+        last_error=None,
+    )
+)
+MARK_RETRY = (
+    update(MessageLog)
+    .where(MessageLog.id == bindparam("message_id"))
+    .values(next_attempt_at=bindparam("retry_at"), last_error=bindparam("error"))
+)
+MARK_FAILED = (
+    update(MessageLog)
+    .where(MessageLog.id == bindparam("message_id"))
+    .values(status=MessageStatus.failed, next_attempt_at=None, last_error=bindparam("error"))
+)
+
+
+class Dispatcher:
+    def __init__(
+        self,
+        engine: AsyncEngine,
+        sender: Sender,
+        batch_size: int = MESSAGE_DISPATCH_BATCH_SIZE,
+        concurrency: int = MESSAGE_DISPATCH_CONCURRENCY,
+        max_attempts: int = MESSAGE_MAX_ATTEMPTS,
+        rate_per_second: float = MESSAGE_RATE_PER_SECOND,
+        burst: int = MESSAGE_RATE_BURST,
+    ):
+        self.engine = engine
+        self.sender = sender
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.max_attempts = max_attempts
+        self.rate_per_second = rate_per_second
+        self.burst = burst
+
+    def bucket(self, clinic_id: str) -> TokenBucket:
+        return rate_bucket(self.sender.name, clinic_id, self.rate_per_second, self.burst)
+
+    async def claim(self) -> list[OutboundMessage]:
+        statement = claim_statement(dt.datetime.utcnow(), self.batch_size, MESSAGE_SEND_LEASE_SECONDS)
+        async with self.engine.begin() as connection:
+            rows = (await connection.execute(statement)).all()
+        return [
+            OutboundMessage(
+                id=row.id,
+                clinic_id=row.clinic_id,
+                recipient_phone=row.recipient_phone,
+                template_name=row.template_name,
+                payload=row.payload or {},
+                idempotency_key=row.dedupe_key or row.id,
+                attempts=row.attempts,
+            )
+            for row in rows
+        ]
+
+    async def send_all(self, messages: list[OutboundMessage]) -> list[tuple[SendResult, float]]:
+        semaphore = asyncio.Semaphore(self.concurrency)
+        waited_total = 0.0
+
+        async def send_one(message: OutboundMessage) -> tuple[SendResult, float]:
+            nonlocal waited_total
+            # Wait for the clinic's token before taking a slot, so one throttled clinic
+            # cannot hold every slot while the others have tokens to spare.
+            waited_total += await self.bucket(message.clinic_id).acquire()
+            async with semaphore:
+                started = time.perf_counter()
+                try:
+                    result = await self.sender.send(message)
+                except Exception as exc:
+                    result = SendResult(ok=False, error=f"{exc.__class__.__name__}: {exc}")
+                return result, time.perf_counter() - started
+
+        results = await asyncio.gather(*[send_one(message) for message in messages])
+        record_dispatch_metric(rate_limited_seconds_total=waited_total)
+        return results
+
+    async def dispatch_batch(self) -> DispatchStats:
+        stats = DispatchStats()
+        messages = await self.claim()
+        if not messages:
+            return stats
+        stats.claimed = len(messages)
+        results = await self.send_all(messages)
+
+        now = dt.datetime.utcnow()
+        sent, retry, failed, outcomes = [], [], [], []
+        for message, (result, _) in zip(messages, results):
+            if result.ok:
+                sent.append({"message_id": message.id, "provider_id": result.provider_message_id})
+            elif result.retryable and message.attempts < self.max_attempts:
+                retry.append(
+                    {
+                        "message_id": message.id,
+                        "retry_at": now + backoff_delay(message.attempts),
+                        "error": result.error,
+                    }
+                )
+                continue
+            else:
+                failed.append({"message_id": message.id, "error": result.error})
+            outcome = reminder_outcome(message, result, now)
+            if outcome:
+                outcomes.append(outcome)
+        async with self.engine.begin() as connection:
+            for statement, rows in ((MARK_SENT, sent), (MARK_RETRY, retry), (MARK_FAILED, failed)):
+                if rows:
+                    await connection.execute(statement, rows)
+            if outcomes:
+                await connection.execute(
+                    insert_ignoring_duplicates(self.engine.dialect.name, ReminderLog, ["dedupe_key"]),
+                    outcomes,
+                )
+        stats.sent, stats.retried, stats.failed = len(sent), len(retry), len(failed)
+        latencies = tuple(latency for _, latency in results)
+        record_dispatch_metric(
+            latencies,
+            batches=1,
+            send_seconds_total=sum(latencies),
+            **stats.as_dict(),
+        )
+        return stats
+
+    async def drain(self, max_batches: Optional[int] = None) -> DispatchStats:
+        total = DispatchStats()
+        batches = 0
+        while max_batches is None or batches < max_batches:
+            stats = await self.dispatch_batch()
+            if not stats.claimed:
+                break
+            total.add(stats)
+            batches += 1
+        return total
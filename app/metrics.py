@@ -0,0 +1,210 @@
+import logging
+import os
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Iterable, Optional
+
+# Per-request query budget; requests above it are counted and logged, which is how
+# per-row lookups (N+1 map building) show up.
+METRICS_QUERY_BUDGET = int(os.getenv("METRICS_QUERY_BUDGET", "20"))
+# 0 disables the slow-query log.
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "0"))
+SLOW_QUERY_PARAMS_MAX_CHARS = 1000
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100)
+
+logger = logging.getLogger("app.metrics")
+slow_query_logger = logging.getLogger("app.sql.slow")
+
+
+@dataclass
+class RequestStats:
+    queries: int = 0
+    query_seconds: float = 0.0
+
+
+current_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("current_request_stats", default=None)
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str, labels: tuple = ()):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self.values: dict[tuple, float] = {}
+        self.lock = threading.Lock()
+
+    def inc(self, label_values: tuple = (), amount: float = 1) -> None:
+        with self.lock:
+            self.values[label_values] = self.values.get(label_values, 0) + amount
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help_text}"
+        yield f"# TYPE {self.name} counter"
+        with self.lock:
+            items = sorted(self.values.items())
+        for label_values, value in items:
+            yield f"{self.name}{label_text(self.labels, label_values)} {format_value(value)}"
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, labels: tuple, buckets: tuple):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self.buckets = buckets
+        # label values -> [per-bucket counts..., +Inf count, sum]
+        self.values: dict[tuple, list] = {}
+        self.lock = threading.Lock()
+
+    def observe(self, label_values: tuple, value: float) -> None:
+        with self.lock:
+            series = self.values.get(label_values)
+            if series is None:
+                series = self.values[label_values] = [0] * (len(self.buckets) + 1) + [0.0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[index] += 1
+            series[-2] += 1
+            series[-1] += value
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help_text}"
+        yield f"# TYPE {self.name} histogram"
+        with self.lock:
+            items = sorted((key, list(series)) for key, series in self.values.items())
+        for label_values, series in items:
+            for bound, count in zip(self.buckets, series):
+                labels = label_text(self.labels + ("le",), label_values + (format_value(bound),))
+                yield f"{self.name}_bucket{labels} {count}"
+            labels = label_text(self.labels + ("le",), label_values + ("+Inf",))
+            yield f"{self.name}_bucket{labels} {series[-2]}"
+            yield f"{self.name}_sum{label_text(self.labels, label_values)} {format_value(series[-1])}"
+            yield f"{self.name}_count{label_text(self.labels, label_values)} {series[-2]}"
+
+
+def format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def escape_label(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def label_text(names: tuple, values: tuple) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{escape_label(value)}"' for name, value in zip(names, values)) + "}"
+
+
+http_requests = Counter("http_requests_total", "HTTP requests by route and status.", ("method", "route", "status"))
+http_latency = Histogram(
+    "http_request_duration_seconds", "HTTP request latency.", ("method", "route"), LATENCY_BUCKETS
+)
+http_queries = Histogram(
+    "http_request_db_queries", "SQL statements executed per request.", ("method", "route"), QUERY_COUNT_BUCKETS
+)
+http_query_time = Histogram(
+    "http_request_db_seconds", "Time spent in SQL per request.", ("method", "route"), LATENCY_BUCKETS
+)
+http_over_budget = Counter(
+    "http_requests_over_query_budget_total",
+    f"Requests that ran more than METRICS_QUERY_BUDGET ({METRICS_QUERY_BUDGET}) SQL statements.",
+    ("method", "route"),
+)
+db_queries = Counter("db_queries_total", "SQL statements executed, including those outside requests.")
+db_query_seconds = Counter("db_query_seconds_total", "Time spent executing SQL statements.")
+db_slow_queries = Counter("db_slow_queries_total", "SQL statements slower than SLOW_QUERY_MS.")
+
+REGISTRY = (
+    http_requests,
+    http_latency,
+    http_queries,
+    http_query_time,
+    http_over_budget,
+    db_queries,
+    db_query_seconds,
+    db_slow_queries,
+)
+
+
+def record_query(statement: str, parameters, seconds: float) -> None:
+    db_queries.inc()
+    db_query_seconds.inc(amount=seconds)
+    stats = current_request_stats.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.query_seconds += seconds
+    if SLOW_QUERY_MS and seconds * 1000 >= SLOW_QUERY_MS:
+        db_slow_queries.inc()
+        slow_query_logger.warning(
+            "slow query %.1f ms: %s params=%s",
+            seconds * 1000,
+            " ".join(statement.split()),
+            repr(parameters)[:SLOW_QUERY_PARAMS_MAX_CHARS],
+        )
+
+
+def record_request(method: str, route: str, status: int, seconds: float, stats: RequestStats) -> None:
+    labels = (method, route)
+    http_requests.inc((method, route, str(status)))
+    http_latency.observe(labels, seconds)
+    http_queries.observe(labels, stats.queries)
+    http_query_time.observe(labels, stats.query_seconds)
+    if stats.queries > METRICS_QUERY_BUDGET:
+        http_over_budget.inc(labels)
+        logger.warning(
+            "%s %s ran %d queries (budget %d) in %.1f ms",
+            method,
+            route,
+            stats.queries,
+            METRICS_QUERY_BUDGET,
+            stats.query_seconds * 1000,
+        )
+
+
+def render_gauges(prefix: str, values: dict) -> Iterable[str]:
+    for name, value in sorted(values.items()):
+        yield f"# TYPE {prefix}_{name} gauge"
+        yield f"{prefix}_{name} {format_value(value)}"
+
+
+def render_metrics(extra_gauges: Optional[dict[str, dict]] = None) -> str:
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    for prefix, values in (extra_gauges or {}).items():
+        lines.extend(render_gauges(prefix, values))
+    return "\n".join(lines) + "\n"
+
+
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        stats = RequestStats()
+        token = current_request_stats.set(stats)
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            current_request_stats.reset(token)
+            # The route template keeps label cardinality bounded (/pets/{pet_id}, not ids).
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            record_request(scope["method"], route, status, elapsed, stats)
@@ -6,7 +6,7 @@ from decimal import Decimal
 from enum import Enum
 from typing import Optional
 
-from sqlalchemy import Column, Date, DateTime, Enum as SAEnum, JSON, Numeric, String, Time
+from sqlalchemy import Column, Date, DateTime, Enum as SAEnum, Index, Integer, JSON, Numeric, String, Time, text
 from sqlmodel import Field, SQLModel
 
 
@@ -14,6 +14,16 @@ def uuid_str() -> str:
     return str(uuid.uuid4())
 
 
+def active_index(name: str, *columns, unique: bool = False) -> Index:
+    return Index(
+        name,
+        *columns,
+        unique=unique,
+        sqlite_where=text("deleted_at IS NULL"),
+        postgresql_where=text("deleted_at IS NULL"),
+    )
+
+
 class UserRole(str, Enum):
     admin = "admin"
     vet = "vet"
@@ -57,6 +67,7 @@ class ReminderEntityType(str, Enum):
     medication = "medication"
     vaccination = "vaccination"
     payment = "payment"
+    follow_up = "follow_up"
 
 
 class ReminderChannel(str, Enum):
@@ -107,6 +118,9 @@ class User(SQLModel, table=True):
 
 class PetParent(SQLModel, table=True):
     __tablename__ = "pet_parents"
+    __table_args__ = (
+        active_index("ix_pet_parents_clinic_active_name", "clinic_id", "name", "id"),
+    )
 
     id: str = Field(default_factory=uuid_str, primary_key=True)
     clinic_id: str = Field(index=True, foreign_key="clinics.id")
@@ -122,6 +136,11 @@ class PetParent(SQLModel, table=True):
 
 class Pet(SQLModel, table=True):
     __tablename__ = "pets"
+    __table_args__ = (
+        active_index("ix_pets_clinic_active_name", "clinic_id", "name", "id"),
+        active_index("ix_pets_clinic_active_lower_name", "clinic_id", text("lower(name)")),
+        active_index("ix_pets_clinic_active_created", "clinic_id", "created_at", "id"),
+    )
 
     id: str = Field(default_factory=uuid_str, primary_key=True)
     clinic_id: str = Field(index=True, foreign_key="clinics.id")
@@ -141,6 +160,12 @@ class Pet(SQLModel, table=True):
 
 class Appointment(SQLModel, table=True):
     __tablename__ = "appointments"
+    __table_args__ = (
+        active_index("ix_appointments_clinic_active_date", "clinic_id", "appointment_date", "start_time"),
+        active_index("ix_appointments_vet_active_slot", "clinic_id", "vet_id", "appointment_date", "start_time"),
+        active_index("ix_appointments_pet_active_date", "pet_id", "appointment_date", "start_time"),
+        active_index("ix_appointments_active_date", "appointment_date", "start_time"),
+    )
 
     id: str = Field(default_factory=uuid_str, primary_key=True)
     clinic_id: str = Field(index=True, foreign_key="clinics.id")
@@ -159,6 +184,11 @@ class Appointment(SQLModel, table=True):
 
 class MedicalRecord(SQLModel, table=True):
     __tablename__ = "medical_records"
+    __table_args__ = (
+        active_index("ix_medical_records_clinic_active_pet", "clinic_id", "pet_id", "visit_date"),
+        active_index("ix_medical_records_clinic_active_visit", "clinic_id", "visit_date", "id"),
+        active_index("ix_medical_records_active_follow_up", "follow_up_date"),
+    )
 
     id: str = Field(default_factory=uuid_str, primary_key=True)
     clinic_id: str = Field(index=True, foreign_key="clinics.id")
@@ -176,6 +206,14 @@ class MedicalRecord(SQLModel, table=True):
 
 class Invoice(SQLModel, table=True):
     __tablename__ = "invoices"
+    __table_args__ = (
+        active_index("ix_invoices_clinic_active_created", "clinic_id", "created_at", "id"),
+        active_index("ix_invoices_pet_active_created", "pet_id", "created_at"),
+        active_index(
+            "ix_invoices_clinic_active_receivables", "clinic_id", "status", "outstanding_amount", "created_at"
+        ),
+        active_index("ux_invoices_clinic_number", "clinic_id", "invoice_number", unique=True),
+    )
 
     id: str = Field(default_factory=uuid_str, primary_key=True)
     clinic_id: str = Field(index=True, foreign_key="clinics.id")
@@ -183,14 +221,30 @@ class Invoice(SQLModel, table=True):
     invoice_number: str
     total_amount: Decimal = Field(sa_column=Column(Numeric(10, 2)))
     gst_amount: Decimal = Field(sa_column=Column(Numeric(10, 2)))
+    paid_amount: Decimal = Field(default=Decimal("0"), sa_column=Column(Numeric(10, 2), nullable=False, server_default="0"))
+    outstanding_amount: Decimal = Field(default=Decimal("0"), sa_column=Column(Numeric(10, 2), nullable=False, server_default="0"))
     status: InvoiceStatus = Field(sa_column=Column(SAEnum(InvoiceStatus, name="invoice_status", native_enum=False)))
     created_at: dt.datetime = Field(default_factory=dt.datetime.utcnow, sa_column=Column(DateTime))
     updated_at: dt.datetime = Field(default_factory=dt.datetime.utcnow, sa_column=Column(DateTime))
     deleted_at: Optional[dt.datetime] = Field(default=None, sa_column=Column(DateTime))
 
 
+class InvoiceSequence(SQLModel, table=True):
+    __tablename__ = "invoice_sequences"
+
+    clinic_id: str = Field(primary_key=True, foreign_key="clinics.id")
+    # Financial year such as "2026-27", or "" when numbers run on without a yearly reset.
+    period: str = Field(primary_key=True)
+    last_number: int = Field(default=0, sa_column=Column(Integer, nullable=False, server_default="0"))
+    updated_at: dt.datetime = Field(default_factory=dt.datetime.utcnow, sa_column=Column(DateTime))
+
+
 class Payment(SQLModel, table=True):
     __tablename__ = "payments"
+    __table_args__ = (
+        active_index("ix_payments_clinic_active_created", "clinic_id", "created_at", "id"),
+        active_index("ix_payments_invoice_active_created", "invoice_id", "created_at"),
+    )
 
     id: str = Field(default_factory=uuid_str, primary_key=True)
     clinic_id: str = Field(index=True, foreign_key="clinics.id")
@@ -206,6 +260,10 @@ class Payment(SQLModel, table=True):
 
 class InventoryItem(SQLModel, table=True):
     __tablename__ = "inventory_items"
+    __table_args__ = (
+        active_index("ix_inventory_items_clinic_active_stock", "clinic_id", "quantity", "low_stock_threshold"),
+        active_index("ix_inventory_items_clinic_active_name", "clinic_id", "name", "id"),
+    )
 
     id: str = Field(default_factory=uuid_str, primary_key=True)
     clinic_id: str = Field(index=True, foreign_key="clinics.id")
@@ -220,6 +278,10 @@ class InventoryItem(SQLModel, table=True):
 
 class ReminderLog(SQLModel, table=True):
     __tablename__ = "reminder_logs"
+    __table_args__ = (
+        Index("ix_reminder_logs_clinic_created", "clinic_id", "created_at", "id"),
+        Index("ux_reminder_logs_dedupe_key", "dedupe_key", unique=True),
+    )
 
     id: str = Field(default_factory=uuid_str, primary_key=True)
     clinic_id: str = Field(index=True, foreign_key="clinics.id")
@@ -229,11 +291,17 @@ class ReminderLog(SQLModel, table=True):
     status: ReminderStatus = Field(sa_column=Column(SAEnum(ReminderStatus, name="reminder_status", native_enum=False)))
     failure_reason: Optional[str] = None
     sent_at: Optional[dt.datetime] = Field(default=None, sa_column=Column(DateTime))
+    dedupe_key: Optional[str] = None
     created_at: dt.datetime = Field(default_factory=dt.datetime.utcnow, sa_column=Column(DateTime))
 
 
 class MessageLog(SQLModel, table=True):
     __tablename__ = "message_logs"
+    __table_args__ = (
+        Index("ix_message_logs_clinic_created", "clinic_id", "created_at", "id"),
+        Index("ux_message_logs_dedupe_key", "dedupe_key", unique=True),
+        Index("ix_message_logs_status_next_attempt", "status", "next_attempt_at"),
+    )
 
     id: str = Field(default_factory=uuid_str, primary_key=True)
     clinic_id: str = Field(index=True, foreign_key="clinics.id")
@@ -242,4 +310,27 @@ class MessageLog(SQLModel, table=True):
     payload: dict = Field(sa_column=Column(JSON))
     status: MessageStatus = Field(sa_column=Column(SAEnum(MessageStatus, name="message_status", native_enum=False)))
     provider_message_id: Optional[str] = None
+    dedupe_key: Optional[str] = None
+    attempts: int = Field(default=0, sa_column=Column(Integer, nullable=False, server_default="0"))
+    next_attempt_at: Optional[dt.datetime] = Field(default=None, sa_column=Column(DateTime))
+    last_error: Optional[str] = None
     created_at: dt.datetime = Field(default_factory=dt.datetime.utcnow, sa_column=Column(DateTime))
+
+
+class DailyRollup(SQLModel, table=True):
+    __tablename__ = "daily_rollups"
+
+    clinic_id: str = Field(primary_key=True, foreign_key="clinics.id")
+    day: dt.date = Field(sa_column=Column(Date, primary_key=True))
+    visits_scheduled: int = Field(default=0, sa_column=Column(Integer, nullable=False, server_default="0"))
+    visits_completed: int = Field(default=0, sa_column=Column(Integer, nullable=False, server_default="0"))
+    visits_cancelled: int = Field(default=0, sa_column=Column(Integer, nullable=False, server_default="0"))
+    visits_no_show: int = Field(default=0, sa_column=Column(Integer, nullable=False, server_default="0"))
+    invoices_count: int = Field(default=0, sa_column=Column(Integer, nullable=False, server_default="0"))
+    invoiced_amount: Decimal = Field(default=Decimal("0"), sa_column=Column(Numeric(12, 2), nullable=False, server_default="0"))
+    gst_amount: Decimal = Field(default=Decimal("0"), sa_column=Column(Numeric(12, 2), nullable=False, server_default="0"))
+    collected_upi: Decimal = Field(default=Decimal("0"), sa_column=Column(Numeric(12, 2), nullable=False, server_default="0"))
+    collected_cash: Decimal = Field(default=Decimal("0"), sa_column=Column(Numeric(12, 2), nullable=False, server_default="0"))
+    collected_card: Decimal = Field(default=Decimal("0"), sa_column=Column(Numeric(12, 2), nullable=False, server_default="0"))
+    new_pets: int = Field(default=0, sa_column=Column(Integer, nullable=False, server_default="0"))
+    updated_at: dt.datetime = Field(default_factory=dt.datetime.utcnow, sa_column=Column(DateTime))
@@ -0,0 +1,94 @@
+import base64
+import binascii
+import datetime as dt
+import json
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+from urllib.parse import urlencode
+
+from fastapi import Request
+from sqlalchemy import Date, DateTime, Time, literal, tuple_
+
+PAGE_SIZE = 25
+
+
+@dataclass
+class Page:
+    items: list
+    next_cursor: Optional[str]
+
+
+def encode_cursor(values: list) -> str:
+    payload = json.dumps(
+        [value.isoformat() if isinstance(value, (dt.date, dt.time)) else value for value in values],
+        separators=(",", ":"),
+    )
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, sort_columns: list) -> Optional[list]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if not isinstance(values, list) or len(values) != len(sort_columns):
+            return None
+        return [coerce_value(column, value) for column, value in zip(sort_columns, values)]
+    except (ValueError, TypeError, binascii.Error):
+        return None
+
+
+def coerce_value(column, value: Any) -> Any:
+    if value is None:
+        return None
+    if isinstance(column.type, DateTime):
+        return dt.datetime.fromisoformat(value)
+    if isinstance(column.type, Date):
+        return dt.date.fromisoformat(value)
+    if isinstance(column.type, Time):
+        return dt.time.fromisoformat(value)
+    return value
+
+
+def keyset_paginate(
+    stmt,
+    sort_columns: list,
+    cursor: Optional[str] = None,
+    descending: bool = False,
+    limit: int = PAGE_SIZE,
+):
+    stmt = stmt.order_by(*[column.desc() if descending else column.asc() for column in sort_columns])
+    values = decode_cursor(cursor, sort_columns) if cursor else None
+    if values is not None:
+        key = tuple_(*sort_columns)
+        bound = tuple_(*[literal(value, column.type) for column, value in zip(sort_columns, values)])
+        stmt = stmt.where(key < bound if descending else key > bound)
+    return stmt.limit(limit + 1)
+
+
+def build_page(
+    rows: list,
+    sort_columns: list,
+    limit: int = PAGE_SIZE,
+    sort_key: Optional[Callable[[Any], list]] = None,
+) -> Page:
+    items = list(rows[:limit])
+    next_cursor = None
+    if len(rows) > limit and items:
+        if sort_key is None:
+            values = [getattr(items[-1], column.key) for column in sort_columns]
+        else:
+            values = sort_key(items[-1])
+        next_cursor = encode_cursor(values)
+    return Page(items=items, next_cursor=next_cursor)
+
+
+def page_links(request: Request, page: Page) -> dict:
+    params = {key: value for key, value in request.query_params.items() if key not in ("cursor", "page")}
+    first_url = request.url.path + (f"?{urlencode(params)}" if params else "")
+    next_url = None
+    if page.next_cursor:
+        next_url = f"{request.url.path}?{urlencode({**params, 'cursor': page.next_cursor})}"
+    return {
+        "next_url": next_url,
+        "first_url": first_url if request.query_params.get("cursor") else None,
+    }
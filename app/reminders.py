@@ -0,0 +1,236 @@
+import argparse
+import asyncio
+import datetime as dt
+import logging
+import os
+import uuid
+from typing import Optional
+
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm import aliased
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.contacts import parse_contact_blob
+from app.db import insert_ignoring_duplicates
+from app.messaging import Dispatcher, build_sender
+from app.models import (
+    Appointment,
+    AppointmentStatus,
+    MedicalRecord,
+    MessageLog,
+    MessageStatus,
+    Pet,
+    PetParent,
+    ReminderEntityType,
+    User,
+)
+
+REMINDER_APPOINTMENT_LEAD_HOURS = int(os.getenv("REMINDER_APPOINTMENT_LEAD_HOURS", "24"))
+REMINDER_FOLLOW_UP_LEAD_DAYS = int(os.getenv("REMINDER_FOLLOW_UP_LEAD_DAYS", "1"))
+REMINDER_SCAN_INTERVAL_SECONDS = float(os.getenv("REMINDER_SCAN_INTERVAL_SECONDS", "60"))
+REMINDER_ERROR_BACKOFF_SECONDS = float(os.getenv("REMINDER_ERROR_BACKOFF_SECONDS", "5"))
+REMINDER_ERROR_BACKOFF_MAX_SECONDS = float(os.getenv("REMINDER_ERROR_BACKOFF_MAX_SECONDS", "300"))
+
+logger = logging.getLogger("app.reminders")
+
+
+def recipient_phone(phone: str, contact_blob: Optional[str]) -> str:
+    return parse_contact_blob(contact_blob).get("whatsapp_number") or phone
+
+
+def due_appointments_statement(start_date: dt.date, end_date: dt.date):
+    vet = aliased(User)
+    return (
+        select(
+            Appointment.id,
+            Appointment.clinic_id,
+            Appointment.appointment_date,
+            Appointment.start_time,
+            Pet.name,
+            PetParent.name,
+            PetParent.phone,
+            PetParent.govt_id_reference,
+            vet.name,
+        )
+        .join(Pet, Pet.id == Appointment.pet_id)
+        .join(PetParent, PetParent.id == Pet.pet_parent_id)
+        .outerjoin(vet, vet.id == Appointment.vet_id)
+        .where(
+            Appointment.deleted_at.is_(None),
+            Appointment.appointment_date >= start_date,
+            Appointment.appointment_date <= end_date,
+            Appointment.status == AppointmentStatus.scheduled,
+            Pet.deleted_at.is_(None),
+            PetParent.deleted_at.is_(None),
+        )
+    )
+
+
+def due_follow_ups_statement(start_date: dt.date, end_date: dt.date):
+    return (
+        select(
+            MedicalRecord.id,
+            MedicalRecord.clinic_id,
+            MedicalRecord.follow_up_date,
+            Pet.name,
+            PetParent.name,
+            PetParent.phone,
+            PetParent.govt_id_reference,
+        )
+        .join(Pet, Pet.id == MedicalRecord.pet_id)
+        .join(PetParent, PetParent.id == Pet.pet_parent_id)
+        .where(
+            MedicalRecord.deleted_at.is_(None),
+            MedicalRecord.follow_up_date >= start_date,
+            MedicalRecord.follow_up_date <= end_date,
+            Pet.deleted_at.is_(None),
+            PetParent.deleted_at.is_(None),
+        )
+    )
+
+
+def message_row(
+    clinic_id: str,
+    phone: str,
+    template_name: str,
+    dedupe_key: str,
+    payload: dict,
+    now: dt.datetime,
+) -> dict:
+    return {
+        "id": str(uuid.uuid4()),
+        "clinic_id": clinic_id,
+        "recipient_phone": phone,
+        "template_name": template_name,
+        "payload": payload,
+        "status": MessageStatus.queued,
+        "dedupe_key": dedupe_key,
+        "attempts": 0,
+        "created_at": now,
+    }
+
+
+async def due_reminders(session: AsyncSession, local_now: dt.datetime) -> list[dict]:
+    now = dt.datetime.utcnow()
+    rows = []
+    # Appointment times are clinic-local wall-clock values, so the window is too.
+    horizon = local_now + dt.timedelta(hours=REMINDER_APPOINTMENT_LEAD_HOURS)
+    appointments = await session.exec(due_appointments_statement(local_now.date(), horizon.date()))
+    for appt_id, clinic_id, appt_date, start_time, pet_name, parent_name, phone, blob, vet_name in appointments:
+        starts_at = dt.datetime.combine(appt_date, start_time)
+        if not local_now <= starts_at <= horizon:
+            continue
+        rows.append(
+            message_row(
+                clinic_id,
+                recipient_phone(phone, blob),
+                "appointment_reminder",
+                # Keyed on the slot, so a rescheduled appointment is reminded again.
+                f"appointment:{appt_id}:{starts_at.isoformat()}",
+                {
+                    "entity_type": ReminderEntityType.appointment.value,
+                    "entity_id": appt_id,
+                    "pet_name": pet_name,
+                    "parent_name": parent_name,
+                    "vet_name": vet_name,
+                    "appointment_date": appt_date.isoformat(),
+                    "start_time": start_time.strftime("%H:%M"),
+                },
+                now,
+            )
+        )
+    today = local_now.date()
+    follow_ups = await session.exec(
+        due_follow_ups_statement(today, today + dt.timedelta(days=REMINDER_FOLLOW_UP_LEAD_DAYS))
+    )
+    for record_id, clinic_id, follow_up_date, pet_name, parent_name, phone, blob in follow_ups:
+        rows.append(
+            message_row(
+                clinic_id,
+                recipient_phone(phone, blob),
+                "follow_up_reminder",
+                f"follow_up:{record_id}:{follow_up_date.isoformat()}",
+                {
+                    "entity_type": ReminderEntityType.follow_up.value,
+                    "entity_id": record_id,
+                    "pet_name": pet_name,
+                    "parent_name": parent_name,
+                    "follow_up_date": follow_up_date.isoformat(),
+                },
+                now,
+            )
+        )
+    return rows
+
+
+async def enqueue_due_reminders(engine: AsyncEngine, local_now: Optional[dt.datetime] = None) -> int:
+    async with AsyncSession(engine) as session:
+        rows = await due_reminders(session, local_now or dt.datetime.now())
+        if not rows:
+            return 0
+        # Reminders already queued on an earlier scan collide on dedupe_key and are skipped.
+        connection = await session.connection()
+        result = await connection.execute(
+            insert_ignoring_duplicates(engine.dialect.name, MessageLog, ["dedupe_key"]), rows
+        )
+        await session.commit()
+    return max(result.rowcount, 0)
+
+
+async def run_once(dispatcher: Dispatcher, local_now: Optional[dt.datetime] = None) -> dict:
+    queued = await enqueue_due_reminders(dispatcher.engine, local_now)
+    stats = await dispatcher.drain()
+    return {"queued": queued, **stats.as_dict()}
+
+
+def error_backoff(failures: int) -> float:
+    return min(REMINDER_ERROR_BACKOFF_SECONDS * 2 ** max(failures - 1, 0), REMINDER_ERROR_BACKOFF_MAX_SECONDS)
+
+
+async def run_forever(dispatcher: Dispatcher, interval: float) -> None:
+    failures = 0
+    while True:
+        started = asyncio.get_running_loop().time()
+        try:
+            summary = await run_once(dispatcher)
+        except Exception:
+            # A database or sender outage must not kill the worker; back off and try again.
+            failures += 1
+            delay = error_backoff(failures)
+            logger.exception("Reminder pass failed (%d in a row); retrying in %.0fs", failures, delay)
+            await asyncio.sleep(delay)
+            continue
+        failures = 0
+        if any(summary.values()):
+            logger.info(" ".join(f"{key}={value}" for key, value in summary.items()))
+        elapsed = asyncio.get_running_loop().time() - started
+        await asyncio.sleep(max(interval - elapsed, 0))
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m app.reminders",
+        description="Queue due appointment and follow-up reminders and dispatch queued messages.",
+    )
+    parser.add_argument("--once", action="store_true", help="run a single scan and dispatch, then exit")
+    parser.add_argument("--interval", type=float, default=REMINDER_SCAN_INTERVAL_SECONDS)
+    parser.add_argument("--sender", help="defaults to MESSAGE_SENDER")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    from app.db import async_engine
+
+    dispatcher = Dispatcher(async_engine, build_sender(args.sender))
+    try:
+        if args.once:
+            summary = asyncio.run(run_once(dispatcher))
+            print(" ".join(f"{key}={value}" for key, value in summary.items()))
+        else:
+            asyncio.run(run_forever(dispatcher, args.interval))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+from sqlalchemy import and_, case, column, func, literal_column, or_, select, table
+
+from app.models import Pet, PetParent
+
+MIN_TRIGRAM_LENGTH = 3
+
+pet_search = table("pet_search", column("pet_id"), column("clinic_id"), column("name"), column("rank"))
+
+
+def search_terms(q: str) -> list[str]:
+    return [term for term in q.split() if term]
+
+
+def trigram_terms(terms: list[str]) -> list[str]:
+    return [term for term in terms if len(term) >= MIN_TRIGRAM_LENGTH]
+
+
+def short_terms(terms: list[str]) -> list[str]:
+    return [term for term in terms if len(term) < MIN_TRIGRAM_LENGTH]
+
+
+def fts_match_expression(terms: list[str]) -> str:
+    return " ".join('"{}"'.format(term.replace('"', '""')) for term in terms)
+
+
+def name_prefix_condition(q: str, name=Pet.name):
+    prefix = q.strip().lower()
+    return and_(func.lower(name) >= prefix, func.lower(name) < prefix + "\uffff")
+
+
+def prefix_first(q: str, name=Pet.name):
+    return case((func.lower(name).startswith(q.strip().lower()), 0), else_=1)
+
+
+def sqlite_matches(clinic_id: str, terms: list[str]):
+    # Terms too short for a trigram still narrow the match, as a prefix of the pet's name.
+    return select(pet_search.c.pet_id, pet_search.c.rank).where(
+        literal_column("pet_search").op("MATCH")(fts_match_expression(trigram_terms(terms))),
+        pet_search.c.clinic_id == clinic_id,
+        *[name_prefix_condition(term, pet_search.c.name) for term in short_terms(terms)],
+    )
+
+
+def postgres_term_conditions(terms: list[str]):
+    return and_(
+        *[name_prefix_condition(term) for term in short_terms(terms)],
+        *[
+            or_(
+                Pet.name.ilike(f"%{term}%"),
+                Pet.breed.ilike(f"%{term}%"),
+                Pet.registration_number.ilike(f"%{term}%"),
+                PetParent.name.ilike(f"%{term}%"),
+            )
+            for term in trigram_terms(terms)
+        ],
+    )
+
+
+def pet_search_condition(dialect_name: str, clinic_id: str, q: str):
+    terms = search_terms(q)
+    if not trigram_terms(terms):
+        return name_prefix_condition(q)
+    if dialect_name == "sqlite":
+        return Pet.id.in_(sqlite_matches(clinic_id, terms).with_only_columns(pet_search.c.pet_id))
+    return postgres_term_conditions(terms)
+
+
+def pet_search_statement(dialect_name: str, clinic_id: str, q: str, limit: int = 10):
+    terms = search_terms(q)
+    stmt = (
+        select(Pet, PetParent)
+        .join(PetParent, Pet.pet_parent_id == PetParent.id)
+        .where(Pet.clinic_id == clinic_id, Pet.deleted_at.is_(None))
+    )
+    if not trigram_terms(terms):
+        return stmt.where(name_prefix_condition(q)).order_by(func.lower(Pet.name)).limit(limit)
+    if dialect_name == "sqlite":
+        # Name-prefix hits are ranked ahead inside the limit, so bm25 cannot push them out of it.
+        first = prefix_first(q, pet_search.c.name)
+        matches = (
+            sqlite_matches(clinic_id, terms)
+            .add_columns(first.label("prefix_first"))
+            .order_by(first, pet_search.c.rank)
+            .limit(limit)
+            .subquery()
+        )
+        return (
+            stmt.join(matches, matches.c.pet_id == Pet.id)
+            .order_by(matches.c.prefix_first, matches.c.rank)
+        )
+    q_text = q.strip()
+    similarity = func.greatest(
+        func.similarity(Pet.name, q_text),
+        func.similarity(func.coalesce(Pet.registration_number, ""), q_text),
+        func.similarity(PetParent.name, q_text),
+    )
+    return (
+        stmt.where(postgres_term_conditions(terms))
+        .order_by(prefix_first(q), similarity.desc(), Pet.name)
+        .limit(limit)
+    )
@@ -0,0 +1,152 @@
+from decimal import Decimal
+from typing import Optional
+
+from sqlalchemy import DateTime, Numeric, String, cast, func, literal, null, union_all
+from sqlmodel import select
+
+from app.models import Appointment, Invoice, MedicalRecord, Payment, User
+from app.pagination import PAGE_SIZE, Page, build_page, keyset_paginate
+
+MAX_TIMELINE_PAGE_SIZE = 100
+# Sort keys are ISO-8601 strings so dates, date + time pairs and timestamps compare
+# the same way on every backend, and round-trip through the keyset cursor unchanged.
+SORT_KEY_FORMATS = {"sqlite": "%Y-%m-%dT%H:%M:%S", "postgresql": 'YYYY-MM-DD"T"HH24:MI:SS'}
+
+
+def sort_key(dialect_name: str, value, time=None):
+    if dialect_name == "postgresql":
+        timestamp = value + time if time is not None else cast(value, DateTime)
+        return func.to_char(timestamp, SORT_KEY_FORMATS["postgresql"])
+    if time is not None:
+        value = value.op("||")(" ").op("||")(time)
+    return func.strftime(SORT_KEY_FORMATS["sqlite"], value)
+
+
+def timeline_columns(kind: str, entry_id, occurred_at, status, summary, detail, amount, vet_name):
+    return (
+        literal(kind, String).label("kind"),
+        entry_id.label("id"),
+        occurred_at.label("occurred_at"),
+        cast(status, String).label("status"),
+        cast(summary, String).label("summary"),
+        cast(detail, String).label("detail"),
+        cast(amount, Numeric(10, 2)).label("amount"),
+        cast(vet_name, String).label("vet_name"),
+    )
+
+
+def pet_timeline_statement(dialect_name: str, clinic_id: str, pet_id: str):
+    # Every branch starts from a pet-scoped index, so a chart costs the same at any clinic size.
+    appointments = (
+        select(
+            *timeline_columns(
+                "appointment",
+                Appointment.id,
+                sort_key(dialect_name, Appointment.appointment_date, Appointment.start_time),
+                Appointment.status,
+                Appointment.procedure_type,
+                Appointment.notes,
+                null(),
+                User.name,
+            )
+        )
+        .outerjoin(User, User.id == Appointment.vet_id)
+        .where(
+            Appointment.pet_id == pet_id,
+            Appointment.clinic_id == clinic_id,
+            Appointment.deleted_at.is_(None),
+        )
+    )
+    records = (
+        select(
+            *timeline_columns(
+                "medical_record",
+                MedicalRecord.id,
+                sort_key(dialect_name, MedicalRecord.visit_date),
+                null(),
+                MedicalRecord.diagnosis,
+                MedicalRecord.prescription,
+                null(),
+                User.name,
+            )
+        )
+        .outerjoin(User, User.id == MedicalRecord.vet_id)
+        .where(
+            MedicalRecord.clinic_id == clinic_id,
+            MedicalRecord.pet_id == pet_id,
+            MedicalRecord.deleted_at.is_(None),
+        )
+    )
+    invoices = select(
+        *timeline_columns(
+            "invoice",
+            Invoice.id,
+            sort_key(dialect_name, Invoice.created_at),
+            Invoice.status,
+            Invoice.invoice_number,
+            null(),
+            Invoice.total_amount,
+            null(),
+        )
+    ).where(
+        Invoice.pet_id == pet_id,
+        Invoice.clinic_id == clinic_id,
+        Invoice.deleted_at.is_(None),
+    )
+    payments = (
+        select(
+            *timeline_columns(
+                "payment",
+                Payment.id,
+                sort_key(dialect_name, Payment.created_at),
+                Payment.status,
+                Invoice.invoice_number,
+                Payment.payment_method,
+                Payment.amount,
+                null(),
+            )
+        )
+        .join(Invoice, Invoice.id == Payment.invoice_id)
+        .where(
+            # Drive the lookup from this pet's invoices rather than scanning the clinic's payments.
+            Payment.invoice_id.in_(
+                select(Invoice.id).where(Invoice.pet_id == pet_id, Invoice.deleted_at.is_(None))
+            ),
+            Invoice.clinic_id == clinic_id,
+            Payment.deleted_at.is_(None),
+        )
+    )
+    return union_all(appointments, records, invoices, payments).subquery("timeline")
+
+
+def timeline_entry(row) -> dict:
+    return {
+        "kind": row.kind,
+        "id": row.id,
+        "occurred_at": row.occurred_at,
+        "status": row.status,
+        "summary": row.summary,
+        "detail": row.detail,
+        "amount": str(row.amount) if isinstance(row.amount, Decimal) else row.amount,
+        "vet_name": row.vet_name,
+    }
+
+
+def timeline_page_size(limit: Optional[int]) -> int:
+    return max(1, min(limit or PAGE_SIZE, MAX_TIMELINE_PAGE_SIZE))
+
+
+async def load_pet_timeline(
+    session,
+    clinic_id: str,
+    pet_id: str,
+    cursor: Optional[str] = None,
+    limit: int = PAGE_SIZE,
+) -> Page:
+    timeline = pet_timeline_statement(session.get_bind().dialect.name, clinic_id, pet_id)
+    sort_columns = [timeline.c.occurred_at, timeline.c.id]
+    stmt = keyset_paginate(select(*timeline.c), sort_columns, cursor, descending=True, limit=limit)
+    rows = (await session.exec(stmt)).all()
+    page = build_page(rows, sort_columns, limit=limit)
+    page.items = [timeline_entry(row) for row in page.items]
+    return page
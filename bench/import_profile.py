@@ -0,0 +1,46 @@
+"""Import-time profile of a module, e.g. how long a fresh worker takes to load the app.
+
+    python -m bench.import_profile --module app.main --top 25
+
+Runs ``python -X importtime`` in a clean subprocess and lists the slowest
+imports by cumulative (default) or self time.
+"""
+
+import argparse
+import subprocess
+import sys
+
+
+def profile(module: str) -> list[tuple[int, int, str]]:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        rows.append((int(self_us), int(cumulative_us), name.rstrip()))
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--top", type=int, default=25)
+    parser.add_argument("--sort", choices=["cumulative", "self"], default="cumulative")
+    args = parser.parse_args()
+    rows = profile(args.module)
+    total = next((cumulative for _, cumulative, name in rows if name.strip() == args.module), 0)
+    print(f"import {args.module}: {total / 1000:.1f} ms across {len(rows)} modules")
+    key = 1 if args.sort == "cumulative" else 0
+    print(f"{'self ms':>9}{'cumul ms':>10}  module")
+    for self_us, cumulative_us, name in sorted(rows, key=lambda row: row[key], reverse=True)[: args.top]:
+        print(f"{self_us / 1000:>9.1f}{cumulative_us / 1000:>10.1f}  {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+"""Create invoices from many threads at once and check the numbers they are given.
+
+    python -m bench.invoice_numbers --threads 8 --invoices 2000 --clinics 2
+
+Migrates a fresh database (a temporary SQLite file, or --database-url for a
+throwaway Postgres database), seeds --clinics clinics with an admin and a pet
+each, then posts --invoices blank-numbered invoices to POST /invoices/new from
+--threads threads. Exits non-zero unless every clinic's numbers are unique and
+run from 1 without gaps. Also prints the allocation statement's plan, which
+should be a primary-key lookup on invoice_sequences rather than a scan of
+invoices. SQLite still admits one writer at a time, so many more threads than
+this mostly measure its busy-wait; use Postgres to see per-clinic row locks.
+"""
+
+import argparse
+import datetime as dt
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+ADMIN_PASSWORD = "bench-password"
+
+
+def seed(database_url: str, clinics: int) -> list[dict]:
+    from sqlmodel import create_engine
+
+    from app.auth import hash_password
+    from app.models import Clinic, Pet, PetGender, PetParent, User, UserRole
+
+    now = dt.datetime.utcnow()
+    stamp = {"created_at": now, "updated_at": now}
+    password_hash = hash_password(ADMIN_PASSWORD)
+    seeded = []
+    engine = create_engine(database_url)
+    with engine.begin() as connection:
+        for index in range(clinics):
+            clinic_id, parent_id, pet_id = (str(uuid.uuid4()) for _ in range(3))
+            phone = f"70{index:08d}"
+            connection.execute(
+                Clinic.__table__.insert(),
+                [{"id": clinic_id, "name": f"Clinic {index}", "phone": phone, "address": "", "city": "", "state": "", "pincode": "", **stamp}],
+            )
+            connection.execute(
+                User.__table__.insert(),
+                [{"id": str(uuid.uuid4()), "clinic_id": clinic_id, "name": "Admin", "phone": phone, "role": UserRole.admin, "is_active": True, "password_hash": password_hash, **stamp}],
+            )
+            connection.execute(
+                PetParent.__table__.insert(),
+                [{"id": parent_id, "clinic_id": clinic_id, "name": "Owner", "phone": phone, **stamp}],
+            )
+            connection.execute(
+                Pet.__table__.insert(),
+                [{"id": pet_id, "clinic_id": clinic_id, "pet_parent_id": parent_id, "name": "Bench", "species": "Dog", "gender": PetGender.male, **stamp}],
+            )
+            seeded.append({"clinic_id": clinic_id, "phone": phone, "pet_id": pet_id})
+    engine.dispose()
+    return seeded
+
+
+def create_invoices(clinics: list[dict], invoices: int, threads: int) -> tuple[list[float], Counter]:
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+
+    for clinic in clinics:
+        response = TestClient(app).post(
+            "/login", data={"phone": clinic["phone"], "password": ADMIN_PASSWORD}, follow_redirects=False
+        )
+        assert response.status_code == 303, response.text
+        clinic["session"] = response.cookies["session"]
+
+    local = threading.local()
+    latencies: list[float] = []
+    statuses: Counter = Counter()
+    lock = threading.Lock()
+
+    def create(index: int) -> None:
+        if not hasattr(local, "client"):
+            local.client = TestClient(app, raise_server_exceptions=False)
+        clinic = clinics[index % len(clinics)]
+        local.client.cookies.set("session", clinic["session"])
+        started = time.perf_counter()
+        response = local.client.post(
+            "/invoices/new",
+            data={
+                "pet_id": clinic["pet_id"],
+                "invoice_number": "",
+                "total_amount": "1180.00",
+                "gst_amount": "180.00",
+                "status": "issued",
+            },
+            follow_redirects=False,
+        )
+        elapsed = time.perf_counter() - started
+        with lock:
+            latencies.append(elapsed)
+            statuses[response.status_code] += 1
+
+    with ThreadPoolExecutor(threads) as pool:
+        list(pool.map(create, range(invoices)))
+    return latencies, statuses
+
+
+def check_numbers(database_url: str, clinics: list[dict]) -> list[str]:
+    from sqlmodel import Session, create_engine, select
+
+    from app.invoice_numbers import format_invoice_number, sequence_period
+    from app.models import Invoice
+
+    problems = []
+    period = sequence_period(dt.date.today())
+    engine = create_engine(database_url)
+    with Session(engine) as session:
+        for clinic in clinics:
+            numbers = session.exec(
+                select(Invoice.invoice_number).where(Invoice.clinic_id == clinic["clinic_id"])
+            ).all()
+            expected = {format_invoice_number(period, number) for number in range(1, len(numbers) + 1)}
+            duplicates = len(numbers) - len(set(numbers))
+            if duplicates or set(numbers) != expected:
+                problems.append(
+                    f"clinic {clinic['clinic_id']}: {len(numbers)} invoices, {duplicates} duplicate numbers, "
+                    f"{len(expected - set(numbers))} gaps"
+                )
+            print(f"clinic {clinic['phone']}: {len(numbers)} invoices numbered {min(numbers)} .. {max(numbers)}")
+    engine.dispose()
+    return problems
+
+
+def allocation_plan(database_url: str) -> str:
+    from sqlmodel import create_engine
+
+    from app.explain_check import explain
+    from app.invoice_numbers import next_number_statement, sequence_period
+
+    engine = create_engine(database_url)
+    with engine.connect() as connection:
+        plan = explain(connection, next_number_statement("bench", sequence_period(dt.date.today())))
+    engine.dispose()
+    return plan
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--invoices", type=int, default=2000)
+    parser.add_argument("--clinics", type=int, default=2)
+    parser.add_argument("--database-url", help="defaults to a temporary SQLite file; must be an empty database")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = args.database_url or f"sqlite:///{Path(tmp) / 'invoice-numbers.db'}"
+        # app.db binds its engines at import time, so point it at the bench database first.
+        os.environ["DATABASE_URL"] = database_url
+        os.environ.pop("ASYNC_DATABASE_URL", None)
+
+        from alembic import command
+        from alembic.config import Config
+
+        cfg = Config("alembic.ini")
+        cfg.set_main_option("sqlalchemy.url", database_url)
+        command.upgrade(cfg, "head")
+
+        clinics = seed(database_url, args.clinics)
+        started = time.perf_counter()
+        latencies, statuses = create_invoices(clinics, args.invoices, args.threads)
+        elapsed = time.perf_counter() - started
+        problems = check_numbers(database_url, clinics)
+        plan = allocation_plan(database_url)
+
+    ordered = sorted(latencies)
+    print(
+        f"{args.invoices} invoices from {args.threads} threads in {elapsed:.2f}s "
+        f"({args.invoices / elapsed:,.0f}/s); status codes {dict(statuses)}"
+    )
+    print(
+        f"latency p50 {statistics.median(ordered) * 1000:.1f} ms, "
+        f"p95 {ordered[int(0.95 * (len(ordered) - 1))] * 1000:.1f} ms, max {ordered[-1] * 1000:.1f} ms"
+    )
+    print(f"allocation plan: {plan}")
+    if set(statuses) != {303}:
+        problems.append(f"unexpected status codes {dict(statuses)}")
+    for problem in problems:
+        print(f"FAIL {problem}")
+    if problems:
+        sys.exit(1)
+    print("OK: numbers are unique and gap-free per clinic")
+
+
+if __name__ == "__main__":
+    main()
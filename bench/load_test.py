@@ -0,0 +1,150 @@
+"""Concurrent read latency while a writer commits, rollback journal vs WAL.
+
+    python -m bench.load_test --seconds 5 --readers 8
+
+Each mode gets a fresh SQLite file seeded with --rows pets. One thread keeps
+committing batches of inserts while the reader threads run the dashboard pet
+count and the first pets page; the report compares reader latency per mode.
+"""
+
+import argparse
+import datetime as dt
+import statistics
+import tempfile
+import threading
+import time
+import uuid
+from pathlib import Path
+
+from sqlalchemy import func, insert
+from sqlalchemy.exc import OperationalError
+from sqlmodel import Session, SQLModel, select
+
+from app.db import SQLITE_PRAGMAS, make_engine
+from app.models import Clinic, Pet, PetGender, PetParent
+
+MODES = {
+    "rollback-journal": {"journal_mode": "DELETE", "synchronous": "FULL", "busy_timeout": 5000},
+    "wal": SQLITE_PRAGMAS,
+}
+
+
+def pet_rows(clinic_id: str, parent_id: str, count: int) -> list[dict]:
+    now = dt.datetime.utcnow()
+    return [
+        {
+            "id": str(uuid.uuid4()),
+            "clinic_id": clinic_id,
+            "pet_parent_id": parent_id,
+            "name": f"Pet {uuid.uuid4().hex[:8]}",
+            "species": "Dog",
+            "gender": PetGender.male,
+            "created_at": now,
+            "updated_at": now,
+        }
+        for _ in range(count)
+    ]
+
+
+def seed(engine, rows: int) -> tuple[str, str]:
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        clinic = Clinic(name="Load", phone="1", address="", city="", state="", pincode="")
+        session.add(clinic)
+        session.flush()
+        parent = PetParent(clinic_id=clinic.id, name="Owner", phone="2")
+        session.add(parent)
+        session.flush()
+        session.execute(insert(Pet), pet_rows(clinic.id, parent.id, rows))
+        session.commit()
+        return clinic.id, parent.id
+
+
+def percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+def run_mode(name: str, pragmas: dict, args) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = make_engine(f"sqlite:///{Path(tmp) / 'load.db'}", sqlite_pragmas=pragmas)
+        clinic_id, parent_id = seed(engine, args.rows)
+        stop = threading.Event()
+        latencies: list[float] = []
+        errors = 0
+        commits = 0
+        lock = threading.Lock()
+
+        def writer():
+            nonlocal commits
+            while not stop.is_set():
+                with Session(engine) as session:
+                    session.execute(insert(Pet), pet_rows(clinic_id, parent_id, args.write_batch))
+                    session.commit()
+                commits += 1
+
+        def reader():
+            nonlocal errors
+            while not stop.is_set():
+                started = time.perf_counter()
+                try:
+                    with Session(engine) as session:
+                        session.exec(
+                            select(func.count()).select_from(Pet).where(
+                                Pet.clinic_id == clinic_id, Pet.deleted_at.is_(None)
+                            )
+                        ).one()
+                        session.exec(
+                            select(Pet)
+                            .where(Pet.clinic_id == clinic_id, Pet.deleted_at.is_(None))
+                            .order_by(Pet.created_at, Pet.id)
+                            .limit(26)
+                        ).all()
+                except OperationalError:
+                    with lock:
+                        errors += 1
+                    continue
+                with lock:
+                    latencies.append((time.perf_counter() - started) * 1000)
+
+        threads = [threading.Thread(target=writer)]
+        threads += [threading.Thread(target=reader) for _ in range(args.readers)]
+        for thread in threads:
+            thread.start()
+        time.sleep(args.seconds)
+        stop.set()
+        for thread in threads:
+            thread.join()
+        engine.dispose()
+    return {
+        "mode": name,
+        "reads_per_second": len(latencies) / args.seconds,
+        "write_commits_per_second": commits / args.seconds,
+        "p50_ms": statistics.median(latencies) if latencies else 0.0,
+        "p99_ms": percentile(latencies, 0.99),
+        "max_ms": max(latencies, default=0.0),
+        "read_errors": errors,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--write-batch", type=int, default=200)
+    args = parser.parse_args()
+    print(f"{'mode':<18}{'reads/s':>10}{'commits/s':>11}{'p50 ms':>9}{'p99 ms':>9}{'max ms':>9}{'errors':>8}")
+    for name, pragmas in MODES.items():
+        result = run_mode(name, pragmas, args)
+        print(
+            f"{result['mode']:<18}{result['reads_per_second']:>10.0f}"
+            f"{result['write_commits_per_second']:>11.1f}{result['p50_ms']:>9.2f}"
+            f"{result['p99_ms']:>9.2f}{result['max_ms']:>9.2f}{result['read_errors']:>8}"
+        )
+
+
+if __name__ == "__main__":
+    main()
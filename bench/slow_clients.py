@@ -0,0 +1,75 @@
+"""Hold many concurrent requests open against one running server.
+
+    uvicorn app.main:app --workers 1 &
+    python -m bench.slow_clients --url http://127.0.0.1:8000 --phone 999 --password pw
+
+Logs in once, then keeps --clients connections busy on the async read
+endpoints and reports latency percentiles and failures.
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+PATHS = ["/dashboard", "/pets", "/api/pets/search?q=bel", "/api/appointments/feed?start=2026-01-01&end=2026-02-01"]
+
+
+async def client_loop(client: httpx.AsyncClient, deadline: float, latencies: list, failures: list) -> None:
+    index = 0
+    while time.perf_counter() < deadline:
+        path = PATHS[index % len(PATHS)]
+        index += 1
+        started = time.perf_counter()
+        try:
+            response = await client.get(path)
+            if response.status_code != 200:
+                failures.append(f"{path}: {response.status_code}")
+                continue
+        except httpx.HTTPError as exc:
+            failures.append(f"{path}: {exc!r}")
+            continue
+        latencies.append((time.perf_counter() - started) * 1000)
+
+
+async def run(args) -> None:
+    limits = httpx.Limits(max_connections=args.clients, max_keepalive_connections=args.clients)
+    async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=30) as client:
+        response = await client.post(
+            "/login", data={"phone": args.phone, "password": args.password}, follow_redirects=False
+        )
+        if "session" not in response.cookies:
+            raise SystemExit(f"login failed: {response.status_code}")
+        client.cookies.set("session", response.cookies["session"])
+        latencies: list[float] = []
+        failures: list[str] = []
+        deadline = time.perf_counter() + args.seconds
+        await asyncio.gather(
+            *[client_loop(client, deadline, latencies, failures) for _ in range(args.clients)]
+        )
+    ordered = sorted(latencies)
+    print(f"clients={args.clients} requests={len(latencies)} failures={len(failures)}")
+    if ordered:
+        print(
+            f"p50={statistics.median(ordered):.1f}ms "
+            f"p99={ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]:.1f}ms "
+            f"max={ordered[-1]:.1f}ms rps={len(ordered) / args.seconds:.0f}"
+        )
+    for failure in failures[:5]:
+        print(f"FAIL {failure}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--phone", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--clients", type=int, default=300)
+    parser.add_argument("--seconds", type=float, default=10)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
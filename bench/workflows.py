@@ -0,0 +1,463 @@
+"""Seed a synthetic clinic at several sizes and time the main workflows in-process.
+
+    python -m bench.workflows --sizes 1000,10000 --output before.json
+    python -m bench.workflows --sizes 1000,10000 --compare before.json
+
+Each size runs in its own subprocess against a fresh database built by the
+Alembic migrations. That is a temporary SQLite file by default, or
+--database-url (e.g. a throwaway Postgres database; pass --wipe to let the
+harness downgrade it to base first). Each size is a pet count, seeded with
+proportional parents, vets, appointments, medical records, invoices and
+payments. Every workflow is first timed sequentially for latency, then run
+with --concurrency requests in flight for throughput. Each result also records
+the SQL statements per request from app.metrics. --compare prints the p50/p95
+change against an earlier report and exits 1 when a workflow slowed down by
+more than --threshold.
+"""
+
+import argparse
+import asyncio
+import datetime as dt
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from decimal import Decimal
+from pathlib import Path
+
+ADMIN_PHONE = "9000000000"
+ADMIN_PASSWORD = "bench-password"
+PET_NAMES = ["Bella", "Bruno", "Max", "Tiger", "Coco", "Simba", "Luna", "Rocky", "Milo", "Sheru"]
+BREEDS = ["Labrador", "Beagle", "Indie", "Persian", "Pug", "German Shepherd"]
+SEARCH_TERMS = ["bel", "max", "tig", "labr", "sim", "pug", "roc", "indie"]
+SLOTS_PER_DAY = 16
+INSERT_BATCH = 5000
+
+
+def seed_counts(pets: int) -> dict:
+    return {
+        "vets": max(3, pets // 2000),
+        "pet_parents": max(1, pets // 2),
+        "pets": pets,
+        "appointments": pets * 2,
+        "medical_records": pets,
+        "invoices": pets,
+        "payments": pets // 2,
+    }
+
+
+def slot_bounds(slot: int) -> tuple[dt.time, dt.time]:
+    start = dt.datetime.combine(dt.date.min, dt.time(9)) + dt.timedelta(minutes=30 * (slot % SLOTS_PER_DAY))
+    return start.time(), (start + dt.timedelta(minutes=30)).time()
+
+
+def insert_batches(connection, table, rows) -> None:
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= INSERT_BATCH:
+            connection.execute(table.insert(), batch)
+            batch = []
+    if batch:
+        connection.execute(table.insert(), batch)
+
+
+def seed(database_url: str, pets: int) -> dict:
+    from sqlmodel import create_engine
+
+    from app.analytics import rebuild_daily_rollups
+    from app.auth import hash_password
+    from app.models import (
+        Appointment,
+        AppointmentStatus,
+        Clinic,
+        Invoice,
+        InvoiceStatus,
+        MedicalRecord,
+        Payment,
+        PaymentMethod,
+        PaymentStatus,
+        Pet,
+        PetGender,
+        PetParent,
+        User,
+        UserRole,
+    )
+
+    counts = seed_counts(pets)
+    rng = random.Random(pets)
+    now = dt.datetime.utcnow()
+    today = dt.date.today()
+    stamp = {"created_at": now, "updated_at": now}
+    clinic_id = str(uuid.uuid4())
+    vet_ids = [str(uuid.uuid4()) for _ in range(counts["vets"])]
+    parent_ids = [str(uuid.uuid4()) for _ in range(counts["pet_parents"])]
+    pet_ids = [str(uuid.uuid4()) for _ in range(pets)]
+    invoice_ids = [str(uuid.uuid4()) for _ in range(counts["invoices"])]
+    password_hash = hash_password(ADMIN_PASSWORD)
+
+    engine = create_engine(database_url)
+    with engine.begin() as connection:
+        connection.execute(
+            Clinic.__table__.insert(),
+            [{"id": clinic_id, "name": "Bench Clinic", "phone": "1", "address": "", "city": "", "state": "", "pincode": "", **stamp}],
+        )
+        users = [
+            {"id": str(uuid.uuid4()), "name": "Admin", "phone": ADMIN_PHONE, "role": UserRole.admin}
+        ] + [
+            {"id": vet_id, "name": f"Dr Vet {index}", "phone": f"91{index:08d}", "role": UserRole.vet}
+            for index, vet_id in enumerate(vet_ids)
+        ]
+        connection.execute(
+            User.__table__.insert(),
+            [{"clinic_id": clinic_id, "is_active": True, "password_hash": password_hash, **stamp, **user} for user in users],
+        )
+        insert_batches(
+            connection,
+            PetParent.__table__,
+            (
+                {"id": parent_id, "clinic_id": clinic_id, "name": f"Parent {index}", "phone": f"8{index:09d}", **stamp}
+                for index, parent_id in enumerate(parent_ids)
+            ),
+        )
+        insert_batches(
+            connection,
+            Pet.__table__,
+            (
+                {
+                    "id": pet_id,
+                    "clinic_id": clinic_id,
+                    "pet_parent_id": parent_ids[index % len(parent_ids)],
+                    "name": f"{PET_NAMES[index % len(PET_NAMES)]} {index}",
+                    "species": "Dog" if index % 3 else "Cat",
+                    "breed": BREEDS[index % len(BREEDS)],
+                    "gender": PetGender.male if index % 2 else PetGender.female,
+                    "registration_number": f"REG{index}",
+                    "created_at": now - dt.timedelta(minutes=pets - index),
+                    "updated_at": now,
+                }
+                for index, pet_id in enumerate(pet_ids)
+            ),
+        )
+        # One appointment per vet per half-hour slot, ending around today, so none overlap.
+        per_day = len(vet_ids) * SLOTS_PER_DAY
+        first_day = today - dt.timedelta(days=counts["appointments"] // per_day)
+        statuses = list(AppointmentStatus)
+        insert_batches(
+            connection,
+            Appointment.__table__,
+            (
+                {
+                    "id": str(uuid.uuid4()),
+                    "clinic_id": clinic_id,
+                    "pet_id": pet_ids[rng.randrange(pets)],
+                    "vet_id": vet_ids[index % len(vet_ids)],
+                    "appointment_date": first_day + dt.timedelta(days=index // per_day),
+                    "start_time": slot_bounds(index // len(vet_ids))[0],
+                    "end_time": slot_bounds(index // len(vet_ids))[1],
+                    "status": statuses[index % len(statuses)],
+                    **stamp,
+                }
+                for index in range(counts["appointments"])
+            ),
+        )
+        insert_batches(
+            connection,
+            MedicalRecord.__table__,
+            (
+                {
+                    "id": str(uuid.uuid4()),
+                    "clinic_id": clinic_id,
+                    "pet_id": pet_ids[index % pets],
+                    "vet_id": vet_ids[index % len(vet_ids)],
+                    "visit_date": today - dt.timedelta(days=rng.randrange(730)),
+                    "diagnosis": "Routine check",
+                    **stamp,
+                }
+                for index in range(counts["medical_records"])
+            ),
+        )
+        invoice_statuses = list(InvoiceStatus)
+        insert_batches(
+            connection,
+            Invoice.__table__,
+            (
+                {
+                    "id": invoice_id,
+                    "clinic_id": clinic_id,
+                    "pet_id": pet_ids[index % pets],
+                    "invoice_number": f"INV-{index:07d}",
+                    "total_amount": Decimal("1180.00"),
+                    "gst_amount": Decimal("180.00"),
+                    # Every even-numbered invoice is settled by one of the payments below.
+                    "paid_amount": Decimal("0.00") if index % 2 else Decimal("1180.00"),
+                    "outstanding_amount": (
+                        Decimal("1180.00")
+                        if index % 2 and invoice_statuses[index % len(invoice_statuses)] != InvoiceStatus.paid
+                        else Decimal("0.00")
+                    ),
+                    "status": invoice_statuses[index % len(invoice_statuses)],
+                    "created_at": now - dt.timedelta(minutes=index),
+                    "updated_at": now,
+                }
+                for index, invoice_id in enumerate(invoice_ids)
+            ),
+        )
+        methods = list(PaymentMethod)
+        insert_batches(
+            connection,
+            Payment.__table__,
+            (
+                {
+                    "id": str(uuid.uuid4()),
+                    "clinic_id": clinic_id,
+                    "invoice_id": invoice_ids[index * 2 % len(invoice_ids)],
+                    "payment_method": methods[index % len(methods)],
+                    "amount": Decimal("1180.00"),
+                    "status": PaymentStatus.paid,
+                    **stamp,
+                }
+                for index in range(counts["payments"])
+            ),
+        )
+        # Seeding skips the ORM, so build the analytics rollups the way the nightly job would.
+        oldest_created = (now - dt.timedelta(minutes=max(pets, counts["invoices"]))).date()
+        rebuild_daily_rollups(connection, min(first_day, oldest_created), today)
+    engine.dispose()
+    return {"counts": counts, "pet_ids": pet_ids, "vet_ids": vet_ids}
+
+
+def summarize(latencies: list[float], statuses: dict, queries: tuple[float, int]) -> dict:
+    ordered = sorted(latencies)
+
+    def pct(fraction: float) -> float:
+        return round(ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] * 1000, 3)
+
+    query_sum, request_count = queries
+    return {
+        "requests": len(latencies),
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 3),
+        "p50_ms": pct(0.5),
+        "p95_ms": pct(0.95),
+        "p99_ms": pct(0.99),
+        "max_ms": round(ordered[-1] * 1000, 3),
+        "queries_per_request": round(query_sum / request_count, 2) if request_count else None,
+        "status_codes": statuses,
+    }
+
+
+def query_totals() -> tuple[float, int]:
+    from app.metrics import http_queries
+
+    with http_queries.lock:
+        series = list(http_queries.values.values())
+    return sum(values[-1] for values in series), sum(values[-2] for values in series)
+
+
+async def measure(size: int, database_url: str, args) -> dict:
+    import httpx
+
+    from app.main import app
+
+    started = time.perf_counter()
+    seeded = seed(database_url, size)
+    seed_seconds = time.perf_counter() - started
+    rng = random.Random(size)
+    pet_ids, vet_ids = seeded["pet_ids"], seeded["vet_ids"]
+    slot_counter = iter(range(10**9))
+    future = dt.date.today() + dt.timedelta(days=400)
+
+    def free_slot() -> dict:
+        index = next(slot_counter)
+        day = future + dt.timedelta(days=index // (len(vet_ids) * SLOTS_PER_DAY))
+        start, end = slot_bounds(index // len(vet_ids))
+        return {
+            "pet_id": rng.choice(pet_ids),
+            "vet_id": vet_ids[index % len(vet_ids)],
+            "appointment_date": day.isoformat(),
+            "start_time": start.strftime("%H:%M"),
+            "end_time": end.strftime("%H:%M"),
+            "status": "scheduled",
+        }
+
+    def clashing_slot() -> dict:
+        data = free_slot()
+        data["start_time"], data["end_time"] = "10:10", "10:40"
+        data["appointment_date"] = (dt.date.today() - dt.timedelta(days=1)).isoformat()
+        return data
+
+    workflows = {
+        "dashboard": lambda client: client.get("/dashboard"),
+        "pets_list": lambda client: client.get("/pets"),
+        "pets_search": lambda client: client.get(f"/api/pets/search?q={rng.choice(SEARCH_TERMS)}"),
+        "appointments_list": lambda client: client.get("/appointments"),
+        "pets_view": lambda client: client.get(f"/pets/{rng.choice(pet_ids)}"),
+        "analytics_year": lambda client: client.get("/analytics"),
+        "receivables": lambda client: client.get("/receivables"),
+        "login_submit": lambda client: client.post(
+            "/login", data={"phone": ADMIN_PHONE, "password": ADMIN_PASSWORD}
+        ),
+        "appointment_create": lambda client: client.post("/appointments/new", data=free_slot()),
+        "appointment_create_overlap": lambda client: client.post("/appointments/new", data=clashing_slot()),
+    }
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", follow_redirects=False) as client:
+        login = await client.post("/login", data={"phone": ADMIN_PHONE, "password": ADMIN_PASSWORD})
+        assert login.status_code == 303, login.text
+        client.cookies.set("session", login.cookies["session"])
+        results = {}
+        for name, call in workflows.items():
+            iterations = args.login_iterations if name == "login_submit" else args.iterations
+            for _ in range(args.warmup):
+                await call(client)
+            before = query_totals()
+            latencies, statuses = [], {}
+            for _ in range(iterations):
+                request_started = time.perf_counter()
+                response = await call(client)
+                latencies.append(time.perf_counter() - request_started)
+                statuses[str(response.status_code)] = statuses.get(str(response.status_code), 0) + 1
+            after = query_totals()
+            result = summarize(latencies, statuses, (after[0] - before[0], after[1] - before[1]))
+
+            pending = iter(range(iterations))
+
+            async def worker():
+                for _ in pending:
+                    await call(client)
+
+            burst_started = time.perf_counter()
+            await asyncio.gather(*[worker() for _ in range(args.concurrency)])
+            result["throughput_rps"] = round(iterations / (time.perf_counter() - burst_started), 1)
+            results[name] = result
+            print(
+                f"  {size:>7} {name:<28}{result['p50_ms']:>9.2f}{result['p95_ms']:>9.2f}"
+                f"{result['throughput_rps']:>10.1f}{result['queries_per_request'] or 0:>8.1f}",
+                file=sys.stderr,
+            )
+    return {"seed_seconds": round(seed_seconds, 2), "rows": seeded["counts"], "workflows": results}
+
+
+def run_worker(args) -> None:
+    from alembic import command
+    from alembic.config import Config
+
+    cfg = Config("alembic.ini")
+    cfg.set_main_option("sqlalchemy.url", args.database_url)
+    if args.wipe:
+        command.downgrade(cfg, "base")
+    command.upgrade(cfg, "head")
+    result = asyncio.run(measure(args.worker_size, args.database_url, args))
+    Path(args.worker_output).write_text(json.dumps(result))
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(report: dict, baseline: dict, threshold: float) -> list[str]:
+    regressions = []
+    print(f"{'size':>8} {'workflow':<28}{'p50 old':>9}{'p50 new':>9}{'p95 old':>9}{'p95 new':>9}")
+    for size, current in report["sizes"].items():
+        previous = baseline.get("sizes", {}).get(size)
+        if not previous:
+            continue
+        for name, result in current["workflows"].items():
+            old = previous["workflows"].get(name)
+            if not old:
+                continue
+            flag = ""
+            for key in ("p50_ms", "p95_ms"):
+                if old[key] and result[key] > old[key] * (1 + threshold):
+                    flag = "  REGRESSION"
+            if flag:
+                regressions.append(f"{size}/{name}")
+            print(
+                f"{size:>8} {name:<28}{old['p50_ms']:>9.2f}{result['p50_ms']:>9.2f}"
+                f"{old['p95_ms']:>9.2f}{result['p95_ms']:>9.2f}{flag}"
+            )
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="1000,10000", help="comma-separated pet counts, e.g. 1000,10000,100000")
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--login-iterations", type=int, default=10)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--database-url", help="defaults to a temporary SQLite file per size")
+    parser.add_argument("--wipe", action="store_true", help="downgrade --database-url to base before seeding")
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    parser.add_argument("--compare", help="earlier JSON report to diff against")
+    parser.add_argument("--threshold", type=float, default=0.2)
+    parser.add_argument("--worker-size", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--worker-output", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker_size:
+        run_worker(args)
+        return
+
+    report = {
+        "generated_at": dt.datetime.utcnow().isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "settings": {
+            "iterations": args.iterations,
+            "login_iterations": args.login_iterations,
+            "concurrency": args.concurrency,
+            "dashboard_cache_ttl_seconds": os.getenv("DASHBOARD_CACHE_TTL_SECONDS", "15"),
+            "auth_cache_ttl_seconds": os.getenv("AUTH_CACHE_TTL_SECONDS", "60"),
+        },
+        "sizes": {},
+    }
+    print(f"  {'size':>7} {'workflow':<28}{'p50 ms':>9}{'p95 ms':>9}{'req/s':>10}{'sql/req':>8}", file=sys.stderr)
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in [int(value) for value in args.sizes.split(",") if value.strip()]:
+            database_url = args.database_url or f"sqlite:///{Path(tmp) / f'bench-{size}.db'}"
+            worker_output = Path(tmp) / f"result-{size}.json"
+            report["database"] = database_url.split(":", 1)[0]
+            command = [
+                sys.executable, "-m", "bench.workflows",
+                "--worker-size", str(size),
+                "--database-url", database_url,
+                "--iterations", str(args.iterations),
+                "--login-iterations", str(args.login_iterations),
+                "--warmup", str(args.warmup),
+                "--concurrency", str(args.concurrency),
+                "--worker-output", str(worker_output),
+            ]
+            if args.wipe or not args.database_url:
+                command.append("--wipe")
+            environment = {**os.environ, "DATABASE_URL": database_url}
+            environment.pop("ASYNC_DATABASE_URL", None)
+            subprocess.run(command, env=environment, check=True)
+            report["sizes"][str(size)] = json.loads(worker_output.read_text())
+
+    text = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        Path(args.output).write_text(text + "\n")
+    elif not args.compare:
+        print(text)
+    if args.compare:
+        regressions = compare(report, json.loads(Path(args.compare).read_text()), args.threshold)
+        if regressions:
+            print(f"{len(regressions)} regression(s): {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
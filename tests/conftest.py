@@ -0,0 +1,154 @@
+import os
+import shutil
+import tempfile
+import uuid
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+TEST_DB_DIR = tempfile.mkdtemp(prefix="mia-tests-")
+ADMIN_PHONE = "9000000000"
+ADMIN_PASSWORD = "test-password"
+
+# app.db binds its engines at import time, so point it at a throwaway database before
+# any app module is imported. TEST_DATABASE_URL runs the suite against an empty Postgres.
+os.environ["DATABASE_URL"] = os.getenv("TEST_DATABASE_URL", f"sqlite:///{Path(TEST_DB_DIR) / 'test.db'}")
+os.environ.pop("ASYNC_DATABASE_URL", None)
+
+
+def alembic_config(url: str):
+    from alembic.config import Config
+
+    cfg = Config(str(ROOT / "alembic.ini"))
+    cfg.set_main_option("script_location", str(ROOT / "alembic"))
+    cfg.set_main_option("sqlalchemy.url", url)
+    return cfg
+
+
+@pytest.fixture(scope="session", autouse=True)
+def database():
+    from alembic import command
+
+    command.upgrade(alembic_config(os.environ["DATABASE_URL"]), "head")
+    yield os.environ["DATABASE_URL"]
+    from app.db import async_engine, engine
+
+    engine.dispose()
+    async_engine.sync_engine.dispose()
+    shutil.rmtree(TEST_DB_DIR, ignore_errors=True)
+
+
+@pytest.fixture
+def migrate(tmp_path):
+    from alembic import command
+    from sqlalchemy import create_engine
+
+    # A separate SQLite file per test, for checking what a migration does to existing rows.
+    url = f"sqlite:///{tmp_path / 'migrate.db'}"
+    engine = create_engine(url)
+
+    def migrate(revision: str):
+        command.upgrade(alembic_config(url), revision)
+        return engine
+
+    yield migrate
+    engine.dispose()
+
+
+@pytest.fixture(scope="session")
+def client(database):
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+
+    client = TestClient(app)
+    response = client.post(
+        "/setup",
+        data={
+            "clinic_name": "Test Clinic",
+            "clinic_phone": "8000000000",
+            "admin_name": "Admin",
+            "admin_phone": ADMIN_PHONE,
+            "admin_password": ADMIN_PASSWORD,
+        },
+        follow_redirects=False,
+    )
+    assert response.status_code == 303, response.text
+    response = client.post(
+        "/login", data={"phone": ADMIN_PHONE, "password": ADMIN_PASSWORD}, follow_redirects=False
+    )
+    assert response.status_code == 303, response.text
+    client.cookies.set("session", response.cookies["session"])
+    return client
+
+
+@pytest.fixture(scope="session")
+def clinic_id(client):
+    from sqlmodel import Session, select
+
+    from app.db import engine
+    from app.models import User
+
+    with Session(engine) as session:
+        return session.exec(select(User.clinic_id).where(User.phone == ADMIN_PHONE)).one()
+
+
+def unique_phone() -> str:
+    return str(uuid.uuid4().int)[:10]
+
+
+@pytest.fixture
+def vet_id(client):
+    from sqlmodel import Session, select
+
+    from app.db import engine
+    from app.models import User
+
+    phone = unique_phone()
+    response = client.post(
+        "/users/new",
+        data={"name": "Dr Vet", "phone": phone, "role": "vet", "is_active": "true", "password": "vet-password"},
+        follow_redirects=False,
+    )
+    assert response.status_code == 303, response.text
+    with Session(engine) as session:
+        return session.exec(select(User.id).where(User.phone == phone)).one()
+
+
+@pytest.fixture(scope="session")
+def make_pet(client):
+    from sqlmodel import Session, select
+
+    from app.db import engine
+    from app.models import Pet, PetParent
+
+    def make_pet(name=None, breed="", parent_name="Owner"):
+        phone = unique_phone()
+        response = client.post(
+            "/pet-parents/new", data={"name": parent_name, "phone": phone}, follow_redirects=False
+        )
+        assert response.status_code == 303, response.text
+        with Session(engine) as session:
+            parent_id = session.exec(select(PetParent.id).where(PetParent.phone == phone)).one()
+        response = client.post(
+            "/pets/new",
+            data={
+                "pet_parent_id": parent_id,
+                "name": name or f"Pet {phone}",
+                "species": "Dog",
+                "breed": breed,
+                "gender": "male",
+            },
+            follow_redirects=False,
+        )
+        assert response.status_code == 303, response.text
+        with Session(engine) as session:
+            return session.exec(select(Pet.id).where(Pet.pet_parent_id == parent_id)).one()
+
+    return make_pet
+
+
+@pytest.fixture
+def pet_id(make_pet):
+    return make_pet()
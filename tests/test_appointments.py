@@ -0,0 +1,65 @@
+import pytest
+
+SLOT = {"appointment_date": "2026-10-19", "start_time": "10:00", "end_time": "10:30", "status": "scheduled"}
+
+
+def book(client, pet_id, vet_id, **fields):
+    return client.post(
+        "/appointments/new",
+        data={"pet_id": pet_id, "vet_id": vet_id, **SLOT, **fields},
+        follow_redirects=False,
+    )
+
+
+def test_free_slot_is_booked(client, pet_id, vet_id):
+    assert book(client, pet_id, vet_id).status_code == 303
+
+
+def test_overlapping_slot_is_rejected_with_conflicts(client, pet_id, vet_id):
+    assert book(client, pet_id, vet_id).status_code == 303
+    response = book(client, pet_id, vet_id, start_time="10:15", end_time="10:45")
+    assert response.status_code == 409
+    body = response.json()
+    assert body["error_code"] == "OVERLAP_DETECTED"
+    assert [(c["start_time"], c["end_time"], c["vet_name"]) for c in body["conflicts"]] == [
+        ("10:00", "10:30", "Dr Vet")
+    ]
+
+
+@pytest.mark.parametrize("start_time, end_time", [("09:30", "10:00"), ("10:30", "11:00")])
+def test_touching_slots_do_not_overlap(client, pet_id, vet_id, start_time, end_time):
+    assert book(client, pet_id, vet_id).status_code == 303
+    assert book(client, pet_id, vet_id, start_time=start_time, end_time=end_time).status_code == 303
+
+
+def test_cancelled_appointment_frees_the_slot(client, pet_id, vet_id):
+    assert book(client, pet_id, vet_id, status="cancelled").status_code == 303
+    assert book(client, pet_id, vet_id).status_code == 303
+
+
+def test_override_needs_confirmation(client, pet_id, vet_id):
+    assert book(client, pet_id, vet_id).status_code == 303
+    response = book(client, pet_id, vet_id, allow_overlap="1")
+    assert response.status_code == 409
+    assert response.json() == {"error_code": "OVERRIDE_CONFIRMATION_REQUIRED"}
+    assert book(client, pet_id, vet_id, allow_overlap="1", confirm_override="yes").status_code == 303
+
+
+def test_check_slots_reports_conflicts(client, pet_id, vet_id):
+    assert book(client, pet_id, vet_id).status_code == 303
+    slot = {"vet_id": vet_id, "appointment_date": SLOT["appointment_date"]}
+    response = client.post(
+        "/api/appointments/check-slots",
+        json={
+            "slots": [
+                {**slot, "start_time": "10:15", "end_time": "10:45"},
+                {**slot, "start_time": "11:00", "end_time": "11:30"},
+                {**slot, "start_time": "11:15", "end_time": "11:45"},
+            ]
+        },
+    )
+    assert response.status_code == 200, response.text
+    results = response.json()["results"]
+    assert [result["available"] for result in results] == [False, False, False]
+    assert [len(result["conflicts"]) for result in results] == [1, 0, 0]
+    assert [result["clashes_with"] for result in results] == [[], [2], [1]]
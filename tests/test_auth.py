@@ -0,0 +1,107 @@
+import os
+import subprocess
+import sys
+import uuid
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+
+def unique_phone() -> str:
+    return str(uuid.uuid4().int)[:10]
+
+
+def login(client, phone, password):
+    return TestClient(client.app).post(
+        "/login", data={"phone": phone, "password": password}, follow_redirects=False
+    )
+
+
+def create_user(client, phone, password="first-password"):
+    return client.post(
+        "/users/new",
+        data={"name": "Staff", "phone": phone, "role": "staff", "is_active": "true", "password": password},
+        follow_redirects=False,
+    )
+
+
+def test_created_user_can_sign_in(client):
+    phone = unique_phone()
+    assert create_user(client, phone).status_code == 303
+    assert login(client, phone, "first-password").status_code == 303
+    assert login(client, phone, "wrong-password").status_code == 400
+
+
+def test_duplicate_phone_is_rejected(client):
+    phone = unique_phone()
+    assert create_user(client, phone).status_code == 303
+    response = create_user(client, phone)
+    assert response.status_code == 400
+    assert "already exists" in response.text
+
+
+def test_reset_changes_the_password(client):
+    phone = unique_phone()
+    assert create_user(client, phone).status_code == 303
+    response = client.post("/reset", data={"phone": phone, "new_password": "second-password"}, follow_redirects=False)
+    assert response.status_code == 303
+    assert login(client, phone, "second-password").status_code == 303
+    assert login(client, phone, "first-password").status_code == 400
+
+
+def test_edit_changes_the_password(client):
+    from sqlmodel import Session, select
+
+    from app.db import engine
+    from app.models import User
+
+    phone = unique_phone()
+    assert create_user(client, phone).status_code == 303
+    with Session(engine) as session:
+        user_id = session.exec(select(User.id).where(User.phone == phone)).one()
+    response = client.post(
+        f"/users/{user_id}/edit",
+        data={"name": "Staff", "phone": phone, "role": "staff", "is_active": "true", "password": "third-password"},
+        follow_redirects=False,
+    )
+    assert response.status_code == 303
+    assert login(client, phone, "third-password").status_code == 303
+
+
+def test_busy_hash_pool_returns_503_without_writing(client, monkeypatch):
+    from sqlmodel import Session, select
+
+    import app.main
+    from app.auth import PasswordHashBusy
+    from app.db import engine
+    from app.models import User
+
+    async def busy(password):
+        raise PasswordHashBusy()
+
+    monkeypatch.setattr(app.main, "hash_password_async", busy)
+    phone = unique_phone()
+    response = create_user(client, phone)
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+    with Session(engine) as session:
+        assert session.exec(select(User).where(User.phone == phone)).first() is None
+
+
+def auth_cache_ttl(**env) -> float:
+    output = subprocess.run(
+        [sys.executable, "-c", "from app.main import AUTH_CACHE_TTL_SECONDS; print(AUTH_CACHE_TTL_SECONDS)"],
+        env={key: value for key, value in os.environ.items() if key not in ("WEB_CONCURRENCY", "AUTH_CACHE_TTL_SECONDS")}
+        | env,
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=Path(__file__).resolve().parents[1],
+    ).stdout
+    return float(output)
+
+
+def test_auth_cache_ttl_is_short_with_several_workers():
+    assert auth_cache_ttl() == 60
+    assert auth_cache_ttl(WEB_CONCURRENCY="4") == 5
+    assert auth_cache_ttl(WEB_CONCURRENCY="4", AUTH_CACHE_TTL_SECONDS="30") == 30
@@ -0,0 +1,22 @@
+import pytest
+
+from app.explain_check import explain, planned_queries, run_checks
+
+
+@pytest.mark.parametrize(
+    "name, stmt, index_names",
+    planned_queries(),
+    ids=[name for name, _stmt, _index_names in planned_queries()],
+)
+def test_query_uses_index(database, name, stmt, index_names):
+    from app.db import engine
+
+    with engine.connect() as connection:
+        if connection.dialect.name == "postgresql":
+            connection.exec_driver_sql("SET enable_seqscan = off")
+        plan = explain(connection, stmt)
+    assert any(index_name in plan for index_name in index_names), plan
+
+
+def test_run_checks_passes(database):
+    assert run_checks() == []
@@ -0,0 +1,66 @@
+import io
+import json
+
+from sqlalchemy.exc import OperationalError
+
+from app.importer import detect_format, import_stream
+
+
+def upload(client, filename, content):
+    return client.post("/api/import/pets", files={"file": (filename, content.encode("utf-8"))})
+
+
+def test_detect_format():
+    assert detect_format("pets.csv") == "csv"
+    assert detect_format("pets.jsonl") == "jsonl"
+    assert detect_format("pets.ndjson") == "jsonl"
+    assert detect_format("PETS.JSON") == "json"
+
+
+def test_json_array_import(client):
+    rows = [
+        {"parent_name": "Array Owner", "parent_phone": "7100000001", "pet_name": "Arrayo", "species": "Cat"},
+        {"parent_phone": "7100000001", "pet_name": "Arraya", "species": "Dog", "gender": "female"},
+        {"parent_phone": "7100000002", "pet_name": "Orphan", "species": "Dog"},
+        "not an object",
+    ]
+    response = upload(client, "export.json", json.dumps(rows, indent=2))
+    assert response.status_code == 200, response.text
+    report = response.json()
+    assert (report["rows"], report["parents_created"], report["pets_created"], report["failed_rows"]) == (4, 1, 2, 2)
+    assert [error["line"] for error in report["errors"]] == [4, 3]
+
+
+def test_json_lines_import(client):
+    lines = [
+        json.dumps({"parent_name": "Lines Owner", "parent_phone": "7100000003", "pet_name": "Liney", "species": "Dog"}),
+        "{not json",
+    ]
+    report = upload(client, "export.jsonl", "\n".join(lines)).json()
+    assert (report["pets_created"], report["failed_rows"]) == (1, 1)
+    assert report["errors"][0]["message"].startswith("invalid JSON")
+
+
+def test_rejected_batch_fails_only_rows_it_sent(client, clinic_id, monkeypatch):
+    from sqlmodel import Session
+
+    import app.importer
+    from app.db import engine
+
+    def reject(connection, keys):
+        raise OperationalError("INSERT", {}, Exception("rejected"))
+
+    monkeypatch.setattr(app.importer, "refresh_daily_rollups", reject)
+    stream = io.StringIO(
+        "parent_name,parent_phone,pet_parent_id,pet_name,species\n"
+        "Batch Owner,7100000004,,Batchy,Dog\n"
+        ",,missing-parent,Ghost,Dog\n"
+        ",7100000005,,Nameless,Dog\n"
+    )
+    with Session(engine) as session:
+        report = import_stream(session, clinic_id, stream, "csv")
+    assert (report.rows, report.pets_created, report.failed_rows) == (3, 0, 3)
+    assert sorted(error.line for error in report.errors) == [2, 3, 4]
+    assert [error.message for error in report.errors if error.line == 2] == [
+        "batch rejected by the database: OperationalError"
+    ]
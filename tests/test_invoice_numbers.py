@@ -0,0 +1,84 @@
+import datetime as dt
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.invoice_numbers import allocate_invoice_number, financial_year, format_invoice_number, sequence_period
+
+THREADS = 4
+PER_THREAD = 15
+
+
+def sequence_number(invoice_number: str) -> int:
+    return int(invoice_number.rsplit("/", 1)[1])
+
+
+@pytest.mark.parametrize(
+    "day, expected",
+    [(dt.date(2026, 3, 31), "2025-26"), (dt.date(2026, 4, 1), "2026-27"), (dt.date(2099, 12, 1), "2099-00")],
+)
+def test_financial_year(day, expected):
+    assert financial_year(day) == expected
+
+
+def test_parallel_invoice_creation_never_collides(client, pet_id):
+    from sqlmodel import Session, select
+
+    from app.db import engine
+    from app.models import Invoice
+
+    session_cookie = next(cookie.value for cookie in client.cookies.jar if cookie.name == "session")
+    local = threading.local()
+
+    def create(_index):
+        if not hasattr(local, "client"):
+            local.client = TestClient(client.app)
+            local.client.cookies.set("session", session_cookie)
+        return local.client.post(
+            "/invoices/new",
+            data={"pet_id": pet_id, "invoice_number": "", "total_amount": "10", "gst_amount": "0", "status": "draft"},
+            follow_redirects=False,
+        ).status_code
+
+    with ThreadPoolExecutor(THREADS) as pool:
+        statuses = list(pool.map(create, range(THREADS * PER_THREAD)))
+    assert set(statuses) == {303}
+
+    with Session(engine) as session:
+        numbers = session.exec(select(Invoice.invoice_number).where(Invoice.pet_id == pet_id)).all()
+    assert len(numbers) == len(set(numbers)) == THREADS * PER_THREAD
+    sequence = sorted(sequence_number(number) for number in numbers)
+    assert sequence == list(range(sequence[0], sequence[0] + len(sequence)))
+
+
+def test_rolled_back_allocations_leave_no_gaps(client, clinic_id):
+    from app.db import engine
+
+    committed = []
+    lock = threading.Lock()
+
+    def allocate(index):
+        connection = engine.connect()
+        transaction = connection.begin()
+        try:
+            number = allocate_invoice_number(connection, clinic_id)
+            # Every third checkout fails after taking a number, which must go to the next one.
+            if index % 3 == 0:
+                transaction.rollback()
+                return
+            transaction.commit()
+            with lock:
+                committed.append(number)
+        finally:
+            connection.close()
+
+    with ThreadPoolExecutor(THREADS) as pool:
+        list(pool.map(allocate, range(THREADS * PER_THREAD)))
+
+    period = sequence_period(dt.date.today())
+    assert len(committed) == len(set(committed))
+    sequence = sorted(sequence_number(number) for number in committed)
+    assert sequence == list(range(sequence[0], sequence[0] + len(sequence)))
+    assert format_invoice_number(period, sequence[-1]) == max(committed)
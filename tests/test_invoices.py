@@ -0,0 +1,204 @@
+from decimal import Decimal
+
+import pytest
+
+
+def load_invoice(invoice_number):
+    from sqlmodel import Session, select
+
+    from app.db import engine
+    from app.models import Invoice
+
+    with Session(engine) as session:
+        return session.exec(select(Invoice).where(Invoice.invoice_number == invoice_number)).one()
+
+
+def create_invoice(client, pet_id, invoice_number, total="100.00", status="issued"):
+    response = client.post(
+        "/invoices/new",
+        data={"pet_id": pet_id, "invoice_number": invoice_number, "total_amount": total, "gst_amount": "0", "status": status},
+        follow_redirects=False,
+    )
+    assert response.status_code == 303, response.text
+    return load_invoice(invoice_number)
+
+
+def edit_invoice(client, invoice, **fields):
+    data = {
+        "pet_id": invoice.pet_id,
+        "invoice_number": invoice.invoice_number,
+        "total_amount": str(invoice.total_amount),
+        "gst_amount": str(invoice.gst_amount),
+        "status": invoice.status.value,
+        **fields,
+    }
+    return client.post(f"/invoices/{invoice.id}/edit", data=data, follow_redirects=False)
+
+
+def pay(client, invoice, amount):
+    response = client.post(
+        "/payments/new",
+        data={"invoice_id": invoice.id, "payment_method": "cash", "amount": amount, "status": "paid"},
+        follow_redirects=False,
+    )
+    assert response.status_code == 303, response.text
+
+
+def aging_total(client):
+    response = client.get("/api/receivables/aging")
+    assert response.status_code == 200, response.text
+    return sum(Decimal(bucket["outstanding"]) for bucket in response.json()["buckets"])
+
+
+@pytest.fixture
+def invoice_number(request):
+    return f"T-{request.node.name}"
+
+
+def test_payments_settle_the_invoice(client, pet_id, invoice_number):
+    invoice = create_invoice(client, pet_id, invoice_number)
+    pay(client, invoice, "40")
+    invoice = load_invoice(invoice_number)
+    assert (invoice.paid_amount, invoice.outstanding_amount, invoice.status.value) == (40, 60, "issued")
+    pay(client, invoice, "60")
+    invoice = load_invoice(invoice_number)
+    assert (invoice.paid_amount, invoice.outstanding_amount, invoice.status.value) == (100, 0, "paid")
+
+
+def test_invoice_created_paid_is_not_receivable(client, pet_id, invoice_number):
+    before = aging_total(client)
+    invoice = create_invoice(client, pet_id, invoice_number, total="50.00", status="paid")
+    assert invoice.outstanding_amount == 0
+    assert aging_total(client) == before
+
+
+def test_marking_paid_by_hand_clears_the_balance(client, pet_id, invoice_number):
+    invoice = create_invoice(client, pet_id, invoice_number)
+    assert edit_invoice(client, invoice, status="paid").status_code == 303
+    invoice = load_invoice(invoice_number)
+    assert (invoice.paid_amount, invoice.outstanding_amount) == (0, 0)
+
+
+def test_lowering_the_total_to_the_paid_amount_settles_it(client, pet_id, invoice_number):
+    invoice = create_invoice(client, pet_id, invoice_number)
+    pay(client, invoice, "80")
+    assert edit_invoice(client, load_invoice(invoice_number), total_amount="80.00").status_code == 303
+    invoice = load_invoice(invoice_number)
+    assert (invoice.outstanding_amount, invoice.status.value) == (0, "paid")
+
+
+def test_total_below_paid_amount_is_rejected(client, pet_id, invoice_number):
+    invoice = create_invoice(client, pet_id, invoice_number)
+    pay(client, invoice, "80")
+    response = edit_invoice(client, load_invoice(invoice_number), total_amount="70.00")
+    assert response.status_code == 400
+    assert "already paid" in response.text
+    invoice = load_invoice(invoice_number)
+    assert (invoice.total_amount, invoice.outstanding_amount) == (100, 20)
+
+
+def test_open_balance_shows_in_aging(client, pet_id, invoice_number):
+    before = aging_total(client)
+    create_invoice(client, pet_id, invoice_number, total="30.00")
+    assert aging_total(client) == before + 30
+
+
+def payment_ids(invoice):
+    from sqlmodel import Session, select
+
+    from app.db import engine
+    from app.models import Payment
+
+    with Session(engine) as session:
+        return session.exec(
+            select(Payment.id).where(Payment.invoice_id == invoice.id, Payment.deleted_at.is_(None))
+        ).all()
+
+
+@pytest.fixture
+def foreign_invoice():
+    import datetime as dt
+
+    from sqlmodel import Session
+
+    from app.db import engine
+    from app.models import Clinic, Invoice, InvoiceStatus, Pet, PetGender, PetParent
+
+    now = dt.datetime.utcnow()
+    stamp = {"created_at": now, "updated_at": now}
+    with Session(engine) as session:
+        clinic = Clinic(name="Other", phone="1", address="", city="", state="", pincode="", **stamp)
+        parent = PetParent(clinic_id=clinic.id, name="Other Owner", phone="2", **stamp)
+        pet = Pet(clinic_id=clinic.id, pet_parent_id=parent.id, name="Other Pet", species="Dog", gender=PetGender.male, **stamp)
+        invoice = Invoice(
+            clinic_id=clinic.id,
+            pet_id=pet.id,
+            invoice_number="FOREIGN-1",
+            total_amount=Decimal("100"),
+            gst_amount=Decimal("0"),
+            outstanding_amount=Decimal("100"),
+            status=InvoiceStatus.issued,
+            **stamp,
+        )
+        session.add_all([clinic, parent, pet, invoice])
+        session.commit()
+        return invoice.id
+
+
+def test_payment_against_another_clinics_invoice_is_rejected(client, foreign_invoice):
+    from sqlmodel import Session, select
+
+    from app.db import engine
+    from app.models import Invoice, Payment
+
+    response = client.post(
+        "/payments/new",
+        data={"invoice_id": foreign_invoice, "payment_method": "cash", "amount": "100", "status": "paid"},
+        follow_redirects=False,
+    )
+    assert response.status_code == 400
+    assert "this clinic" in response.text
+    with Session(engine) as session:
+        invoice = session.get(Invoice, foreign_invoice)
+        assert (invoice.paid_amount, invoice.outstanding_amount, invoice.status.value) == (0, 100, "issued")
+        assert session.exec(select(Payment).where(Payment.invoice_id == foreign_invoice)).first() is None
+
+
+def test_payment_cannot_be_moved_to_another_clinics_invoice(client, pet_id, invoice_number, foreign_invoice):
+    invoice = create_invoice(client, pet_id, invoice_number)
+    pay(client, invoice, "40")
+    (payment_id,) = payment_ids(invoice)
+    response = client.post(
+        f"/payments/{payment_id}/edit",
+        data={"invoice_id": foreign_invoice, "payment_method": "cash", "amount": "40", "status": "paid"},
+        follow_redirects=False,
+    )
+    assert response.status_code == 400
+    assert load_invoice(invoice_number).paid_amount == 40
+
+
+def test_payments_on_a_paid_invoice_cannot_be_removed(client, pet_id, invoice_number):
+    invoice = create_invoice(client, pet_id, invoice_number)
+    pay(client, invoice, "100")
+    (payment_id,) = payment_ids(invoice)
+    response = client.post(f"/payments/{payment_id}/delete", follow_redirects=False)
+    assert response.status_code == 400
+    assert "cannot be reduced or removed" in response.text
+    response = client.post(
+        f"/payments/{payment_id}/edit",
+        data={"invoice_id": invoice.id, "payment_method": "cash", "amount": "60", "status": "paid"},
+        follow_redirects=False,
+    )
+    assert response.status_code == 400
+    invoice = load_invoice(invoice_number)
+    assert (invoice.paid_amount, invoice.outstanding_amount, invoice.status.value) == (100, 0, "paid")
+    assert payment_ids(invoice) == [payment_id]
+
+
+def test_payments_on_an_open_invoice_can_be_removed(client, pet_id, invoice_number):
+    invoice = create_invoice(client, pet_id, invoice_number)
+    pay(client, invoice, "40")
+    (payment_id,) = payment_ids(invoice)
+    assert client.post(f"/payments/{payment_id}/delete", follow_redirects=False).status_code == 303
+    invoice = load_invoice(invoice_number)
+    assert (invoice.paid_amount, invoice.outstanding_amount, invoice.status.value) == (0, 100, "issued")
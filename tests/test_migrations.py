@@ -0,0 +1,146 @@
+import datetime as dt
+from pathlib import Path
+
+from sqlalchemy import text
+
+from app.analytics import as_day, compute_rollups, empty_rollup
+
+CREATED = "2026-04-02 09:30:00"
+STAMP = {"created_at": CREATED, "updated_at": CREATED}
+
+
+def insert(connection, table, **values):
+    columns = ", ".join(values)
+    placeholders = ", ".join(f":{name}" for name in values)
+    connection.execute(text(f"INSERT INTO {table} ({columns}) VALUES ({placeholders})"), values)
+
+
+def seed_clinic(connection, clinic_id="c1"):
+    insert(connection, "clinics", id=clinic_id, name="Clinic", phone="1", address="", city="", state="", pincode="", **STAMP)
+    insert(connection, "users", id=f"{clinic_id}-vet", clinic_id=clinic_id, name="Vet", phone=f"{clinic_id}-vet", role="vet", is_active=True, password_hash="x", **STAMP)
+    insert(connection, "pet_parents", id=f"{clinic_id}-parent", clinic_id=clinic_id, name="Owner", phone="2", **STAMP)
+    insert(connection, "pets", id=f"{clinic_id}-pet", clinic_id=clinic_id, pet_parent_id=f"{clinic_id}-parent", name="Rex", species="Dog", gender="male", **STAMP)
+
+
+def test_daily_rollups_are_backfilled(migrate):
+    engine = migrate("0008_add_pet_timeline_indexes")
+    with engine.begin() as connection:
+        seed_clinic(connection)
+        insert(connection, "appointments", id="a1", clinic_id="c1", pet_id="c1-pet", vet_id="c1-vet", appointment_date="2026-04-03", start_time="10:00:00.000000", end_time="10:30:00.000000", status="completed", **STAMP)
+        insert(connection, "invoices", id="i1", clinic_id="c1", pet_id="c1-pet", invoice_number="INV1", total_amount=118, gst_amount=18, status="issued", **STAMP)
+        insert(connection, "payments", id="p1", clinic_id="c1", invoice_id="i1", payment_method="upi", amount=100, status="paid", **STAMP)
+    migrate("0009_add_daily_rollups")
+    with engine.connect() as connection:
+        rows = connection.execute(
+            text("SELECT day, visits_completed, invoices_count, invoiced_amount, collected_upi, new_pets FROM daily_rollups ORDER BY day")
+        ).all()
+    assert [tuple(row) for row in rows] == [
+        ("2026-04-02", 0, 1, 118, 100, 1),
+        ("2026-04-03", 1, 0, 0, 0, 0),
+    ]
+
+
+def test_daily_rollups_backfill_matches_app_rollups(migrate):
+    engine = migrate("0008_add_pet_timeline_indexes")
+    with engine.begin() as connection:
+        seed_clinic(connection)
+        seed_clinic(connection, "c2")
+        for index, status in enumerate(["scheduled", "completed", "cancelled", "no_show", "no_show"]):
+            insert(connection, "appointments", id=f"a{index}", clinic_id="c1", pet_id="c1-pet", vet_id="c1-vet", appointment_date=f"2026-04-0{index + 1}", start_time="10:00:00.000000", end_time="10:30:00.000000", status=status, **STAMP)
+        for invoice_id, clinic_id, status in [("i1", "c1", "issued"), ("i2", "c1", "paid"), ("i3", "c1", "draft"), ("i4", "c2", "issued")]:
+            insert(connection, "invoices", id=invoice_id, clinic_id=clinic_id, pet_id=f"{clinic_id}-pet", invoice_number=invoice_id, total_amount=59, gst_amount=9, status=status, **STAMP)
+        for payment_id, method, status in [("p1", "upi", "paid"), ("p2", "cash", "paid"), ("p3", "card", "paid"), ("p4", "card", "failed")]:
+            insert(connection, "payments", id=payment_id, clinic_id="c1", invoice_id="i1", payment_method=method, amount=12.5, status=status, **STAMP)
+        insert(connection, "pets", id="gone", clinic_id="c1", pet_parent_id="c1-parent", name="Gone", species="Cat", gender="female", deleted_at=CREATED, **STAMP)
+    migrate("0009_add_daily_rollups")
+    with engine.connect() as connection:
+        columns = ["clinic_id", "day", *empty_rollup()]
+        stored = {
+            (row.clinic_id, as_day(row.day)): {name: getattr(row, name) for name in columns[2:]}
+            for row in connection.execute(text(f"SELECT {', '.join(columns)} FROM daily_rollups"))
+        }
+        expected = compute_rollups(connection, dt.date(2026, 4, 1), dt.date(2026, 4, 30))
+    assert stored.keys() == expected.keys()
+    for key, values in expected.items():
+        assert {name: float(value) for name, value in stored[key].items()} == {
+            name: float(value) for name, value in values.items()
+        }, key
+
+
+def test_daily_rollups_backfill_on_empty_database(migrate):
+    engine = migrate("0009_add_daily_rollups")
+    with engine.connect() as connection:
+        assert connection.execute(text("SELECT count(*) FROM daily_rollups")).scalar() == 0
+
+
+def test_invoice_balances_are_backfilled(migrate):
+    engine = migrate("0009_add_daily_rollups")
+    with engine.begin() as connection:
+        seed_clinic(connection)
+        invoice = {"clinic_id": "c1", "pet_id": "c1-pet", "total_amount": 100, "gst_amount": 0, **STAMP}
+        insert(connection, "invoices", id="partial", invoice_number="INV1", status="issued", **invoice)
+        insert(connection, "invoices", id="by-hand", invoice_number="INV2", status="paid", **invoice)
+        insert(connection, "payments", id="p1", clinic_id="c1", invoice_id="partial", payment_method="cash", amount=45.5, status="paid", **STAMP)
+        insert(connection, "payments", id="p2", clinic_id="c1", invoice_id="partial", payment_method="cash", amount=20, status="failed", **STAMP)
+    migrate("0010_add_invoice_balances")
+    with engine.connect() as connection:
+        rows = connection.execute(text("SELECT id, paid_amount, outstanding_amount FROM invoices ORDER BY id")).all()
+    assert [tuple(row) for row in rows] == [("by-hand", 0, 0), ("partial", 45.5, 54.5)]
+
+
+def test_duplicate_invoice_numbers_are_renumbered(migrate):
+    engine = migrate("0010_add_invoice_balances")
+    with engine.begin() as connection:
+        seed_clinic(connection)
+        seed_clinic(connection, "c2")
+        for invoice_id, clinic_id, number, created_at, deleted_at in [
+            ("first", "c1", "INV1", "2026-04-01 09:00:00", None),
+            ("second", "c1", "INV1", "2026-04-02 09:00:00", None),
+            ("third", "c1", "INV1", "2026-04-03 09:00:00", None),
+            ("taken", "c1", "INV1-2", "2026-04-04 09:00:00", None),
+            ("deleted", "c1", "INV1", "2026-04-05 09:00:00", "2026-04-06 09:00:00"),
+            ("other-clinic", "c2", "INV1", "2026-04-01 09:00:00", None),
+        ]:
+            insert(
+                connection,
+                "invoices",
+                id=invoice_id,
+                clinic_id=clinic_id,
+                pet_id=f"{clinic_id}-pet",
+                invoice_number=number,
+                total_amount=10,
+                gst_amount=0,
+                status="issued",
+                created_at=created_at,
+                updated_at=created_at,
+                deleted_at=deleted_at,
+            )
+    migrate("0011_add_invoice_sequences")
+    with engine.connect() as connection:
+        numbers = dict(connection.execute(text("SELECT id, invoice_number FROM invoices")).all())
+    assert numbers == {
+        "first": "INV1",
+        "second": "INV1-3",
+        "third": "INV1-4",
+        "taken": "INV1-2",
+        "deleted": "INV1",
+        "other-clinic": "INV1",
+    }
+
+
+def test_autogenerate_leaves_search_tables_alone(migrate):
+    from alembic import command
+    from alembic.config import Config
+    from alembic.util import AutogenerateDiffsDetected
+
+    engine = migrate("head")
+    root = Path(__file__).resolve().parents[1]
+    cfg = Config(str(root / "alembic.ini"))
+    cfg.set_main_option("script_location", str(root / "alembic"))
+    cfg.set_main_option("sqlalchemy.url", str(engine.url))
+    # The models still differ from the migrations in column types and nullability; only the
+    # FTS5 table and its shadow tables must never show up as something to drop.
+    try:
+        command.check(cfg)
+    except AutogenerateDiffsDetected as exc:
+        assert "pet_search" not in str(exc)
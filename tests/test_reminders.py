@@ -0,0 +1,230 @@
+import asyncio
+import datetime as dt
+import time
+import uuid
+
+import pytest
+from sqlmodel import Session, select, update
+
+from app import reminders
+from app.db import engine, make_async_engine
+from app.messaging import (
+    MESSAGE_RETRY_BASE_SECONDS,
+    Dispatcher,
+    FakeSender,
+    OutboundMessage,
+    TokenBucket,
+    rate_buckets,
+)
+from app.models import Appointment, AppointmentStatus, MessageLog, MessageStatus, ReminderLog
+from app.reminders import enqueue_due_reminders, error_backoff, run_forever, run_once
+
+
+@pytest.fixture
+def async_engine():
+    engine = make_async_engine()
+    yield engine
+    asyncio.run(engine.dispose())
+
+
+@pytest.fixture
+def due_appointment(clinic_id, pet_id, vet_id):
+    # Each test gets its own far-future day, so scans only see the appointment it made.
+    local_now = dt.datetime(2031, 1, 1, 12, 0) + dt.timedelta(days=uuid.uuid4().int % 3000)
+    starts_at = local_now + dt.timedelta(hours=3)
+    appointment = Appointment(
+        clinic_id=clinic_id,
+        pet_id=pet_id,
+        vet_id=vet_id,
+        appointment_date=starts_at.date(),
+        start_time=starts_at.time(),
+        end_time=(starts_at + dt.timedelta(minutes=30)).time(),
+        status=AppointmentStatus.scheduled,
+    )
+    with Session(engine) as session:
+        session.add(appointment)
+        session.commit()
+        session.refresh(appointment)
+    return local_now, f"appointment:{appointment.id}:{starts_at.isoformat()}"
+
+
+def message(dedupe_key: str) -> MessageLog:
+    with Session(engine) as session:
+        return session.exec(select(MessageLog).where(MessageLog.dedupe_key == dedupe_key)).one()
+
+
+def expire(dedupe_key: str) -> None:
+    with Session(engine) as session:
+        session.exec(
+            update(MessageLog)
+            .where(MessageLog.dedupe_key == dedupe_key)
+            .values(next_attempt_at=dt.datetime.utcnow() - dt.timedelta(seconds=1))
+        )
+        session.commit()
+
+
+def test_due_reminder_is_queued_once(async_engine, due_appointment):
+    local_now, dedupe_key = due_appointment
+
+    assert asyncio.run(enqueue_due_reminders(async_engine, local_now)) == 1
+    queued = message(dedupe_key)
+    assert queued.status == MessageStatus.queued
+    assert queued.template_name == "appointment_reminder"
+    assert queued.attempts == 0
+
+    # Later scans see the same appointment and skip it on the dedupe_key conflict.
+    assert asyncio.run(enqueue_due_reminders(async_engine, local_now)) == 0
+    assert asyncio.run(enqueue_due_reminders(async_engine, local_now + dt.timedelta(minutes=1))) == 0
+    with Session(engine) as session:
+        rows = session.exec(select(MessageLog.id).where(MessageLog.dedupe_key == dedupe_key)).all()
+    assert len(rows) == 1
+
+
+def test_failed_send_is_retried_after_backoff(async_engine, due_appointment):
+    local_now, dedupe_key = due_appointment
+    sender = FakeSender(failures={dedupe_key: 1})
+    dispatcher = Dispatcher(async_engine, sender)
+
+    before = dt.datetime.utcnow()
+    summary = asyncio.run(run_once(dispatcher, local_now))
+    assert summary["queued"] == 1 and summary["retried"] >= 1
+    retrying = message(dedupe_key)
+    assert retrying.status == MessageStatus.queued
+    assert retrying.attempts == 1
+    assert retrying.last_error == "fake transient failure"
+    assert retrying.next_attempt_at >= before + dt.timedelta(seconds=MESSAGE_RETRY_BASE_SECONDS)
+
+    # Not due again until the backoff has passed.
+    asyncio.run(dispatcher.drain())
+    assert message(dedupe_key).attempts == 1
+
+    expire(dedupe_key)
+    asyncio.run(dispatcher.drain())
+    sent = message(dedupe_key)
+    assert sent.status == MessageStatus.sent
+    assert sent.attempts == 2
+    assert sent.provider_message_id == sender.delivered[dedupe_key]
+
+
+def test_send_fails_after_max_attempts(async_engine, due_appointment):
+    local_now, dedupe_key = due_appointment
+    dispatcher = Dispatcher(async_engine, FakeSender(failures={dedupe_key: 5}), max_attempts=2)
+
+    asyncio.run(run_once(dispatcher, local_now))
+    expire(dedupe_key)
+    asyncio.run(dispatcher.drain())
+
+    failed = message(dedupe_key)
+    assert failed.status == MessageStatus.failed
+    assert failed.attempts == 2
+    with Session(engine) as session:
+        outcome = session.exec(select(ReminderLog).where(ReminderLog.dedupe_key == dedupe_key)).one()
+    assert outcome.failure_reason == "fake transient failure"
+
+
+def test_expired_lease_does_not_send_twice(async_engine, due_appointment):
+    local_now, dedupe_key = due_appointment
+    sender = FakeSender()
+    asyncio.run(enqueue_due_reminders(async_engine, local_now))
+
+    async def send_then_crash():
+        # The provider accepts the message but the worker dies before recording it.
+        claimed = await Dispatcher(async_engine, sender).claim()
+        [outbound] = [message for message in claimed if message.idempotency_key == dedupe_key]
+        return (await sender.send(outbound)).provider_message_id
+
+    provider_message_id = asyncio.run(send_then_crash())
+
+    # While the lease holds, other dispatchers leave the message alone.
+    asyncio.run(Dispatcher(async_engine, sender).drain())
+    leased = message(dedupe_key)
+    assert leased.status == MessageStatus.queued
+    assert leased.attempts == 1
+
+    # Once it expires the message is claimed again, and the idempotency key stops the
+    # provider from delivering it a second time.
+    expire(dedupe_key)
+    asyncio.run(Dispatcher(async_engine, sender).drain())
+    sent = message(dedupe_key)
+    assert sent.status == MessageStatus.sent
+    assert sent.attempts == 2
+    assert sent.provider_message_id == provider_message_id == sender.delivered[dedupe_key]
+    with Session(engine) as session:
+        outcomes = session.exec(select(ReminderLog.id).where(ReminderLog.dedupe_key == dedupe_key)).all()
+    assert len(outcomes) == 1
+
+
+def test_token_bucket_limits_rate():
+    async def acquire_all(bucket, count):
+        started = time.monotonic()
+        for _ in range(count):
+            await bucket.acquire()
+        return time.monotonic() - started
+
+    # The burst goes out at once, then one token every 1/rate seconds.
+    assert asyncio.run(acquire_all(TokenBucket(rate=20, burst=2), 2)) < 0.05
+    assert asyncio.run(acquire_all(TokenBucket(rate=20, burst=2), 6)) >= 0.19
+
+
+def test_dispatcher_throttles_each_clinic():
+    clinic_ids = [f"rate-{uuid.uuid4()}" for _ in range(2)]
+    sender = FakeSender()
+    dispatcher = Dispatcher(None, sender, rate_per_second=20, burst=1)
+    messages = [
+        OutboundMessage(
+            id=str(uuid.uuid4()),
+            clinic_id=clinic_id,
+            recipient_phone="9000000001",
+            template_name="appointment_reminder",
+            payload={},
+            idempotency_key=str(uuid.uuid4()),
+            attempts=1,
+        )
+        for clinic_id in clinic_ids
+        for _ in range(5)
+    ]
+
+    async def send():
+        started = time.monotonic()
+        results = await dispatcher.send_all(messages)
+        return results, time.monotonic() - started
+
+    try:
+        results, elapsed = asyncio.run(send())
+    finally:
+        for clinic_id in clinic_ids:
+            rate_buckets.pop((sender.name, clinic_id), None)
+    assert all(result.ok for result, _ in results)
+    # Four waits of 1/20s per clinic; the two clinics are throttled side by side.
+    assert 0.19 <= elapsed < 0.39
+
+
+def test_run_forever_survives_failed_passes(monkeypatch, caplog):
+    class Stop(BaseException):
+        pass
+
+    outcomes = iter(
+        [RuntimeError("database is locked"), RuntimeError("again"), {"queued": 1}, RuntimeError("later"), Stop()]
+    )
+    sleeps = []
+
+    async def fake_run_once(_dispatcher):
+        outcome = next(outcomes)
+        if isinstance(outcome, BaseException):
+            raise outcome
+        return outcome
+
+    async def fake_sleep(seconds):
+        sleeps.append(seconds)
+
+    monkeypatch.setattr(reminders, "run_once", fake_run_once)
+    monkeypatch.setattr(reminders.asyncio, "sleep", fake_sleep)
+    with pytest.raises(Stop):
+        asyncio.run(run_forever(None, interval=60))
+
+    # Backoff doubles across consecutive failures and starts over after a good pass.
+    assert sleeps[:2] == [error_backoff(1), error_backoff(2)]
+    assert 59 < sleeps[2] <= 60
+    assert sleeps[3] == error_backoff(1)
+    assert error_backoff(2) == 2 * error_backoff(1)
+    assert sum("Reminder pass failed" in record.message for record in caplog.records) == 3
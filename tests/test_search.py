@@ -0,0 +1,33 @@
+def search(client, q):
+    response = client.get("/api/pets/search", params={"q": q})
+    assert response.status_code == 200, response.text
+    return [pet["name"] for pet in response.json()]
+
+
+def test_name_prefix_hits_survive_the_limit(client, make_pet):
+    # Mid-name matches that bm25 scores above the long prefix match fill more than a page.
+    for _ in range(12):
+        make_pet(name="Old Quokkaterrier", breed="Quokkaterrier", parent_name="Quokkaterrier")
+    make_pet(name="Quokkaterrier Junior the Third of Many Names", breed="Mixed")
+    names = search(client, "quokkaterrier")
+    assert len(names) == 10
+    assert names[0] == "Quokkaterrier Junior the Third of Many Names"
+
+
+def test_short_terms_narrow_by_name_prefix(client, make_pet):
+    make_pet(name="Bo Zanzibar", breed="Vizslahound")
+    make_pet(name="Rex Zanzibar", breed="Vizslahound")
+    assert search(client, "bo vizslahound") == ["Bo Zanzibar"]
+    assert sorted(search(client, "vizslahound")) == ["Bo Zanzibar", "Rex Zanzibar"]
+
+
+def test_short_query_matches_name_prefix(client, make_pet):
+    make_pet(name="Xu Qiwi")
+    assert search(client, "xu") == ["Xu Qiwi"]
+
+
+def test_pets_list_filters_with_search(client, make_pet):
+    make_pet(name="Yodelpup", breed="Beagle")
+    response = client.get("/pets", params={"q": "yodelpup"})
+    assert response.status_code == 200
+    assert "Yodelpup" in response.text